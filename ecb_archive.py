@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+ECB Archive Re-validation
+Re-validates a directory of past submissions under a new rule pack and
+reports, per reporting entity, the checks that newly fail and those that
+newly pass compared with a baseline rule pack.
+
+Rule IDs are not stable across the rule file variants, so a check is
+identified by its expression, whitespace aside, and the built-in checks
+(ECB_REF_*, ECB_DOMAIN) by their ID. Sheet-level failures, a header the
+layout rejects (ECB_LAYOUT) or a sheet that could not be validated
+(ECB_SHEET_ERROR), are identified by sheet and code. Each submission is parsed
+once: both rule packs read its sheets from a shared frame cache (see
+ecb_frame_cache).
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+
+from ecb_validator import ECBValidator, add_layout_arguments, add_reader_argument, expand_targets, layout_options
+
+ENTITY_SHEET = 'tB_01.01'  # entity maintaining the register
+ENTITY_COLUMN = 'c0010'  # its LEI
+SHEET_ERROR = 'ECB_SHEET_ERROR'  # code of a sheet whose validation raised
+
+_archive_validators = None
+
+
+def _validators(baseline_rules, rules, options):
+    """(baseline, new) validators, each with its rules compiled up front"""
+    return tuple(ECBValidator(rules=pack_rules, verbose=False, **options).warm()
+                 for pack_rules in (baseline_rules, rules))
+
+
+def _init_archive_worker(baseline_rules, rules, options):
+    global _archive_validators
+    _archive_validators = _validators(baseline_rules, rules, options)
+
+
+def _compare_in_worker(file_path):
+    return compare_submission(file_path, *_archive_validators)
+
+
+def check_key(expression):
+    """Identity of a check across rule packs: its expression with whitespace collapsed"""
+    return ' '.join(expression.split())
+
+
+def failing_checks(results, rules):
+    """{check: {rule_id, rule_type, expression, errors}} of the checks that failed in a validate_file result
+
+    Rule violations are keyed as check_key of the rule's expression, or by
+    rule ID for the built-in checks. The sheet-level errors that are not
+    listings of those violations are keyed 'sheet:code' and also carry the sheet.
+    """
+    expressions = {rule['id']: rule['expression'] for rule in rules}
+    failing = {}
+    for sheet_name, report in results.get('sheet_results', {}).items():
+        violated = set()
+        for entry in report.get('violations') or ():
+            violated.add((entry['rule_id'], entry['rule_type'], entry['column']))
+            expression = expressions.get(entry['rule_id'])
+            check = failing.setdefault(check_key(expression) if expression else entry['rule_id'], {
+                'rule_id': entry['rule_id'], 'rule_type': entry['rule_type'], 'expression': expression, 'errors': 0})
+            check['errors'] += entry['count']
+        for error in report.get('errors') or ():
+            if isinstance(error, dict):
+                if (error['rule_id'], error['rule_type'], error['column']) in violated:
+                    continue
+                code, rule_type = error['rule_id'], error['rule_type']
+            else:
+                code, rule_type = SHEET_ERROR, 'error'
+            check = failing.setdefault(f"{sheet_name}:{code}", {
+                'rule_id': code, 'rule_type': rule_type, 'expression': None, 'sheet': sheet_name, 'errors': 0})
+            check['errors'] += 1
+    return failing
+
+
+def submission_entity(file_path, validator):
+    """LEI of the entity maintaining the register (tB_01.01 c0010), or None"""
+    from ecb_workbook import WorkbookReader
+    try:
+        with WorkbookReader(file_path, layout=validator.layout, reader=validator.reader,
+                            frame_cache=validator.frame_cache) as workbook:
+            if ENTITY_SHEET not in workbook.sheet_names:
+                return None
+            _, frame = workbook.read_sheet(ENTITY_SHEET)
+    except Exception:
+        return None
+    values = frame[ENTITY_COLUMN].dropna() if ENTITY_COLUMN in frame else ()
+    if not len(values):
+        return None
+    value = values.iloc[0]
+    return str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+
+
+def compare_submission(file_path, baseline, validator):
+    """Failing checks of one submission under both rule packs
+
+    The baseline run parses the sheets into the frame cache, the new run
+    reads them from there.
+    """
+    baseline_results = baseline.validate_file(file_path)
+    results = validator.validate_file(file_path)
+    error = results.get('error') or baseline_results.get('error')
+    if error:
+        return {'file': file_path, 'error': error}
+    return {'file': file_path, 'entity': submission_entity(file_path, validator),
+            'baseline': failing_checks(baseline_results, baseline.rules),
+            'new': failing_checks(results, validator.rules)}
+
+
+def delta_report(comparisons, baseline_pack, pack):
+    """Per entity, the checks failing under `pack` but not the baseline and the other way round
+
+    Submissions without an entity LEI are reported under their file name.
+    A newly failing check that is not in the baseline pack is marked
+    `added`, a newly passing one that is not in the new pack `retired`.
+    """
+    baseline_checks = {check_key(rule['expression']) for rule in baseline_pack.rules}
+    checks = {check_key(rule['expression']) for rule in pack.rules}
+    entities, failed, impact = {}, [], {}
+    for comparison in comparisons:
+        name = Path(comparison['file']).name
+        if 'error' in comparison:
+            failed.append({'file': name, 'error': comparison['error']})
+            continue
+        entity = entities.setdefault(comparison.get('entity') or Path(name).stem,
+                                     {'submissions': [], 'newly_failing': {}, 'newly_passing': {}})
+        entity['submissions'].append(name)
+        for direction, now, before, other_pack, flag in (
+                ('newly_failing', comparison['new'], comparison['baseline'], baseline_checks, 'added'),
+                ('newly_passing', comparison['baseline'], comparison['new'], checks, 'retired')):
+            for check, found in now.items():
+                if check in before:
+                    continue
+                # Sheet-level failures are listed per sheet, under their check key
+                entry = entity[direction].setdefault(check if 'sheet' in found else found['rule_id'], {
+                    'rule_type': found['rule_type'], 'expression': found['expression'], 'errors': 0,
+                    'submissions': []})
+                if found['expression'] is not None and check_key(found['expression']) not in other_pack:
+                    entry[flag] = True
+                entry['errors'] += found['errors']
+                entry['submissions'].append(name)
+    for entity_name, entity in entities.items():
+        for direction in ('newly_failing', 'newly_passing'):
+            entity[direction] = dict(sorted(entity[direction].items()))
+            for rule_id, entry in entity[direction].items():
+                impact.setdefault((direction, rule_id), set()).add(entity_name)
+    return {
+        'baseline_rules': {'source': baseline_pack.source, 'rules': len(baseline_pack.rules)},
+        'rules': {'source': pack.source, 'rules': len(pack.rules)},
+        'submissions': len(comparisons),
+        'entities': dict(sorted(entities.items())),
+        'impact': {direction: {rule_id: len(names) for (kind, rule_id), names in sorted(impact.items())
+                               if kind == direction}
+                   for direction in ('newly_failing', 'newly_passing')},
+        'failed': failed,
+    }
+
+
+def revalidate_archive(file_paths, rule_pack, baseline_rule_pack=None, jobs=None, frame_cache_dir=None,
+                       **options):
+    """Delta report of re-validating past submissions under `rule_pack` instead of `baseline_rule_pack`
+
+    Both rule packs are loaded once and compiled once per worker process.
+    With jobs > 1 the submissions are spread over a pool of workers. Without
+    frame_cache_dir the parsed sheets are shared through a temporary frame
+    cache for the run; with it they are also reused by later runs. Other
+    options (cache_dir, reader, layout, code_lists) go to both validators.
+    """
+    from ecb_rule_pack import DEFAULT_RULE_PACK, RulePack
+    baseline_pack = RulePack.load(baseline_rule_pack or DEFAULT_RULE_PACK)
+    pack = RulePack.load(rule_pack)
+    with ExitStack() as stack:
+        if frame_cache_dir is None:
+            frame_cache_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix='ecb_frames_'))
+        options = {**options, 'frame_cache_dir': frame_cache_dir}
+        if not jobs or jobs <= 1 or len(file_paths) <= 1:
+            validators = _validators(baseline_pack.rules, pack.rules, options)
+            comparisons = [compare_submission(file_path, *validators) for file_path in file_paths]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(jobs, len(file_paths)), initializer=_init_archive_worker,
+                                     initargs=(baseline_pack.rules, pack.rules, options)) as pool:
+                comparisons = list(pool.map(_compare_in_worker, file_paths))
+    return delta_report(comparisons, baseline_pack, pack)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-validate an archive of submissions under a new rule pack and report the changes per entity")
+    parser.add_argument('target', help="directory or glob pattern of past submissions")
+    parser.add_argument('--rules', required=True, help="new rule JSON file or compiled .rulepack artifact")
+    parser.add_argument('--baseline-rules', help="rule pack the submissions were validated against "
+                                                 "(default: complete_ecb_validation_rules.json)")
+    parser.add_argument('--jobs', type=int, default=1, help="validate this many submissions at once")
+    parser.add_argument('--frame-cache', metavar='DIR', help="keep parsed sheets in this directory for later runs")
+    parser.add_argument('--cache-dir', help="reuse results for unchanged sheets and rules from this directory")
+    parser.add_argument('--output', help="write the delta report to this file instead of stdout")
+    add_layout_arguments(parser)
+    add_reader_argument(parser)
+    args = parser.parse_args(argv)
+
+    file_paths = expand_targets(args.target)
+    if not file_paths:
+        print(f"No workbooks found for {args.target}", file=sys.stderr)
+        return 1
+    report = revalidate_archive(file_paths, args.rules, args.baseline_rules, jobs=args.jobs,
+                                frame_cache_dir=args.frame_cache, cache_dir=args.cache_dir, reader=args.reader,
+                                **layout_options(args))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
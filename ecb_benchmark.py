@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+ECB Validator Benchmarks
+startup: checks the cold-start import cost of ecb_validator against a budget
+using `python -X importtime`, and times a whole validator process answering
+a workbook from a warm result cache
+generate: writes a synthetic register workbook (see ecb_synthetic)
+measure: times the load, compile, evaluate and report stages of validating
+one workbook and records the peak resident memory after each
+suite: runs measure on synthetic workbooks of several sizes, each in a
+fresh process, and compares the timings with an earlier run
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ecb_readers import READERS
+
+HERE = Path(__file__).resolve().parent
+
+STARTUP_BUDGET_MS = 100
+STARTUP_WORKBOOK = HERE / 'test_ecb_validation.xlsx'
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl')
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+SUITE_ROWS = (1000, 100000, 1000000)
+SUITE_VIOLATION_RATE = 0.01
+STAGES = ('load', 'compile', 'evaluate', 'report')
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative import microseconds} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def measure_startup(args=('--help',), runs=5):
+    """Import ecb_validator and run its CLI with `args`; best of `runs`
+
+    Returns (milliseconds spent importing ecb_validator, set of imported modules).
+    """
+    best, imported = None, set()
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             'import sys, ecb_validator; sys.exit(ecb_validator.main(sys.argv[1:]))', *args],
+            cwd=HERE, capture_output=True, text=True)
+        modules = parse_importtime(completed.stderr)
+        elapsed = modules.get('ecb_validator', 0) / 1000
+        if best is None or elapsed < best:
+            best, imported = elapsed, set(modules)
+    return best, imported
+
+
+def measure_cached_run(file_path, runs=5):
+    """Validate a workbook from a warm result cache in a fresh validator process; best of `runs`
+
+    One run fills a temporary cache first. Returns milliseconds of the whole
+    process, interpreter start, imports, rule loading and workbook opening included.
+    """
+    command = [sys.executable, 'ecb_validator.py', str(file_path)]
+    best = None
+    with tempfile.TemporaryDirectory(prefix='ecb_startup_') as cache_dir:
+        command += ['--cache-dir', cache_dir]
+        subprocess.run(command, cwd=HERE, capture_output=True, check=True)
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=HERE, capture_output=True, check=True)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_startup(budget_ms, workbook=STARTUP_WORKBOOK):
+    elapsed, imported = measure_startup()
+    heavy = sorted(m for m in HEAVY_MODULES if m in imported)
+    print(f"ecb_validator import (running --help): {elapsed:.1f} ms (budget {budget_ms} ms)")
+    print(f"validator process with a warm result cache ({Path(workbook).name}): "
+          f"{measure_cached_run(workbook):.1f} ms")
+    if heavy:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(heavy)}")
+        return 1
+    if elapsed > budget_ms:
+        print("FAIL: startup budget exceeded")
+        return 1
+    print("OK")
+    return 0
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10)
+
+
+def measure_stages(file_path, rule_pack=None, reader='auto', frame_cache=None):
+    """Validate a workbook stage by stage, as validate_file does, timing each stage
+
+    load: open the workbook and read every tB_ sheet into a frame
+    compile: load the rules and compile every table's rules
+    evaluate: apply the rules to each frame, then the cross-table checks
+    report: build the public sheet results and serialize them as JSON
+
+    Returns {'seconds': {stage: s}, 'peak_rss_mb': {stage: MB}, 'data_rows', 'total_errors'}.
+    """
+    from ecb_validator import ECBValidator
+    from ecb_workbook import WorkbookReader
+
+    seconds, peak = {}, {}
+
+    def stage(name, start):
+        seconds[name] = time.perf_counter() - start
+        peak[name] = peak_rss_mb()
+
+    validator = ECBValidator(rule_pack=rule_pack, verbose=False)
+    start = time.perf_counter()
+    with WorkbookReader(file_path, reader=reader, frame_cache=frame_cache) as workbook:
+        frames = {name: workbook.read_sheet(name)[1] for name in workbook.table_sheets()}
+        stage('load', start)
+
+        start = time.perf_counter()
+        validator.warm()
+        stage('compile', start)
+
+        start = time.perf_counter()
+        sheet_results = {name: validator._frame_results(name, frame) for name, frame in frames.items()}
+        from ecb_referential import select_keys
+        validator._check_references(workbook, sheet_results,
+                                    {name: select_keys(name, frame) for name, frame in frames.items()})
+        stage('evaluate', start)
+
+    start = time.perf_counter()
+    reports = {name: validator._report(results) for name, results in sheet_results.items()}
+    json.dumps(reports)
+    stage('report', start)
+    return {'seconds': seconds, 'peak_rss_mb': peak,
+            'data_rows': sum(report['data_rows'] for report in reports.values()),
+            'total_errors': sum(report['error_count'] for report in reports.values())}
+
+
+def synthetic_workbook(directory, rows, violation_rate, seed=0):
+    """Path of a synthetic workbook in `directory`, generated unless already there"""
+    from ecb_synthetic import generate_workbook
+    path = Path(directory) / f"synthetic_{rows}_{violation_rate:g}_{seed}.xlsx"
+    if not path.exists():
+        print(f"generating {path.name} ...", file=sys.stderr)
+        partial = path.with_suffix('.part')
+        generate_workbook(partial, rows, violation_rate, seed=seed)
+        partial.replace(path)
+    return path
+
+
+def run_suite(sizes, violation_rate, directory, rule_pack=None, baseline=None, reader='auto'):
+    """Measure each size in its own process, so every peak RSS starts from a fresh interpreter"""
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    results = []
+    for rows in sizes:
+        path = synthetic_workbook(directory, rows, violation_rate)
+        command = [sys.executable, str(HERE / 'ecb_benchmark.py'), 'measure', str(path), '--reader', reader]
+        if rule_pack:
+            command += ['--rules', str(rule_pack)]
+        completed = subprocess.run(command, cwd=HERE, capture_output=True, text=True, check=True)
+        results.append({'rows': rows, 'violation_rate': violation_rate, **json.loads(completed.stdout)})
+    previous = {entry['rows']: entry for entry in baseline or ()}
+    print(f"{'rows/table':>11} " + ' '.join(f"{name + ' s':>10}" for name in STAGES) + f" {'peak MB':>9} {'errors':>9}")
+    for entry in results:
+        print(f"{entry['rows']:>11} " + ' '.join(f"{entry['seconds'][name]:>10.3f}" for name in STAGES)
+              + f" {max(entry['peak_rss_mb'].values()):>9.0f} {entry['total_errors']:>9}")
+        before = previous.get(entry['rows'])
+        if before is not None:
+            print(f"{'vs baseline':>11} " + ' '.join(
+                f"{entry['seconds'][name] / before['seconds'][name]:>9.2f}x" if before['seconds'][name] else f"{'-':>10}"
+                for name in STAGES) + f" {max(entry['peak_rss_mb'].values()) / max(before['peak_rss_mb'].values()):>8.2f}x")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ECB validator benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    startup = subparsers.add_parser('startup', help="check cold-start import time against a budget")
+    startup.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    startup.add_argument('--workbook', default=str(STARTUP_WORKBOOK),
+                         help="workbook validated from a warm result cache")
+    generate = subparsers.add_parser('generate', help="write a synthetic register workbook")
+    generate.add_argument('output', help="workbook to write (.xlsx)")
+    generate.add_argument('--rows', type=int, default=SUITE_ROWS[0], help="data rows per table")
+    generate.add_argument('--violation-rate', type=float, default=SUITE_VIOLATION_RATE,
+                          help="fraction of rows given one fault")
+    generate.add_argument('--tables', nargs='+', help="tB_ tables to generate (default: the tables with rules)")
+    generate.add_argument('--seed', type=int, default=0)
+    measure = subparsers.add_parser('measure', help="time the validation stages of one workbook, as JSON")
+    measure.add_argument('workbook')
+    measure.add_argument('--rules', help="rule JSON file or compiled rule pack")
+    measure.add_argument('--reader', choices=READERS, default='auto', help="workbook reader backend")
+    measure.add_argument('--frame-cache', metavar='DIR', help="read and store the parsed sheets in this frame cache")
+    suite = subparsers.add_parser('suite', help="time the validation stages on synthetic workbooks of several sizes")
+    suite.add_argument('--rows', type=int, nargs='+', default=list(SUITE_ROWS), help="data rows per table")
+    suite.add_argument('--violation-rate', type=float, default=SUITE_VIOLATION_RATE)
+    suite.add_argument('--workdir', default='benchmark_workbooks', help="where generated workbooks are kept")
+    suite.add_argument('--rules', help="rule JSON file or compiled rule pack")
+    suite.add_argument('--output', help="write the measurements to this JSON file")
+    suite.add_argument('--baseline', help="measurements of an earlier run to compare with")
+    suite.add_argument('--reader', choices=READERS, default='auto', help="workbook reader backend")
+    args = parser.parse_args(argv)
+
+    if args.command == 'startup':
+        return run_startup(args.budget_ms, args.workbook)
+    if args.command == 'generate':
+        from ecb_synthetic import DEFAULT_TABLES, generate_workbook
+        summary = generate_workbook(args.output, args.rows, args.violation_rate,
+                                    tables=args.tables or DEFAULT_TABLES, seed=args.seed)
+        print(json.dumps(summary, indent=2))
+        return 0
+    if args.command == 'measure':
+        from ecb_frame_cache import FrameCache
+        frame_cache = FrameCache(args.frame_cache) if args.frame_cache else None
+        print(json.dumps(measure_stages(args.workbook, args.rules, args.reader, frame_cache)))
+        return 0
+    if args.command == 'suite':
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        results = run_suite(args.rows, args.violation_rate, args.workdir, args.rules, baseline, args.reader)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+ECB Code Lists
+Domain members (eba_CT:x212, eba_GA:FR, ...) interned to small integers so
+that enumeration rules compare integer codes, and the column domains of the
+DORA templates read from the annotated table layout workbook so that every
+enumerated cell can be checked against its domain
+"""
+
+import hashlib
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+from ecb_layout import DEFAULT_LAYOUT, LayoutIndex
+
+MEMBER_CODE = re.compile(r'^eba_(\w+):\w+$')
+
+
+def factorized(values):
+    """(codes, distinct values) of a column, reusing a categorical's own codes; nulls get -1"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values)
+
+
+class MemberTable:
+    """Interns domain member codes to small integers, process-wide"""
+
+    def __init__(self):
+        self._ids = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def intern(self, member):
+        return self._ids.setdefault(str(member), len(self._ids))
+
+    def lookup(self, values):
+        """Interned id of every cell of a column; -1 for nulls and values never interned
+
+        Cells are stripped and looked up once per distinct value, then
+        broadcast back through the factor codes.
+        """
+        codes, uniques = factorized(values)
+        ids = np.fromiter((self._ids.get(str(u).strip(), -1) for u in uniques), dtype=np.int64, count=len(uniques))
+        return np.append(ids, -1)[codes]
+
+
+MEMBERS = MemberTable()
+
+
+class CodeLists:
+    """Column domains per table, and optionally the member list of each hierarchy
+
+    The layout workbook names the domain and hierarchy of every enumerated
+    column but not the members themselves. Without a member list a cell is
+    legal if it is a member code of the column's domain (eba_CT:... in a CT
+    column). With one, the cell must also be listed for the hierarchy.
+    """
+
+    def __init__(self, domains, members=None):
+        self.domains = domains  # {table: {column: Domain}}
+        self.members = {name: frozenset(codes) for name, codes in (members or {}).items()}
+
+    @classmethod
+    def load(cls, layout=DEFAULT_LAYOUT, members=None):
+        """Column domains from the annotated layout workbook (or a loaded LayoutIndex)
+
+        members: optional JSON file {"CT:CT7": ["eba_CT:x212", ...], ...}
+        """
+        index = layout if isinstance(layout, LayoutIndex) else LayoutIndex.load(layout)
+        domains = {}
+        for table, table_layout in index.tables.items():
+            columns = {column.code: column.domain for column in table_layout.columns if column.domain}
+            if columns:
+                domains[table] = columns
+        member_lists = None
+        if members:
+            with open(members, encoding='utf-8') as f:
+                member_lists = json.load(f)
+        return cls(domains, member_lists)
+
+    def fingerprint(self):
+        """Content hash, so cached results are not reused across different code lists"""
+        content = {table: {column: domain.name for column, domain in columns.items()}
+                   for table, columns in self.domains.items()}
+        content = [content, {name: sorted(codes) for name, codes in self.members.items()}]
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def invalid_cells(self, table, frame):
+        """Yield (column, failing mask) for the enumerated columns of `table` present in `frame`"""
+        for column, domain in self.domains.get(table, {}).items():
+            if column not in frame.columns:
+                continue
+            codes, uniques = factorized(frame[column])
+            legal = np.fromiter((self._is_member(domain, u) for u in uniques), dtype=bool, count=len(uniques))
+            failing = ~np.append(legal, True)[codes]
+            if failing.any():
+                yield column, failing
+
+    def _is_member(self, domain, value):
+        value = str(value).strip()
+        match = MEMBER_CODE.match(value)
+        if not match or match.group(1) != domain.code:
+            return False
+        listed = self.members.get(domain.name)
+        return listed is None or value in listed
+
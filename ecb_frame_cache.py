@@ -0,0 +1,159 @@
+"""
+ECB Frame Cache
+Persistent on-disk cache of parsed tB_ sheets: the frame of mapped columns
+that WorkbookReader.read_sheet builds from a sheet's data rows, keyed by the
+workbook file's hash. Columns are stored as .npy files and memory-mapped on
+reuse, so re-validating an archived workbook under new rules skips the XML.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+FORMAT_VERSION = 2
+HASH_BLOCK = 1024 * 1024
+
+
+def file_digest(file_path):
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def frame_key(file_hash, sheet_name, data_types=None):
+    """Cache key of a sheet's frame: the workbook, the sheet and the layout data types that typed its columns"""
+    identity = [FORMAT_VERSION, file_hash, sheet_name, sorted((data_types or {}).items())]
+    return hashlib.sha256(json.dumps(identity).encode('utf-8')).hexdigest()
+
+
+class FrameCache:
+    """One directory per entry, holding meta.json and one .npy file per column
+
+    - numeric and date columns are saved as they are and memory-mapped on load;
+    - categoricals as their codes (memory-mapped) and categories;
+    - text columns as a fixed-width string array and a missing-value mask;
+    - any other column as a pickled object array.
+
+    meta.json's modification time records last use.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def _meta(self, key):
+        path = self.directory / key / 'meta.json'
+        with open(path, encoding='utf-8') as f:
+            meta = json.load(f)
+        os.utime(path)  # mark as recently used
+        return meta
+
+    def header(self, key):
+        """Cached column mapping of the sheet's header row, or None"""
+        try:
+            meta = self._meta(key)
+        except (OSError, ValueError):
+            return None
+        return {int(position): code for position, code in meta['column_mapping'].items()}
+
+    def get(self, key):
+        """Cached (column_mapping, frame), or None"""
+        try:
+            meta = self._meta(key)
+            return ({int(position): code for position, code in meta['column_mapping'].items()},
+                    self._load_frame(self.directory / key, meta))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, column_mapping, frame):
+        """Store a sheet's frame atomically, then evict down to max_bytes"""
+        tmp_dir = tempfile.mkdtemp(dir=self.directory, suffix='.tmp')
+        try:
+            meta = {'version': FORMAT_VERSION, 'rows': len(frame),
+                    'column_mapping': {str(position): code for position, code in column_mapping.items()},
+                    'columns': self._save_frame(Path(tmp_dir), frame)}
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp_dir, self.directory / key)
+        except (OSError, ValueError):
+            # Also when another process stored the same entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict()
+
+    @staticmethod
+    def _save_frame(directory, frame):
+        import numpy as np
+        import pandas as pd
+        np.save(directory / 'index.npy', frame.index.to_numpy())
+        columns = []
+        for i, code in enumerate(frame.columns):
+            values = frame[code]
+            entry = {'code': code, 'dtype': str(values.dtype)}
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                categories = values.cat.categories
+                np.save(directory / f'{i}.npy', values.cat.codes.to_numpy())
+                np.save(directory / f'{i}.categories.npy', categories.to_numpy(dtype=str))
+                entry.update(kind='category', categories_dtype=str(categories.dtype),
+                             ordered=bool(values.cat.ordered))
+            elif isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufmM':
+                np.save(directory / f'{i}.npy', values.to_numpy())
+                entry['kind'] = 'array'
+            elif isinstance(values.dtype, pd.StringDtype):
+                missing = values.isna().to_numpy()
+                np.save(directory / f'{i}.npy', values.fillna('').to_numpy(dtype=str))
+                np.save(directory / f'{i}.missing.npy', missing)
+                entry['kind'] = 'text'
+            else:
+                np.save(directory / f'{i}.npy', values.to_numpy(dtype=object), allow_pickle=True)
+                entry['kind'] = 'object'
+            columns.append(entry)
+        return columns
+
+    @staticmethod
+    def _load_frame(directory, meta):
+        import numpy as np
+        import pandas as pd
+        columns = {}
+        for i, entry in enumerate(meta['columns']):
+            path = directory / f'{i}.npy'
+            kind = entry['kind']
+            if kind == 'array':
+                values = np.load(path, mmap_mode='r')
+            elif kind == 'category':
+                categories = pd.Index(np.load(directory / f'{i}.categories.npy'), dtype=entry['categories_dtype'])
+                values = pd.Categorical.from_codes(np.load(path, mmap_mode='r'), categories, ordered=entry['ordered'])
+            elif kind == 'text':
+                values = np.load(path).astype(object)
+                values[np.load(directory / f'{i}.missing.npy')] = None
+                values = pd.array(values, dtype=entry['dtype'])
+            else:
+                values = np.load(path, allow_pickle=True)
+            columns[entry['code']] = values
+        index = pd.Index(np.load(directory / 'index.npy', mmap_mode='r'), name='row')
+        return pd.DataFrame(columns, index=index, columns=[entry['code'] for entry in meta['columns']], copy=False)
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for path in self.directory.iterdir():
+            try:
+                used = (path / 'meta.json').stat().st_mtime
+                size = sum(file.stat().st_size for file in path.iterdir())
+            except OSError:
+                continue  # a temporary entry still being written, or one just evicted
+            entries.append((used, size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
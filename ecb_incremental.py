@@ -0,0 +1,199 @@
+"""
+ECB Incremental Re-validation
+Cell-level diff between two versions of a tB_ sheet, aligned on Excel row
+numbers. The validator uses it to re-run only the rules that read a changed
+column, on the rows where one of those columns changed, and to keep the
+previous version's violations everywhere else.
+
+The diff is taken from the sheets' raw XML, so the previous version is never
+parsed: cells compare by type, value (shared strings resolved) and whether
+their style shows a date, which is all that decides the value read.
+"""
+
+import datetime
+import json
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from ecb_layout import column_letter
+from ecb_workbook import DATA_START_ROW, ISO_DATE
+
+ROW = re.compile(rb'<(?:\w+:)?row\b[^>]*?\br="(\d+)"[^>]*?(?:/>|>(.*?)</(?:\w+:)?row>)', re.S)
+ROW_START = re.compile(rb'<(?:\w+:)?row\b')
+CELL = re.compile(rb'<(?:\w+:)?c\b([^>]*?)(?:/>|>(.*?)</(?:\w+:)?c>)', re.S)
+CELL_REF = re.compile(rb'\br="([A-Z]+)(\d+)"')
+CELL_TYPE = re.compile(rb'\bt="(\w+)"')
+CELL_STYLE = re.compile(rb'\bs="(\d+)"')
+CELL_VALUE = re.compile(rb'<(?:\w+:)?v>(.*?)</(?:\w+:)?v>', re.S)
+INLINE_TEXT = re.compile(rb'<(?:\w+:)?t\b[^>]*>(.*?)</(?:\w+:)?t>', re.S)
+
+
+@dataclass
+class SheetDiff:
+    """Changed cells of one sheet: Excel rows per column, and the rows that appeared or disappeared
+
+    Rows only present in the new version count as changed in every column.
+    """
+    cells: dict  # {column: sorted Excel rows whose cell changed}
+    removed_rows: np.ndarray
+    added_rows: np.ndarray
+
+    @property
+    def changed_cells(self):
+        return sum(len(rows) for rows in self.cells.values())
+
+    @property
+    def changed_columns(self):
+        return set(self.cells)
+
+    def rows_for(self, columns):
+        """Sorted Excel rows where any of `columns` changed"""
+        parts = [self.cells[c] for c in columns if c in self.cells]
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+
+    def touches(self, columns):
+        """Whether any of `columns` changed or any row was removed"""
+        return bool(len(self.removed_rows)) or any(c in self.cells for c in columns)
+
+    @property
+    def unchanged(self):
+        return not self.cells and not len(self.removed_rows)
+
+
+def may_change_type(values):
+    """Whether editing some cells of a column can change how its other cells are read
+
+    A column is read as dates only if every cell holds a date or yyyy-mm-dd
+    text; whatever dtype other columns get, the rules read them the same.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return True
+    if pd.api.types.is_numeric_dtype(values):
+        return False
+    uniques = pd.Series(values.dropna().unique(), dtype=object)
+    return bool(uniques.map(lambda u: isinstance(u, datetime.date)).any()
+                or uniques.astype(str).str.strip().str.fullmatch(ISO_DATE).any())
+
+
+def _same_cells(old, new):
+    """Boolean array: which cells of two aligned columns hold the same value"""
+    both_null = (old.isna() & new.isna()).to_numpy()
+    if old.dtype != new.dtype or isinstance(old.dtype, pd.CategoricalDtype):
+        old, new = old.astype(object), new.astype(object)
+    equal = old.to_numpy() == new.to_numpy()
+    return both_null | np.asarray(equal, dtype=bool)
+
+
+def diff_frames(old, new):
+    """SheetDiff between two frames of cNNNN columns indexed by Excel row
+
+    Returns None when the sheets do not have the same columns: which rules
+    apply depends on the columns present, so such a sheet is validated anew.
+    """
+    if set(old.columns) != set(new.columns):
+        return None
+    common = new.index.intersection(old.index)
+    added = new.index.difference(old.index).to_numpy(dtype=np.int64)
+    removed = old.index.difference(new.index).to_numpy(dtype=np.int64)
+    cells = {}
+    for column in new.columns:
+        differs = ~_same_cells(old[column].loc[common], new[column].loc[common])
+        rows = np.union1d(common[differs].to_numpy(dtype=np.int64), added)
+        if len(rows):
+            cells[column] = rows
+    return SheetDiff(cells, removed, added)
+
+
+def sheet_rows(workbook, sheet_name):
+    """{Excel row: raw XML of its cells} of a sheet, or None if a row has no explicit number"""
+    xml = workbook.sheet_xml(sheet_name)
+    rows = {int(row): content or b'' for row, content in ROW.findall(xml)}
+    return rows if len(rows) == len(ROW_START.findall(xml)) else None
+
+
+def row_cells(content, codes, strings, date_styles):
+    """{column code: cell token} of one row's XML; None if a cell has no explicit reference
+
+    Tokens compare equal exactly when the cells read the same: shared
+    strings are resolved, and a number carries whether its style shows a date.
+    """
+    cells = {}
+    for attributes, value_xml in CELL.findall(content):
+        ref = CELL_REF.search(attributes)
+        if ref is None:
+            return None
+        code = codes.get(ref.group(1))
+        if code is None or not value_xml:
+            continue
+        kind = CELL_TYPE.search(attributes)
+        kind = kind.group(1) if kind else b'n'
+        if kind == b'inlineStr':
+            token = b''.join(INLINE_TEXT.findall(value_xml)).decode('utf-8')
+        else:
+            value = CELL_VALUE.search(value_xml)
+            if value is None or not value.group(1):
+                continue
+            if kind == b's':
+                token = str(strings[int(value.group(1))])
+            else:
+                style = CELL_STYLE.search(attributes)
+                token = (kind, value.group(1), style is not None and int(style.group(1)) in date_styles)
+        # Empty text reads as an empty cell, like in frame_from_rows
+        if token != '':
+            cells[code] = token
+    return cells
+
+
+def diff_sheets(previous, workbook, sheet_name):
+    """SheetDiff of a sheet between two open workbooks, from their raw XML
+
+    Rows are compared as XML first. When both workbooks share the same
+    string table and date styles, equal XML means equal values and only the
+    rows that differ are compared cell by cell. Returns None if the column
+    codes on the header row differ or the XML cannot be diffed.
+    """
+    column_mapping = workbook.header(sheet_name)
+    if previous.header(sheet_name) != column_mapping:
+        return None
+    old_rows, new_rows = sheet_rows(previous, sheet_name), sheet_rows(workbook, sheet_name)
+    if old_rows is None or new_rows is None:
+        return None
+    codes = {column_letter(position).encode(): code for position, code in column_mapping.items()}
+    same_tables = (previous.shared_strings == workbook.shared_strings
+                   and previous.date_styles == workbook.date_styles)
+    changed, removed, added = {}, [], []
+    for row in old_rows.keys() | new_rows.keys():
+        old_xml, new_xml = old_rows.get(row, b''), new_rows.get(row, b'')
+        if row < DATA_START_ROW or (same_tables and old_xml == new_xml):
+            continue
+        old = row_cells(old_xml, codes, previous.shared_strings, previous.date_styles)
+        new = row_cells(new_xml, codes, workbook.shared_strings, workbook.date_styles)
+        if old is None or new is None:
+            return None
+        if old == new:
+            continue
+        if not new:
+            removed.append(row)
+            continue
+        if not old:
+            # A new row's empty cells are new too
+            added.append(row)
+            columns = column_mapping.values()
+        else:
+            columns = [c for c in old.keys() | new.keys() if old.get(c) != new.get(c)]
+        for column in columns:
+            changed.setdefault(column, []).append(row)
+    return SheetDiff({column: np.unique(np.asarray(rows, dtype=np.int64)) for column, rows in changed.items()},
+                     np.unique(np.asarray(removed, dtype=np.int64)), np.unique(np.asarray(added, dtype=np.int64)))
+
+
+def load_results(path):
+    """validate_file results saved as JSON, also with the CLI's "Validation Results:" line before it"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    return json.loads(text[text.index('{'):])
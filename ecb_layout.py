@@ -0,0 +1,148 @@
+"""
+ECB Table Layout Index
+Reads the annotated DORA table layout workbook once into an index of every
+template's row-6 column codes, their data types and domains, and the header
+row and first column offsets. The index lets a sheet's structure be checked
+from its header row alone, before any data row is parsed.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_LAYOUT = Path(__file__).with_name('20241217 Annotated Table Layout  DORADORA 4.0.xlsx')
+
+LAYOUT_HEADER_ROW = 6  # column codes (0010, 0020, ...) on row 6 of each B_xx.xx sheet
+LAYOUT_TYPE_ROW = 7  # "480191_x000D_\n<type hint>" under each code
+LAYOUT_PROPERTY_ROW = 8  # main property and key dimensions from row 8, e.g. "... [CT:CT7]"
+LAYOUT_SHEET = re.compile(r'^B_\d{2}\.\d{2}$')
+DOMAIN_REFERENCE = re.compile(r'\[(\w+):(\w+)\]')
+
+# Type hints of the layout and the data type they stand for
+TYPE_HINTS = {'text': 'text', 'yyyy-mm-dd': 'date', '#': 'integer', '€£$': 'monetary', 'TRUE': 'boolean'}
+
+
+@dataclass(frozen=True)
+class Domain:
+    """A column's DPM domain (CT) and the hierarchy (CT7) its members are drawn from"""
+    code: str
+    hierarchy: str
+
+    @property
+    def name(self):
+        return f"{self.code}:{self.hierarchy}"
+
+
+@dataclass(frozen=True)
+class ColumnLayout:
+    code: str  # c0010
+    position: int  # 0-based worksheet column
+    data_type: str  # text, date, integer, monetary, boolean, enumeration or key
+    domain: Domain = None
+
+
+@dataclass(frozen=True)
+class TableLayout:
+    table: str  # tB_05.01
+    header_row: int
+    first_column: int  # 0-based worksheet column of the first code
+    columns: tuple
+
+    @property
+    def codes(self):
+        return frozenset(column.code for column in self.columns)
+
+
+def data_type_from_hint(hint):
+    hint = str(hint or '').split('\n')[-1].strip()
+    if hint.startswith('['):
+        return 'enumeration'
+    if hint.startswith('<'):
+        return 'key'
+    return TYPE_HINTS.get(hint, 'text')
+
+
+def table_layout(table, rows):
+    """TableLayout of one layout sheet from its row tuples, or None if row 6 holds no codes"""
+    codes, hints, domains = {}, {}, {}
+    for row_number, row in enumerate(rows, start=1):
+        if row_number == LAYOUT_HEADER_ROW:
+            codes = {i: 'c' + str(code) for i, code in enumerate(row) if code is not None and str(code).isdigit()}
+        elif row_number == LAYOUT_TYPE_ROW:
+            hints = {i: data_type_from_hint(row[i] if i < len(row) else None) for i in codes}
+        elif row_number >= LAYOUT_PROPERTY_ROW:
+            for i in codes:
+                cell = row[i] if i < len(row) else None
+                if i not in domains and isinstance(cell, str):
+                    match = DOMAIN_REFERENCE.search(cell)
+                    if match:
+                        domains[i] = Domain(*match.groups())
+    if not codes:
+        return None
+    columns = tuple(ColumnLayout(code, i, hints.get(i, 'text'), domains.get(i)) for i, code in codes.items())
+    return TableLayout(table, LAYOUT_HEADER_ROW, min(codes), columns)
+
+
+class LayoutIndex:
+    """Expected structure of every DORA template, by sheet name (tB_05.01)"""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    @classmethod
+    def load(cls, layout=DEFAULT_LAYOUT):
+        from openpyxl import load_workbook
+        workbook = load_workbook(layout, read_only=True)
+        try:
+            tables = {}
+            for worksheet in workbook.worksheets:
+                if LAYOUT_SHEET.match(worksheet.title):
+                    worksheet.reset_dimensions()
+                    layout = table_layout('t' + worksheet.title, worksheet.iter_rows(values_only=True))
+                    if layout is not None:
+                        tables[layout.table] = layout
+        finally:
+            workbook.close()
+        return cls(tables)
+
+    def fingerprint(self):
+        """Content hash, so cached results are not reused across different layouts"""
+        return hashlib.sha256(repr(sorted(self.tables.items())).encode('utf-8')).hexdigest()
+
+    def __contains__(self, table):
+        return table in self.tables
+
+    def get(self, table):
+        return self.tables.get(table)
+
+    def structure_problems(self, table, column_mapping):
+        """[(column or None, problem)] for a sheet's header; empty if the structure is sound
+
+        column_mapping maps 0-based worksheet columns to the cNNNN codes read
+        from the header row. Templates may leave columns out, but every code
+        must belong to the template and the codes must start where the
+        template's do.
+        """
+        layout = self.tables.get(table)
+        if layout is None:
+            return [(None, f"{table} is not a template of the table layout")]
+        if not column_mapping:
+            return [(None, f"no column codes on row {layout.header_row}")]
+        problems = [(code, f"column {code} is not part of {table}")
+                    for code in column_mapping.values() if code not in layout.codes]
+        first = min(column_mapping)
+        if first != layout.first_column:
+            problems.append((column_mapping[first], f"column codes start in column {column_letter(first)}, "
+                                                    f"expected {column_letter(layout.first_column)}"))
+        return problems
+
+
+def column_letter(position):
+    """Excel letter of a 0-based column position"""
+    letters = ''
+    position += 1
+    while position:
+        position, remainder = divmod(position - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
@@ -0,0 +1,178 @@
+"""
+ECB Validation Profiling
+Opt-in instrumentation of a validation run: wall time and rows of every
+pipeline stage (open, map columns, parse, evaluate, references, report) per
+sheet, and wall time, rows scanned and violations found per rule and sheet.
+A run's Profile is exported as JSON next to validate_file's result; the
+service folds the profiles of all runs into Prometheus counters and
+histograms.
+"""
+
+import time
+from contextlib import contextmanager
+
+# Histogram buckets in seconds, from a small sheet to a very large workbook
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class StageTimer:
+    """Handed out by Profile.stage so the caller can record the rows the stage handled"""
+    __slots__ = ('rows',)
+
+    def __init__(self):
+        self.rows = 0
+
+
+class Profile:
+    """Stage and rule timings of one validation run, summed per (sheet, stage) and (sheet, rule)"""
+
+    enabled = True
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}  # {(sheet, stage): [seconds, rows, calls]}
+        self.rules = {}  # {(sheet, rule_id): [seconds, rows, violations, calls]}
+
+    @contextmanager
+    def stage(self, stage, sheet=None):
+        timer = StageTimer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            self.add_stage(stage, sheet, time.perf_counter() - start, timer.rows)
+
+    def add_stage(self, stage, sheet, seconds, rows=0, calls=1):
+        entry = self.stages.setdefault((sheet, stage), [0.0, 0, 0])
+        entry[0] += seconds
+        entry[1] += rows
+        entry[2] += calls
+
+    def rule(self, sheet, rule_id, seconds, rows, violations, calls=1):
+        entry = self.rules.setdefault((sheet, rule_id), [0.0, 0, 0, 0])
+        entry[0] += seconds
+        entry[1] += rows
+        entry[2] += violations
+        entry[3] += calls
+
+    def update(self, profile):
+        """Add the stages and rules of another run's to_dict(), e.g. from a worker process"""
+        for entry in profile['stages']:
+            self.add_stage(entry['stage'], entry['sheet'], entry['seconds'], entry['rows'], entry['calls'])
+        for entry in profile['rules']:
+            self.rule(entry['sheet'], entry['rule_id'], entry['seconds'], entry['rows'], entry['violations'],
+                      entry['calls'])
+
+    def to_dict(self):
+        """JSON form: total seconds, then stages and rules in the order they first ran"""
+        return {'seconds': time.perf_counter() - self.started,
+                'stages': [{'stage': stage, 'sheet': sheet, 'seconds': seconds, 'rows': rows, 'calls': calls}
+                           for (sheet, stage), (seconds, rows, calls) in self.stages.items()],
+                'rules': [{'rule_id': rule_id, 'sheet': sheet, 'seconds': seconds, 'rows': rows,
+                           'violations': violations, 'calls': calls}
+                          for (sheet, rule_id), (seconds, rows, violations, calls) in self.rules.items()]}
+
+
+class NullProfile:
+    """Stands in for a Profile when profiling is off; records nothing"""
+
+    enabled = False
+
+    @contextmanager
+    def stage(self, stage, sheet=None):
+        yield StageTimer()
+
+    def add_stage(self, stage, sheet, seconds, rows=0, calls=1):
+        pass
+
+    def rule(self, sheet, rule_id, seconds, rows, violations, calls=1):
+        pass
+
+    def update(self, profile):
+        pass
+
+
+NULL_PROFILE = NullProfile()
+
+
+def _number(value):
+    # Every digit: the 'g' format would round counts of a million rows and more to six
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 2 ** 53 else repr(value)
+
+
+def _labels(labels):
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}' if labels else ''
+
+
+class PrometheusMetrics:
+    """Counters and histograms over many validation runs, in the Prometheus text exposition format
+
+    Rule metrics are labelled by rule ID and stage histograms by stage;
+    sheets are left out of the labels, as uploads may name them freely.
+    """
+
+    COUNTERS = {
+        'ecb_validations_total': "Workbooks validated",
+        'ecb_rule_seconds_total': "Time spent evaluating each rule",
+        'ecb_rule_rows_total': "Rows each rule was evaluated on",
+        'ecb_rule_violations_total': "Failing cells found by each rule",
+        'ecb_stage_rows_total': "Rows handled by each pipeline stage",
+    }
+    HISTOGRAMS = {
+        'ecb_validation_seconds': "Wall time of a workbook validation",
+        'ecb_stage_seconds': "Wall time of a pipeline stage per workbook",
+    }
+
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counters = {}  # {(name, labels): value}
+        self.histograms = {}  # {(name, labels): [bucket counts..., sum, count]}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                histogram[i] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+    def observe_run(self, seconds, profile=None):
+        """Count one validation of `seconds`, with its Profile.to_dict() if it was profiled"""
+        self.inc('ecb_validations_total')
+        self.observe('ecb_validation_seconds', seconds)
+        if profile is None:
+            return
+        by_stage = {}
+        for entry in profile['stages']:
+            by_stage[entry['stage']] = by_stage.get(entry['stage'], 0.0) + entry['seconds']
+            self.inc('ecb_stage_rows_total', entry['rows'], stage=entry['stage'])
+        for stage, stage_seconds in by_stage.items():
+            self.observe('ecb_stage_seconds', stage_seconds, stage=stage)
+        for entry in profile['rules']:
+            self.inc('ecb_rule_seconds_total', entry['seconds'], rule_id=entry['rule_id'])
+            self.inc('ecb_rule_rows_total', entry['rows'], rule_id=entry['rule_id'])
+            self.inc('ecb_rule_violations_total', entry['violations'], rule_id=entry['rule_id'])
+
+    def exposition(self):
+        lines = []
+        for name, help_text in self.COUNTERS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f"{name}{_labels(labels)} {_number(value)}"
+                      for (metric, labels), value in sorted(self.counters.items()) if metric == name]
+        for name, help_text in self.HISTOGRAMS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (metric, labels), histogram in sorted(self.histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(self.buckets, histogram):
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', f'{bound:g}'),))} {count}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram[-1]}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(histogram[-2])}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram[-1]}")
+        return '\n'.join(lines) + '\n'
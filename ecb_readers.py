@@ -0,0 +1,384 @@
+"""
+ECB Workbook Readers
+Backends that stream the raw cell values of a workbook's sheets for
+WorkbookReader:
+
+- openpyxl: openpyxl in read-only mode
+- xml: walks each sheet's XML with iterparse, resolving text through the
+  shared-string table, and converts only the cells of the requested rows
+  and columns
+- calamine: the Rust calamine reader (python-calamine), when it is installed
+
+Every backend gives a cell the value openpyxl would: int or float for
+numbers, datetime for date-styled numbers, bool, text, and None for an
+empty cell. 'auto' picks calamine if it is installed, otherwise xml; when
+the sheets are streamed in chunks it picks xml, since calamine reads a
+sheet whole.
+"""
+
+import datetime
+import importlib.util
+import posixpath
+import zipfile
+from xml.etree import ElementTree
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PACKAGE_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+READERS = ('auto', 'xml', 'openpyxl', 'calamine')
+
+ROW_TAG = NS_MAIN + 'row'
+VALUE_TAG = NS_MAIN + 'v'
+INLINE_STRING_TAG = NS_MAIN + 'is'
+TEXT_TAG = NS_MAIN + 't'
+RUN_TAG = NS_MAIN + 'r'
+SHEET_DATA_TAG = NS_MAIN + 'sheetData'
+DIGITS = '0123456789'
+
+
+def sheet_parts(archive):
+    """Map sheet names to their worksheet XML part inside the .xlsx archive"""
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    targets = _workbook_targets(archive)
+    return {sheet.get('name'): targets[sheet.get(NS_REL + 'id')][1]
+            for sheet in workbook.iter(NS_MAIN + 'sheet')}
+
+
+def _workbook_targets(archive):
+    """{relationship id: (type, part)} of the workbook part"""
+    rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {}
+    for rel in rels.iter(NS_PACKAGE_REL + 'Relationship'):
+        target = rel.get('Target')
+        target = target.lstrip('/') if target.startswith('/') else posixpath.join('xl', target)
+        targets[rel.get('Id')] = (rel.get('Type', ''), posixpath.normpath(target))
+    return targets
+
+
+def text_content(element):
+    """Plain text of a shared or inline string: its <t> and the <t> of its rich text runs, as openpyxl reads it"""
+    parts = [element.findtext(TEXT_TAG) or '']
+    parts.extend(run.findtext(TEXT_TAG) or '' for run in element.iter(RUN_TAG))
+    return ''.join(parts)
+
+
+def calamine_available():
+    return importlib.util.find_spec('python_calamine') is not None
+
+
+def resolve_reader(reader='auto', streaming=False):
+    """The backend a reader name stands for; 'auto' never picks calamine for a streaming read"""
+    if reader == 'auto':
+        return 'calamine' if calamine_available() and not streaming else 'xml'
+    return reader
+
+
+def open_reader(file_path, reader='auto'):
+    """Open a workbook with the named backend"""
+    reader = resolve_reader(reader)
+    if reader == 'xml':
+        return XmlReader(file_path)
+    if reader == 'openpyxl':
+        return OpenpyxlReader(file_path)
+    if reader == 'calamine':
+        return CalamineReader(file_path)
+    raise ValueError(f"reader must be one of {', '.join(READERS)}, got {reader!r}")
+
+
+class XlsxPackage:
+    """The parts of an .xlsx package: sheet XML, shared strings and cell styles, each read on first use"""
+
+    def __init__(self, file_path):
+        self.archive = zipfile.ZipFile(file_path)
+        self.sheet_parts = sheet_parts(self.archive)
+        self._targets = None
+        self._shared_strings = None
+        self._styles = None
+
+    def close(self):
+        self.archive.close()
+
+    @property
+    def sheet_names(self):
+        return list(self.sheet_parts)
+
+    def sheet_xml(self, sheet_name):
+        return self.archive.read(self.sheet_parts[sheet_name])
+
+    def open_sheet(self, sheet_name):
+        return self.archive.open(self.sheet_parts[sheet_name])
+
+    def _part(self, kind):
+        """The workbook's part of a relationship type (sharedStrings, styles), or None"""
+        if self._targets is None:
+            self._targets = _workbook_targets(self.archive)
+        for rel_type, part in self._targets.values():
+            if rel_type.endswith('/' + kind) and part in self.archive.NameToInfo:
+                return part
+        return None
+
+    @property
+    def shared_strings(self):
+        if self._shared_strings is None:
+            strings = []
+            part = self._part('sharedStrings')
+            if part is not None:
+                with self.archive.open(part) as source:
+                    for _, element in ElementTree.iterparse(source):
+                        if element.tag == NS_MAIN + 'si':
+                            strings.append(text_content(element).replace('x005F_', ''))
+                            element.clear()
+            self._shared_strings = strings
+        return self._shared_strings
+
+    @property
+    def date_styles(self):
+        """Indices of the cell styles whose number format shows a date"""
+        return self._cell_styles()[0]
+
+    @property
+    def timedelta_styles(self):
+        return self._cell_styles()[1]
+
+    @property
+    def epoch(self):
+        from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+        workbook = ElementTree.fromstring(self.archive.read('xl/workbook.xml'))
+        properties = workbook.find(NS_MAIN + 'workbookPr')
+        date1904 = properties is not None and properties.get('date1904') in ('1', 'true')
+        return CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+    def _cell_styles(self):
+        """(date styles, timedelta styles), judged by openpyxl's own number format tests"""
+        if self._styles is None:
+            from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+            dates, timedeltas = set(), set()
+            part = self._part('styles')
+            if part is not None:
+                styles = ElementTree.fromstring(self.archive.read(part))
+                custom = {int(fmt.get('numFmtId')): fmt.get('formatCode')
+                          for fmt in styles.iter(NS_MAIN + 'numFmt')}
+                cell_xfs = styles.find(NS_MAIN + 'cellXfs')
+                for index, xf in enumerate(cell_xfs if cell_xfs is not None else ()):
+                    number_format = int(xf.get('numFmtId', 0))
+                    code = custom[number_format] if number_format in custom else builtin_format_code(number_format)
+                    if is_date_format(code):
+                        dates.add(index)
+                    if is_timedelta_format(code):
+                        timedeltas.add(index)
+            self._styles = dates, timedeltas
+        return self._styles
+
+
+def column_number(letters):
+    """1-based column number of column letters such as 'D' or 'AB'"""
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord('A') + 1
+    return number
+
+
+class XmlReader(XlsxPackage):
+    """Streams a sheet's rows straight from its XML
+
+    Rows before min_row are skipped without looking at their cells, reading
+    stops after max_row, and only the cells between min_col and max_col are
+    converted to values.
+    """
+
+    def iter_rows(self, sheet_name, min_row=1, max_row=None, min_col=None, max_col=None):
+        """Value tuples like openpyxl's read-only iter_rows(values_only=True), missing rows included"""
+        min_col = min_col or 1
+        empty_row = (None,) * (max_col + 1 - min_col) if max_col else ()
+        counter = min_row
+        for row_number, cells, last_column in self._rows(sheet_name, min_row, min_col, max_col):
+            if max_row is not None and row_number > max_row:
+                yield from (empty_row for _ in range(counter, max_row + 1))
+                return
+            while counter < row_number:
+                counter += 1
+                yield empty_row
+            if not last_column and not max_col:
+                yield ()
+            else:
+                # openpyxl sizes a row without max_col by its last cell
+                values = [None] * ((max_col or last_column) + 1 - min_col)
+                for column, value in cells:
+                    if column - min_col < len(values):
+                        values[column - min_col] = value
+                yield tuple(values)
+            counter += 1
+
+    def _rows(self, sheet_name, min_row, min_col, max_col):
+        """(Excel row, [(column, value)] of the cells from min_col to max_col, column of the last cell)
+        per <row> element from min_row on"""
+        from openpyxl.utils.datetime import from_excel, from_ISO8601
+        value_of, strings, dates, timedeltas, epoch = (self._value, self.shared_strings, self.date_styles,
+                                                       self.timedelta_styles, self.epoch)
+        columns = {}  # column letters -> number
+        row_number = 0
+        with self.open_sheet(sheet_name) as source:
+            sheet_data = None
+            for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+                if event == 'start':
+                    if element.tag == SHEET_DATA_TAG:
+                        sheet_data = element
+                    continue
+                if element.tag != ROW_TAG:
+                    continue
+                reference = element.get('r')
+                row_number = int(float(reference)) if reference else row_number + 1
+                if row_number >= min_row:
+                    cells, column = [], 0
+                    for cell in element:
+                        reference = cell.get('r')
+                        if reference:
+                            letters = reference.rstrip(DIGITS)
+                            column = columns.get(letters) or columns.setdefault(letters, column_number(letters))
+                        else:
+                            column += 1
+                        if column >= min_col and (max_col is None or column <= max_col):
+                            cells.append((column, value_of(cell, strings, dates, timedeltas, epoch,
+                                                           from_excel, from_ISO8601)))
+                    yield row_number, cells, column
+                element.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()  # drop the parsed rows from the tree
+
+    @staticmethod
+    def _value(cell, strings, dates, timedeltas, epoch, from_excel, from_ISO8601):
+        """A cell's value, converted as openpyxl's WorkSheetParser.parse_cell does with data_only=True"""
+        data_type = cell.get('t', 'n')
+        if data_type == 'inlineStr':
+            text = cell.find(INLINE_STRING_TAG)
+            return text_content(text) if text is not None else None
+        value = cell.findtext(VALUE_TAG) or None
+        if value is None:
+            return None
+        if data_type == 'n':
+            value = float(value) if '.' in value or 'E' in value or 'e' in value else int(value)
+            style = cell.get('s')
+            style = int(style) if style else 0
+            if style in dates:
+                try:
+                    return from_excel(value, epoch, timedelta=style in timedeltas)
+                except (OverflowError, ValueError):
+                    return '#VALUE!'
+            return value
+        if data_type == 's':
+            return strings[int(value)]
+        if data_type == 'b':
+            return bool(int(value))
+        if data_type == 'd':
+            return from_ISO8601(value)
+        return value
+
+
+class OpenpyxlReader:
+    """openpyxl in read-only mode
+
+    A read-only openpyxl workbook hands its shared-string table to the
+    worksheets and leaves workbook.shared_strings empty, so the table and the
+    raw sheet XML are read from the package directly.
+    """
+
+    def __init__(self, file_path):
+        from openpyxl import load_workbook
+        self.file_path = file_path
+        self.workbook = load_workbook(file_path, read_only=True, data_only=True)
+        self._package = None
+
+    def close(self):
+        self.workbook.close()
+        if self._package is not None:
+            self._package.close()
+
+    @property
+    def sheet_names(self):
+        return self.workbook.sheetnames
+
+    @property
+    def package(self):
+        if self._package is None:
+            self._package = XlsxPackage(self.file_path)
+        return self._package
+
+    @property
+    def shared_strings(self):
+        return self.package.shared_strings
+
+    @property
+    def date_styles(self):
+        return self.workbook._date_formats
+
+    def sheet_xml(self, sheet_name):
+        return self.package.sheet_xml(sheet_name)
+
+    def iter_rows(self, sheet_name, min_row=1, max_row=None, min_col=None, max_col=None):
+        worksheet = self.workbook[sheet_name]
+        worksheet.reset_dimensions()  # dimension tags in uploads are often wrong
+        return worksheet.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col,
+                                   values_only=True)
+
+
+class CalamineReader:
+    """python-calamine: each sheet is read whole into Python lists, the last one read is kept
+
+    Calamine reports empty cells as '', every number as float and whole-day
+    dates as date; they are converted to what openpyxl reads. The package
+    parts for fingerprints and diffs are read from the .xlsx directly.
+    """
+
+    def __init__(self, file_path):
+        from python_calamine import CalamineWorkbook
+        self.file_path = file_path
+        self.workbook = CalamineWorkbook.from_path(str(file_path))
+        self.package = XlsxPackage(file_path)
+        self._sheet = None  # (name, rows) of the last sheet read
+
+    def close(self):
+        close = getattr(self.workbook, 'close', None)
+        if close is not None:
+            close()
+        self.package.close()
+
+    @property
+    def sheet_names(self):
+        return list(self.workbook.sheet_names)
+
+    @property
+    def shared_strings(self):
+        return self.package.shared_strings
+
+    @property
+    def date_styles(self):
+        return self.package.date_styles
+
+    def sheet_xml(self, sheet_name):
+        return self.package.sheet_xml(sheet_name)
+
+    def _rows(self, sheet_name):
+        if self._sheet is None or self._sheet[0] != sheet_name:
+            sheet = self.workbook.get_sheet_by_name(sheet_name)
+            self._sheet = sheet_name, sheet.to_python(skip_empty_area=False)
+        return self._sheet[1]
+
+    def iter_rows(self, sheet_name, min_row=1, max_row=None, min_col=None, max_col=None):
+        min_col = min_col or 1
+        width = max_col + 1 - min_col if max_col else 0
+        for row in self._rows(sheet_name)[min_row - 1:max_row]:
+            values = [_calamine_value(value) for value in row[min_col - 1:max_col]]
+            if len(values) < width:
+                values += [None] * (width - len(values))
+            yield tuple(values)
+
+
+def _calamine_value(value):
+    """A calamine cell value as openpyxl reads it: None for empty cells, int for whole numbers, datetime for dates"""
+    if value == '':
+        return None
+    if type(value) is float and value.is_integer():
+        return int(value)
+    if type(value) is datetime.date:
+        return datetime.datetime.combine(value, datetime.time())
+    return value
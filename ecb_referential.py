@@ -0,0 +1,162 @@
+"""
+ECB Referential Integrity
+Cross-table checks on the keys that link the DORA register templates: every
+contractual arrangement reference, entity LEI and ICT third-party service
+provider code used in a dependent table must exist in the table that
+defines it. Each referenced key gets one hash index per workbook and the
+foreign keys are looked up in it in bulk.
+"""
+
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    """`columns` of `table` must match a row of `ref_columns` in `ref_table`"""
+    rule_id: str
+    table: str
+    columns: tuple
+    ref_table: str
+    ref_columns: tuple
+    description: str
+
+
+# Provider codes are only unique together with their code type (LEI, EUID, ...)
+FOREIGN_KEYS = (
+    ForeignKey('ECB_REF_001', 'tB_02.02', ('c0010',), 'tB_02.01', ('c0010',),
+               "contractual arrangement reference number"),
+    ForeignKey('ECB_REF_002', 'tB_07.01', ('c0010',), 'tB_02.01', ('c0010',),
+               "contractual arrangement reference number"),
+    ForeignKey('ECB_REF_003', 'tB_02.02', ('c0020',), 'tB_01.02', ('c0010',),
+               "LEI of the entity making use of the ICT services"),
+    ForeignKey('ECB_REF_004', 'tB_02.02', ('c0030', 'c0040'), 'tB_05.01', ('c0010', 'c0020'),
+               "ICT third-party service provider code and code type"),
+    ForeignKey('ECB_REF_005', 'tB_07.01', ('c0020', 'c0030'), 'tB_05.01', ('c0010', 'c0020'),
+               "ICT third-party service provider code and code type"),
+)
+
+
+def key_columns(foreign_keys=FOREIGN_KEYS):
+    """{table: sorted key columns} over both sides of the foreign keys"""
+    columns = {}
+    for fk in foreign_keys:
+        columns.setdefault(fk.table, set()).update(fk.columns)
+        columns.setdefault(fk.ref_table, set()).update(fk.ref_columns)
+    return {table: sorted(codes) for table, codes in columns.items()}
+
+
+KEY_COLUMNS = key_columns()
+
+
+def select_keys(table, frame):
+    """The columns of `frame` that take part in the cross-table keys of `table`"""
+    return frame[[c for c in KEY_COLUMNS.get(table, ()) if c in frame.columns]]
+
+
+# Stands in for the rule-set hash when a sheet's key columns are kept in the result cache
+KEYS_HASH = hashlib.sha256(repr(sorted(KEY_COLUMNS.items())).encode('utf-8')).hexdigest()
+
+
+def keys_to_dict(keys):
+    """JSON-serializable form of a frame from select_keys, for the result cache
+
+    Float columns keep their numbers, so _key_text still sees whole-number
+    keys; any other column is stored as the strings _key_text would make.
+    """
+    columns = {}
+    for code in keys.columns:
+        series = keys[code]
+        numeric = pd.api.types.is_float_dtype(series)
+        values = series.astype(object) if numeric else series.astype(str).astype(object)
+        columns[code] = {'float': numeric, 'values': values.where(series.notna(), None).tolist()}
+    return {'rows': keys.index.tolist(), 'columns': columns}
+
+
+def keys_from_dict(data):
+    """The frame keys_to_dict stored"""
+    index = pd.Index(data['rows'], dtype=np.int64)
+    return pd.DataFrame({code: pd.Series(column['values'], index=index, dtype=float if column['float'] else object)
+                         for code, column in data['columns'].items()}, index=index)
+
+
+def references_fingerprint(fingerprints, foreign_keys=FOREIGN_KEYS):
+    """Cache key for the reference checks of a workbook, from its key tables' sheet fingerprints"""
+    digest = hashlib.sha256(repr(foreign_keys).encode('utf-8'))
+    for table in sorted(fingerprints):
+        digest.update(f"\0{table}\0{fingerprints[table]}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _key_text(series):
+    # Whole-number keys read as float64 compare as "123", like text or object cells
+    if pd.api.types.is_float_dtype(series) and (series % 1 == 0).all():
+        series = series.astype(np.int64)
+    return series.astype(str).str.strip()
+
+
+def normalized_keys(frame, columns):
+    """Key columns as stripped strings, without the rows where any key part is empty"""
+    keys = frame[list(columns)]
+    keys = keys[keys.notna().all(axis=1)].apply(_key_text)
+    return keys[(keys != '').all(axis=1)]
+
+
+def _as_index(keys):
+    if keys.shape[1] == 1:
+        return pd.Index(keys.iloc[:, 0])
+    return pd.MultiIndex.from_frame(keys)
+
+
+class KeyIndex:
+    """Hash index over the distinct keys of a referenced table"""
+
+    def __init__(self, keys):
+        self.index = _as_index(keys).unique()
+
+    def __len__(self):
+        return len(self.index)
+
+    def contains(self, keys):
+        """Boolean array: which rows of `keys` exist in the index"""
+        return _as_index(keys).isin(self.index)
+
+
+def check_references(frames, foreign_keys=FOREIGN_KEYS):
+    """Check foreign keys across the key-column frames of one workbook
+
+    frames maps table codes to frames indexed by Excel row. Returns
+    (violations, skipped): violations is a list of (ForeignKey, failing Excel rows),
+    skipped a list of (ForeignKey, reason) for keys whose table or columns
+    are missing. Tables absent from `frames` have no rows to check.
+    """
+    indexes, violations, skipped = {}, [], []
+    for fk in foreign_keys:
+        frame = frames.get(fk.table)
+        if frame is None or not len(frame):
+            continue
+        missing = [c for c in fk.columns if c not in frame.columns]
+        if missing:
+            skipped.append((fk, f"missing column {missing[0]}"))
+            continue
+        target = (fk.ref_table, fk.ref_columns)
+        if target not in indexes:
+            ref_frame = frames.get(fk.ref_table)
+            if ref_frame is None:
+                indexes[target] = f"missing table {fk.ref_table}"
+            elif not all(c in ref_frame.columns for c in fk.ref_columns):
+                indexes[target] = f"missing column in {fk.ref_table}"
+            else:
+                indexes[target] = KeyIndex(normalized_keys(ref_frame, fk.ref_columns))
+        index = indexes[target]
+        if isinstance(index, str):
+            skipped.append((fk, index))
+            continue
+        keys = normalized_keys(frame, fk.columns)
+        failing = keys.index[~index.contains(keys)]
+        if len(failing):
+            violations.append((fk, failing.to_numpy(dtype=np.int64)))
+    return violations, skipped
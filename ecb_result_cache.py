@@ -0,0 +1,68 @@
+"""
+ECB Result Cache
+Persistent on-disk cache of per-sheet validation results keyed by
+(sheet fingerprint, rule-set hash), with size-bounded LRU eviction. The
+fingerprint covers the sheet's name as well as its content.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ResultCache:
+    """One JSON file per entry; file modification time records last use"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def _path(self, sheet_hash, ruleset_hash):
+        return self.directory / f"{sheet_hash}-{ruleset_hash}.json"
+
+    def get(self, sheet_hash, ruleset_hash):
+        """Cached sheet_results, or None"""
+        path = self._path(sheet_hash, ruleset_hash)
+        try:
+            with open(path, encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(path)  # mark as recently used
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def put(self, sheet_hash, ruleset_hash, sheet_results):
+        """Store sheet_results atomically, then evict down to max_bytes"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(sheet_results, f)
+            os.replace(tmp_path, self._path(sheet_hash, ruleset_hash))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
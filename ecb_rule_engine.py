@@ -0,0 +1,835 @@
+"""
+ECB Rule Engine
+Parses ECB/DPM validation rule expressions into an AST once, lowers them to
+closures that compute whole-column boolean masks over a sheet's data rows
+(no per-row Python loops), and caches the compiled rules process-wide
+"""
+
+import datetime
+import hashlib
+import re
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from ecb_code_lists import MEMBERS
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<string>"[^"]*")
+  | (?P<brace>\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\})
+  | (?P<get>\[get\s+\w+\])
+  | (?P<member>\[\w+:\w+\])
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<ident>[A-Za-z_][\w.]*)
+  | (?P<op>!=|>=|<=|=|>|<|\+|-|\(|\)|,|:)
+''', re.VERBOSE)
+
+ENGINE_VERSION = 5  # bump when evaluation semantics change, to invalidate cached results
+COMPARISON_OPS = ('=', '!=', '>=', '<=', '>', '<')
+NULL_LITERALS = ('null', 'empty')
+COLUMN_CODE = re.compile(r'^c\d{4}$')
+TABLE_CODE = re.compile(r'tB_\d{2}\.\d{2}')
+EQUALITY_TOLERANCE = 0.005  # = and != treat amounts within half a cent as equal, whatever their size
+LEI_PATTERN = '^[A-Z0-9]{18}[0-9]{2}$'  # match() with this pattern also checks the ISO 17442 check digits
+
+
+class RuleSyntaxError(ValueError):
+    """Raised when a rule expression cannot be parsed"""
+
+
+def tokenize(expression):
+    """Split a rule expression into (kind, text) tokens"""
+    tokens = []
+    pos = 0
+    while pos < len(expression):
+        match = TOKEN_PATTERN.match(expression, pos)
+        if not match:
+            raise RuleSyntaxError(f"Unexpected character {expression[pos]!r} at {pos}")
+        kind = match.lastgroup
+        if kind != 'ws':
+            tokens.append((kind, match.group()))
+        pos = match.end()
+    return tokens
+
+
+def expand_column_range(start, end, available):
+    """Columns of `available` between two cNNNN codes, inclusive"""
+    low, high = int(start[1:]), int(end[1:])
+    return [c for c in sorted(available) if COLUMN_CODE.match(c) and low <= int(c[1:]) <= high]
+
+
+class Truth:
+    """Three-valued (true/false/null) boolean column"""
+
+    def __init__(self, value, null=None):
+        self.value = np.asarray(value, dtype=bool)
+        self.null = np.zeros(len(self.value), dtype=bool) if null is None else np.asarray(null, dtype=bool)
+
+    def known_false(self):
+        return ~self.value & ~self.null
+
+    def known_true(self):
+        return self.value & ~self.null
+
+    def invert(self):
+        return Truth(~self.value, self.null)
+
+    def both(self, other):
+        false = self.known_false() | other.known_false()
+        return Truth(self.value & other.value, (self.null | other.null) & ~false)
+
+    def either(self, other):
+        true = self.known_true() | other.known_true()
+        return Truth(self.value | other.value, (self.null | other.null) & ~true)
+
+
+class Member(str):
+    """DPM domain member literal such as eba_CT:x318"""
+
+
+# AST
+
+@dataclass(frozen=True)
+class Column:
+    code: str
+    table: str = None
+
+
+@dataclass(frozen=True)
+class ColumnGroup:
+    """Multi-column reference: {(c0020, c0030)}, {c0020-0090} or {c*}"""
+    kind: str
+    codes: tuple
+
+    def members(self, available):
+        if self.kind == 'all':
+            return [c for c in available if COLUMN_CODE.match(c)]
+        if self.kind == 'range':
+            return expand_column_range(self.codes[0], self.codes[1], available)
+        return list(self.codes)
+
+
+@dataclass(frozen=True)
+class Literal:
+    value: object
+
+
+@dataclass(frozen=True)
+class Unary:
+    op: str
+    operand: object
+
+
+@dataclass(frozen=True)
+class Binary:
+    op: str
+    left: object
+    right: object
+
+
+@dataclass(frozen=True)
+class In:
+    operand: object
+    members: tuple
+
+
+@dataclass(frozen=True)
+class Call:
+    name: str
+    args: tuple
+
+
+@dataclass(frozen=True)
+class If:
+    condition: object
+    consequence: object
+
+
+@dataclass(frozen=True)
+class Rule:
+    table: str
+    default: float
+    body: object
+
+
+class Parser:
+    """Recursive-descent parser from tokens to a Rule AST"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def parse(self):
+        table, default = None, None
+        if self._accept_keyword('with'):
+            kind, text = self._next()
+            if kind != 'brace':
+                raise RuleSyntaxError("Expected {table, options} after 'with'")
+            table, default = self._with_options(text[1:-1])
+            self._expect_op(':')
+        body = self._body()
+        if self.pos != len(self.tokens):
+            raise RuleSyntaxError(f"Unexpected token {self.tokens[self.pos][1]!r}")
+        return Rule(table or self._first_table(body), default, body)
+
+    def _with_options(self, body):
+        parts = [p.strip() for p in body.split(',')]
+        default = None
+        for part in parts[1:]:
+            key, _, value = part.partition(':')
+            if key.strip() == 'default' and value.strip() != 'null':
+                default = float(value)
+        return parts[0], default
+
+    def _first_table(self, node):
+        if isinstance(node, Column):
+            return node.table
+        for child in _children(node):
+            table = self._first_table(child)
+            if table:
+                return table
+        return None
+
+    # Token helpers
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        if token[0] is None:
+            raise RuleSyntaxError("Unexpected end of expression")
+        self.pos += 1
+        return token
+
+    def _accept_keyword(self, word):
+        kind, text = self._peek()
+        if kind == 'ident' and text.lower() == word:
+            self.pos += 1
+            return True
+        return False
+
+    def _accept_op(self, op):
+        kind, text = self._peek()
+        if kind == 'op' and text == op:
+            self.pos += 1
+            return True
+        return False
+
+    def _expect_op(self, op):
+        if not self._accept_op(op):
+            raise RuleSyntaxError(f"Expected {op!r}, got {self._peek()[1]!r}")
+
+    # Grammar
+
+    def _body(self):
+        if self._accept_keyword('if'):
+            condition = self._or()
+            if not self._accept_keyword('then'):
+                raise RuleSyntaxError("Expected 'then'")
+            consequence = self._or()
+            self._accept_keyword('endif')
+            return If(condition, consequence)
+        return self._or()
+
+    def _or(self):
+        left = self._and()
+        while self._accept_keyword('or'):
+            left = Binary('or', left, self._and())
+        return left
+
+    def _and(self):
+        left = self._not()
+        while self._accept_keyword('and'):
+            left = Binary('and', left, self._not())
+        return left
+
+    def _not(self):
+        if self._accept_keyword('not'):
+            return Unary('not', self._not())
+        return self._comparison()
+
+    def _comparison(self):
+        left = self._additive()
+        kind, text = self._peek()
+        if kind == 'op' and text in COMPARISON_OPS:
+            self.pos += 1
+            return Binary(text, left, self._additive())
+        if self._accept_keyword('in'):
+            kind, text = self._next()
+            if kind != 'brace':
+                raise RuleSyntaxError("Expected {members} after 'in'")
+            return In(left, tuple(Member(m) for m in re.findall(r'\[(\w+:\w+)\]', text)))
+        return left
+
+    def _additive(self):
+        left = self._primary()
+        while True:
+            kind, text = self._peek()
+            if kind != 'op' or text not in ('+', '-'):
+                return left
+            self.pos += 1
+            left = Binary(text, left, self._primary())
+
+    def _primary(self):
+        kind, text = self._next()
+        if kind == 'op' and text == '(':
+            node = self._body()
+            self._expect_op(')')
+            return node
+        if kind == 'brace':
+            node = self._column_ref(text[1:-1].strip())
+            if self._peek()[0] == 'get':
+                self.pos += 1
+            return node
+        if kind == 'member':
+            return Literal(Member(text[1:-1]))
+        if kind == 'string':
+            literal = text[1:-1]
+            return Literal(None if literal in NULL_LITERALS else literal)
+        if kind == 'number':
+            return Literal(float(text))
+        if kind == 'ident':
+            word = text.lower()
+            if word in NULL_LITERALS:
+                return Literal(None)
+            if word in ('isnull', 'match', 'sum'):
+                return self._call(word)
+            if COLUMN_CODE.match(text):
+                return Column(text)
+        raise RuleSyntaxError(f"Unexpected token {text!r}")
+
+    def _call(self, name):
+        self._expect_op('(')
+        if name == 'sum':
+            start = self._next()[1]
+            self._expect_op(':')
+            end = self._next()[1]
+            args = (ColumnGroup('range', (start, end)),)
+        else:
+            args = (self._additive(),)
+            if name == 'match':
+                self._expect_op(',')
+                kind, pattern = self._next()
+                if kind != 'string':
+                    raise RuleSyntaxError("match() expects a pattern string")
+                args += (pattern[1:-1],)
+        self._expect_op(')')
+        return Call(name, args)
+
+    def _column_ref(self, body):
+        if body == 'c*':
+            return ColumnGroup('all', ())
+        range_match = re.match(r'^(c\d{4})-(\d{4})$', body)
+        if range_match:
+            return ColumnGroup('range', (range_match.group(1), 'c' + range_match.group(2)))
+        if TABLE_CODE.match(body):
+            table, _, column = [p.strip() for p in body.partition(',')]
+            return Column(column, table)
+        codes = [c.strip() for c in body.strip('()').split(',')]
+        if not all(COLUMN_CODE.match(c) for c in codes):
+            raise RuleSyntaxError(f"Unsupported column reference {{{body}}}")
+        return Column(codes[0]) if len(codes) == 1 else ColumnGroup('list', tuple(codes))
+
+
+def _children(node):
+    if isinstance(node, Rule):
+        return (node.body,)
+    if isinstance(node, Unary):
+        return (node.operand,)
+    if isinstance(node, Binary):
+        return (node.left, node.right)
+    if isinstance(node, If):
+        return (node.condition, node.consequence)
+    if isinstance(node, In):
+        return (node.operand,)
+    if isinstance(node, Call):
+        return tuple(a for a in node.args if not isinstance(a, str))
+    return ()
+
+
+def walk(node):
+    """Yield every node of an AST, depth first"""
+    yield node
+    for child in _children(node):
+        yield from walk(child)
+
+
+# Lowering to closures
+
+class Env:
+    """Evaluation environment: the sheet frame and the bound group column"""
+
+    def __init__(self, frame, column=None):
+        self.frame = frame
+        self.column = column
+        self.rows = len(frame)
+
+    def series(self, code):
+        if code not in self.frame.columns:
+            raise KeyError(code)
+        return self.frame[code]
+
+
+def _as_truth(value):
+    if not isinstance(value, Truth):
+        raise RuleSyntaxError("Expected a boolean expression")
+    return value
+
+
+def _as_series(value):
+    if not isinstance(value, pd.Series):
+        raise RuleSyntaxError("Expected a column reference")
+    return value
+
+
+def _as_text(value):
+    series = _as_series(value)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Strip each category once and keep the column categorical
+        labels, categories = pd.factorize(series.cat.categories.astype(str).str.strip())
+        if not len(categories):
+            return series
+        codes = series.cat.codes.to_numpy()
+        codes = np.where(codes < 0, -1, labels[codes])
+        return pd.Series(pd.Categorical.from_codes(codes, categories), index=series.index)
+    return series.where(series.isna(), series.astype(str).str.strip())
+
+
+def _date_cells(series):
+    """Mask of the date and datetime cells of an object column"""
+    cells = series.to_numpy()
+    dates = np.fromiter((isinstance(v, datetime.date) for v in cells), dtype=bool, count=len(cells))
+    return dates & series.notna().to_numpy()
+
+
+def _holds_dates(series):
+    """Whether a column holds dates: typed as dates, or an object column with date cells"""
+    return pd.api.types.is_datetime64_any_dtype(series) or (series.dtype == object and _date_cells(series).any())
+
+
+def _as_numbers(value):
+    """A column as float64: numbers as they are, dates as epoch seconds, anything else NaN
+
+    Date cells count as dates in an object column too, one that also holds
+    text, so a column gives the same numbers whether or not it was typed as dates.
+    """
+    series = _as_series(value)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        numbers = series.to_numpy().astype('datetime64[s]').astype(np.int64).astype(float)
+    elif isinstance(series.dtype, pd.CategoricalDtype):
+        categories = pd.to_numeric(series.cat.categories.astype(object), errors='coerce')
+        numbers = np.append(np.asarray(categories, dtype=float), np.nan)[series.cat.codes.to_numpy()]
+    elif series.dtype == object:
+        numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, copy=True)
+        dates = _date_cells(series)
+        if dates.any():
+            numbers[dates] = pd.to_datetime(series[dates]).to_numpy().astype('datetime64[s]').astype(np.int64)
+    else:
+        return pd.to_numeric(series, errors='coerce')
+    numbers[series.isna().to_numpy()] = np.nan
+    return pd.Series(numbers, index=series.index)
+
+
+def _unique_text(value):
+    """Factorize a column into (codes, stripped unique strings); nulls get code -1
+
+    Identifier columns repeat the same values many times, so checks run on the
+    uniques and are broadcast back through the codes.
+    """
+    codes, uniques = pd.factorize(_as_series(value))
+    return codes, pd.Series(uniques, dtype=object).astype(str).str.strip()
+
+
+@lru_cache(maxsize=None)
+def compiled_pattern(pattern):
+    return re.compile(pattern)
+
+
+def lei_checksum_valid(values):
+    """ISO 17442 check for 20-character [A-Z0-9] strings, vectorized over the values
+
+    Letters count as 10-35 and the number formed by the expanded digits must be
+    1 modulo 97; the remainder is carried digit by digit in int64.
+    """
+    if not len(values):
+        return np.zeros(0, dtype=bool)
+    chars = np.frombuffer(''.join(values).encode('ascii'), dtype=np.uint8).reshape(len(values), 20)
+    digits = np.where(chars >= ord('A'), chars - (ord('A') - 10), chars - ord('0')).astype(np.int64)
+    remainder = np.zeros(len(values), dtype=np.int64)
+    for position in range(20):
+        digit = digits[:, position]
+        remainder = (remainder * np.where(digit >= 10, 100, 10) + digit) % 97
+    return remainder == 1
+
+
+class Compiler:
+    """Lowers a Rule AST to a closure env -> value"""
+
+    def __init__(self, default):
+        self.default = default
+
+    def lower(self, node):
+        method = getattr(self, '_lower_' + type(node).__name__.lower())
+        return method(node)
+
+    def _lower_column(self, node):
+        code = node.code
+        return lambda env: env.series(code)
+
+    def _lower_columngroup(self, node):
+        def bound(env):
+            if env.column is None:
+                raise RuleSyntaxError("Multi-column reference used outside a group binding")
+            return env.series(env.column)
+        return bound
+
+    def _lower_literal(self, node):
+        value = node.value
+        return lambda env: value
+
+    def _lower_unary(self, node):
+        operand = self.lower(node.operand)
+        return lambda env: _as_truth(operand(env)).invert()
+
+    def _lower_if(self, node):
+        condition, consequence = self.lower(node.condition), self.lower(node.consequence)
+
+        def implication(env):
+            cond, cons = _as_truth(condition(env)), _as_truth(consequence(env))
+            return Truth(~cond.known_true() | ~cons.known_false())
+        return implication
+
+    def _lower_in(self, node):
+        operand = self.lower(node.operand)
+        member_ids = np.array([MEMBERS.intern(member) for member in node.members], dtype=np.int64)
+
+        def membership(env):
+            values = _as_series(operand(env))
+            return Truth(np.isin(MEMBERS.lookup(values), member_ids), values.isna().to_numpy())
+        return membership
+
+    def _lower_call(self, node):
+        if node.name == 'isnull':
+            operand = self.lower(node.args[0])
+            return lambda env: Truth(_as_series(operand(env)).isna().to_numpy())
+        if node.name == 'match':
+            operand, pattern = self.lower(node.args[0]), node.args[1]
+            regex, is_lei = compiled_pattern(pattern), pattern == LEI_PATTERN
+
+            def match(env):
+                codes, uniques = _unique_text(operand(env))
+                matched = np.array(uniques.str.fullmatch(regex), dtype=bool)
+                if is_lei and matched.any():
+                    matched[matched] = lei_checksum_valid(uniques[matched].tolist())
+                null = codes < 0
+                return Truth(np.where(null, False, matched[codes] if len(matched) else False), null)
+            return match
+        group, default = node.args[0], self.default
+
+        def total(env):
+            columns = group.members(env.frame.columns)
+            # Column by column: apply() hands an empty frame back unconverted
+            numbers = pd.DataFrame({c: _as_numbers(env.frame[c]) for c in columns}, index=env.frame.index)
+            if default is not None:
+                numbers = numbers.fillna(default)
+            return numbers.sum(axis=1, min_count=1)
+        return total
+
+    def _lower_binary(self, node):
+        left, right, op = self.lower(node.left), self.lower(node.right), node.op
+        if op == 'or':
+            return lambda env: _as_truth(left(env)).either(_as_truth(right(env)))
+        if op == 'and':
+            return lambda env: _as_truth(left(env)).both(_as_truth(right(env)))
+        if op in ('+', '-'):
+            numeric = self._numeric
+            if op == '+':
+                return lambda env: numeric(left(env)) + numeric(right(env))
+            return lambda env: numeric(left(env)) - numeric(right(env))
+        compare = self._compare
+        return lambda env: compare(left(env), op, right(env), env.rows)
+
+    def _numeric(self, value):
+        if isinstance(value, pd.Series):
+            numbers = _as_numbers(value)
+            return numbers.fillna(self.default) if self.default is not None else numbers
+        if isinstance(value, float):
+            return value
+        raise RuleSyntaxError("Expected a numeric operand")
+
+    def _compare(self, left, op, right, rows):
+        if isinstance(left, pd.Series) and right is None:
+            left, right = right, left
+        if left is None:
+            if not isinstance(right, pd.Series) or op not in ('=', '!='):
+                raise RuleSyntaxError("null can only be compared with = or !=")
+            nulls = right.isna().to_numpy()
+            return Truth(nulls if op == '=' else ~nulls)
+        if isinstance(left, str) and not isinstance(right, str):
+            left, right, op = right, left, {'>': '<', '<': '>', '>=': '<=', '<=': '>='}.get(op, op)
+        if isinstance(right, str):
+            values = _as_text(left)
+            null = values.isna().to_numpy()
+            if op == '=':
+                return Truth((values == right).fillna(False).to_numpy(dtype=bool), null)
+            if op == '!=':
+                return Truth((values != right).fillna(False).to_numpy(dtype=bool), null)
+            raise RuleSyntaxError(f"Operator {op} is not defined for code values")
+        # The default stands in for a missing number, never for a missing date
+        substitute = (isinstance(left, pd.Series) and isinstance(right, pd.Series) and self.default is not None
+                      and not _holds_dates(left) and not _holds_dates(right))
+        if substitute:
+            left_null, right_null = left.isna().to_numpy(), right.isna().to_numpy()
+        left, right = (_as_numbers(operand).to_numpy(dtype=float, na_value=np.nan)
+                       if isinstance(operand, pd.Series) else operand for operand in (left, right))
+        if substitute:
+            left = np.where(left_null & ~right_null, self.default, left)
+            right = np.where(right_null & ~left_null, self.default, right)
+        null = np.zeros(rows, dtype=bool)
+        for operand in (left, right):
+            if isinstance(operand, np.ndarray):
+                null |= np.isnan(operand)
+        with np.errstate(invalid='ignore'):
+            result = {
+                '=': lambda: np.isclose(left, right, rtol=0, atol=EQUALITY_TOLERANCE),
+                '!=': lambda: ~np.isclose(left, right, rtol=0, atol=EQUALITY_TOLERANCE),
+                '>=': lambda: left >= right,
+                '<=': lambda: left <= right,
+                '>': lambda: left > right,
+                '<': lambda: left < right,
+            }[op]()
+        return Truth(np.broadcast_to(result, null.shape), null)
+
+
+class CompiledRule:
+    """A parsed and lowered rule expression"""
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.ast = Parser(tokenize(expression)).parse()
+        self.table = self.ast.table
+        self.default = self.ast.default
+        self.group = next((n for n in walk(self.ast.body) if isinstance(n, ColumnGroup)
+                           and not self._is_sum_range(n)), None)
+        self.columns = sorted({n.code for n in walk(self.ast) if isinstance(n, Column)}
+                              | {c for n in walk(self.ast) if isinstance(n, ColumnGroup) for c in n.codes})
+        self._fn = Compiler(self.default).lower(self.ast.body)
+
+    def __getstate__(self):
+        # Closures do not pickle; the AST is re-lowered on load
+        state = dict(self.__dict__)
+        del state['_fn']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._fn = Compiler(self.default).lower(self.ast.body)
+
+    def _is_sum_range(self, group):
+        return any(isinstance(n, Call) and n.name == 'sum' and n.args[0] is group for n in walk(self.ast))
+
+    def columns_read(self, available):
+        """Columns the rule reads on a sheet with the `available` columns, groups expanded"""
+        columns = {n.code for n in walk(self.ast) if isinstance(n, Column)}
+        for node in walk(self.ast):
+            if isinstance(node, ColumnGroup):
+                columns.update(node.members(available))
+        return columns
+
+    def evaluate(self, frame, column=None):
+        """Failing-row mask of the rule over `frame`, with the group bound to `column`"""
+        return _as_truth(self._fn(Env(frame, column))).known_false()
+
+    def evaluate_all(self, frame):
+        """List of (column, failing mask), one entry per group member"""
+        if self.group is None:
+            return [(None, self.evaluate(frame))]
+        return [(column, self.evaluate(frame, column)) for column in self.group.members(frame.columns)]
+
+
+_COMPILED = {}
+
+
+def expression_key(expression):
+    """Stable hash of a rule expression"""
+    return hashlib.sha1(expression.encode('utf-8')).hexdigest()
+
+
+def ruleset_hash(rules):
+    """Stable hash of a rule set and the engine version evaluating it"""
+    digest = hashlib.sha1(f"engine:{ENGINE_VERSION}".encode('utf-8'))
+    for rule in rules:
+        digest.update(f"\0{rule['id']}\0{rule['type']}\0{rule['expression']}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def compile_expression(expression):
+    """Compile an expression, reusing the process-wide cache
+
+    Expressions that fail to parse are cached too and re-raise their error.
+    """
+    key = expression_key(expression)
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        try:
+            compiled = CompiledRule(expression)
+        except RuleSyntaxError as e:
+            compiled = e
+        _COMPILED[key] = compiled
+    if isinstance(compiled, RuleSyntaxError):
+        raise compiled
+    return compiled
+
+
+def register_compiled(key, compiled):
+    """Seed the cache with a rule compiled elsewhere (e.g. loaded from a rule pack artifact)"""
+    _COMPILED[key] = compiled
+
+
+def presence_family_shape(compiled):
+    """(condition columns, target column) if the rule reads
+    `if not isnull(A) or not isnull(B) ... then not isnull(K)`, else None"""
+    body = compiled.ast.body
+    if not isinstance(body, If):
+        return None
+    target = _not_null_column(body.consequence)
+    if target is None:
+        return None
+    conditions, pending = [], [body.condition]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Binary) and node.op == 'or':
+            pending.extend((node.right, node.left))
+            continue
+        column = _not_null_column(node)
+        if column is None:
+            return None
+        conditions.append(column)
+    return tuple(dict.fromkeys(conditions)), target
+
+
+def _not_null_column(node):
+    if (isinstance(node, Unary) and isinstance(node.operand, Call) and node.operand.name == 'isnull'
+            and isinstance(node.operand.args[0], Column)):
+        return node.operand.args[0].code
+    return None
+
+
+class PresenceFamily:
+    """Fused evaluation of a table's "if any of {A..N} is non-null then K is non-null" rules
+
+    One non-null matrix and one row-wise count over the union of the
+    family's columns replace N separate isnull scans per rule: a member's
+    condition count is the total count minus the few columns outside its
+    condition set.
+    """
+
+    def __init__(self):
+        self.members = []
+        self._frame_ref = None
+        self._results = None
+
+    def add(self, compiled, conditions, target):
+        member = FamilyMember(self, compiled, conditions, target)
+        self.members.append(member)
+        return member
+
+    def results(self, frame):
+        """{member: failing mask or KeyError} for `frame`, computed once per frame"""
+        if self._frame_ref is not None and self._frame_ref() is frame:
+            return self._results
+        columns = list(dict.fromkeys(c for m in self.members for c in m.columns if c in frame.columns))
+        position = {c: i for i, c in enumerate(columns)}
+        not_null = frame[columns].notna().to_numpy()
+        counts = not_null.sum(axis=1)
+        results = {}
+        for member in self.members:
+            missing = [c for c in member.columns if c not in position]
+            if missing:
+                results[member] = KeyError(missing[0])
+                continue
+            outside = [position[c] for c in columns if c not in member.conditions]
+            condition_count = counts - not_null[:, outside].sum(axis=1) if outside else counts
+            results[member] = ~not_null[:, position[member.target]] & (condition_count > 0)
+        self._frame_ref, self._results = weakref.ref(frame), results
+        return results
+
+
+class FamilyMember:
+    """Stands in for a CompiledRule that belongs to a PresenceFamily"""
+
+    def __init__(self, family, compiled, conditions, target):
+        self.family = family
+        self.compiled = compiled
+        self.conditions = frozenset(conditions)
+        self.target = target
+        self.columns = list(dict.fromkeys(conditions + (target,)))
+        self.table = compiled.table
+
+    def columns_read(self, available):
+        return set(self.columns)
+
+    def evaluate_all(self, frame):
+        result = self.family.results(frame)[self]
+        if isinstance(result, KeyError):
+            raise result
+        return [(None, result)]
+
+
+class RuleIndex:
+    """Rules indexed by the table code they apply to
+
+    The table comes from the `with {tB_xx.xx, ...}` prefix or a
+    `{tB_xx.xx, cNNNN}` reference. A table's rules are compiled the first time
+    that table is validated, and its "if any non-null then K non-null" rules
+    are fused into one PresenceFamily. Rules without a table apply to any
+    sheet that has all of their columns; rules that do not compile are kept
+    per table so they can be reported as skipped.
+    """
+
+    def __init__(self, rules):
+        self.by_table = {}
+        self.unscoped = []
+        self.invalid = {}
+        self._pending = {}
+        for rule in rules:
+            match = TABLE_CODE.search(rule['expression'])
+            self._pending.setdefault(match.group() if match else None, []).append(rule)
+
+    def _compile_table(self, table):
+        family = PresenceFamily()
+        for rule in self._pending.pop(table, ()):
+            try:
+                compiled = compile_expression(rule['expression'])
+            except RuleSyntaxError as e:
+                self.invalid.setdefault(table, []).append((rule, str(e)))
+                continue
+            shape = presence_family_shape(compiled) if table is not None else None
+            if shape is not None:
+                compiled = family.add(compiled, *shape)
+            if table is None:
+                self.unscoped.append((rule, compiled))
+            else:
+                self.by_table.setdefault(table, []).append((rule, compiled))
+
+    def tables(self):
+        return sorted(t for t in set(self._pending) | set(self.by_table) | set(self.invalid) if t)
+
+    def rules_for(self, table, columns):
+        """(rule, compiled) pairs applicable to a sheet with the given columns"""
+        self._compile_table(table)
+        self._compile_table(None)
+        columns = set(columns)
+        applicable = list(self.by_table.get(table, ()))
+        applicable.extend(entry for entry in self.unscoped if set(entry[1].columns) <= columns)
+        return applicable
+
+    def invalid_for(self, table):
+        """(rule, reason) pairs for rules of this table that failed to compile"""
+        self._compile_table(table)
+        return self.invalid.get(table, [])
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+ECB Rule Packs
+Loads ECB validation rules from any of the *_ecb_validation_rules.json
+variants, normalizes their schemas, and saves/loads the compiled rules as a
+versioned binary artifact for fast startup
+"""
+
+import argparse
+import json
+import pickle
+import struct
+import sys
+from pathlib import Path
+
+from ecb_rule_engine import ENGINE_VERSION, RuleSyntaxError, compile_expression, expression_key, \
+    register_compiled, ruleset_hash
+
+DEFAULT_RULE_PACK = Path(__file__).with_name('complete_ecb_validation_rules.json')
+
+ARTIFACT_MAGIC = b'ECBRPACK'
+ARTIFACT_VERSION = 1
+ARTIFACT_HEADER = struct.Struct('<8sHH')
+
+
+class RulePackError(ValueError):
+    """Raised when a rule file or artifact cannot be loaded"""
+
+
+def normalize_rule(entry, position):
+    """Map either rule schema to {id, expression, type, tables, columns}
+
+    The variants use `id`/`expression`/`type`/`tables`/`columns` or
+    `rule_id`/`original_expression`/`rule_type`/`table_references`/`column_references`.
+    """
+    expression = entry.get('expression') or entry.get('original_expression')
+    if not expression or not isinstance(expression, str):
+        return None
+    rule_id = entry.get('id', entry.get('rule_id', position))
+    if isinstance(rule_id, int):
+        rule_id = f"ECB_RULE_{rule_id:03d}"
+    return {
+        'id': rule_id,
+        'expression': expression.strip(),
+        'type': entry.get('type') or entry.get('rule_type') or 'unknown',
+        'tables': list(entry.get('tables') or entry.get('table_references') or []),
+        'columns': list(entry.get('columns') or entry.get('column_references') or []),
+    }
+
+
+class RulePack:
+    """A named, versioned set of normalized rules"""
+
+    def __init__(self, rules, source=None, version=None):
+        self.rules = rules
+        self.source = source
+        self.version = version
+        self.ruleset_hash = ruleset_hash(rules)
+
+    @classmethod
+    def load(cls, path):
+        """Load a JSON rule file or a compiled artifact, detected by content"""
+        path = Path(path)
+        with open(path, 'rb') as f:
+            is_artifact = f.read(len(ARTIFACT_MAGIC)) == ARTIFACT_MAGIC
+        return cls.load_artifact(path) if is_artifact else cls.from_json(path)
+
+    @classmethod
+    def from_json(cls, path):
+        path = Path(path)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise RulePackError(f"Cannot read rule file {path}: {e}")
+        version = None
+        if isinstance(data, dict):
+            version = (data.get('metadata') or {}).get('version')
+            data = data.get('rules', [])
+        if not isinstance(data, list):
+            raise RulePackError(f"{path} does not contain a list of rules")
+        rules = [rule for rule in (normalize_rule(entry, i) for i, entry in enumerate(data)) if rule]
+        return cls(rules, source=path.name, version=version)
+
+    def compile(self):
+        """Compile every rule into the process-wide cache; returns {expression key: CompiledRule or error}"""
+        compiled = {}
+        for rule in self.rules:
+            key = expression_key(rule['expression'])
+            try:
+                compiled[key] = compile_expression(rule['expression'])
+            except RuleSyntaxError as e:
+                compiled[key] = e
+        return compiled
+
+    def save_artifact(self, path):
+        """Write the compiled rules to a binary artifact"""
+        payload = {
+            'source': self.source,
+            'version': self.version,
+            'ruleset_hash': self.ruleset_hash,
+            'rules': self.rules,
+            'compiled': self.compile(),
+        }
+        with open(path, 'wb') as f:
+            f.write(ARTIFACT_HEADER.pack(ARTIFACT_MAGIC, ARTIFACT_VERSION, ENGINE_VERSION))
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load_artifact(cls, path):
+        """Load an artifact written by save_artifact and seed the compiled-rule cache
+
+        Artifacts are pickles: only load ones you built yourself.
+        """
+        with open(path, 'rb') as f:
+            magic, artifact_version, engine_version = ARTIFACT_HEADER.unpack(f.read(ARTIFACT_HEADER.size))
+            if magic != ARTIFACT_MAGIC:
+                raise RulePackError(f"{path} is not a rule pack artifact")
+            if artifact_version != ARTIFACT_VERSION or engine_version != ENGINE_VERSION:
+                raise RulePackError(f"{path} was built for artifact v{artifact_version}/engine v{engine_version}; "
+                                    f"rebuild it for v{ARTIFACT_VERSION}/v{ENGINE_VERSION}")
+            payload = pickle.load(f)
+        pack = cls(payload['rules'], source=payload['source'], version=payload['version'])
+        if pack.ruleset_hash != payload['ruleset_hash']:
+            raise RulePackError(f"{path} is corrupt: rule-set hash mismatch")
+        # Only a verified artifact may seed the process-wide cache
+        for key, compiled in payload['compiled'].items():
+            register_compiled(key, compiled)
+        return pack
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a compiled ECB rule pack artifact")
+    parser.add_argument('rules', help="rule JSON file (any *_ecb_validation_rules.json variant)")
+    parser.add_argument('-o', '--output', help="artifact path (default: <rules>.rulepack)")
+    args = parser.parse_args(argv)
+
+    pack = RulePack.from_json(args.rules)
+    output = args.output or str(Path(args.rules).with_suffix('.rulepack'))
+    pack.save_artifact(output)
+    invalid = sum(1 for value in pack.compile().values() if isinstance(value, Exception))
+    print(f"Wrote {output}: {len(pack.rules)} rules ({invalid} not compilable), hash {pack.ruleset_hash[:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+ECB Synthetic Workbooks
+Generates DORA register workbooks of any size for benchmarks: tB_ sheets laid
+out like the templates of the annotated table layout (column codes on row 6
+from column D, data from row 8), filled with rows that pass the rule pack,
+and a chosen fraction of rows given one fault each (a missing required cell
+or a key that the referenced table does not hold).
+
+The .xlsx package is written directly, sheet XML streamed chunk by chunk
+with a shared string table, so that a million-row sheet takes seconds to
+write and reads like one saved by Excel.
+"""
+
+import datetime
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from ecb_layout import LayoutIndex, column_letter
+from ecb_referential import FOREIGN_KEYS
+from ecb_workbook import DATA_START_ROW, HEADER_ROW, frame_from_rows
+
+# Tables with rules in the default rule pack, referenced tables before the tables referencing them
+DEFAULT_TABLES = ('tB_01.02', 'tB_02.01', 'tB_05.01', 'tB_02.02', 'tB_07.01')
+CHUNK_ROWS = 50000
+PROBE_ROWS = 64
+ENUMERATION_MEMBERS = 8  # eba_XX:x1 ... eba_XX:x8 per domain
+EXCEL_EPOCH = datetime.date(1899, 12, 30)
+FIRST_DATE = (datetime.date(2020, 1, 1) - EXCEL_EPOCH).days
+DATE_STYLE = 1  # cellXfs entry with number format 14 (m/d/yyyy)
+
+# Enumerated columns the rule pack checks as LEIs: tB_02.02 c0040 (the
+# provider code type) must match the LEI pattern and references tB_05.01 c0020
+LEI_COLUMNS = {('tB_05.01', 'c0020'), ('tB_02.02', 'c0040')}
+
+NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+NS_R = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PR = 'http://schemas.openxmlformats.org/package/2006/relationships'
+CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml'
+
+
+def lei_codes(prefix, numbers):
+    """ISO 17442 codes: a 4-character prefix, the numbers as 14 digits and two check digits"""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    remainder = 0
+    for char in prefix:
+        value = int(char, 36)
+        remainder = (remainder * (100 if value > 9 else 10) + value) % 97
+    remainder = np.full(len(numbers), remainder, dtype=np.int64)
+    for position in range(13, -1, -1):
+        remainder = (remainder * 10 + numbers // 10 ** position % 10) % 97
+    check = 98 - remainder * 100 % 97
+    return (prefix + pd.Series(numbers).astype(str).str.zfill(14) + pd.Series(check).astype(str).str.zfill(2)).to_numpy(object)
+
+
+class TableGenerator:
+    """Rows of one template; each column's values depend only on their Excel row and the seed
+
+    Key columns get one LEI per row, so a referencing table can pick any
+    row of the referenced table and rebuild its key.
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.table = layout.table
+        self.columns = sorted(layout.columns, key=lambda column: column.position)
+        self.references = [fk for fk in FOREIGN_KEYS if fk.table == self.table]
+
+    def kind(self, column):
+        """'s' (text), 'n' (number), 'd' (date) or 'b' (boolean)"""
+        return {'date': 'd', 'integer': 'n', 'monetary': 'n', 'boolean': 'b'}.get(column.data_type, 's')
+
+    def values(self, column, rows, rng):
+        """Valid values of a column on the given Excel rows"""
+        kind = self.kind(column)
+        if kind == 'd':
+            # Later columns hold later dates, so start dates precede end dates
+            return FIRST_DATE + 400 * column.position + rng.integers(0, 365, len(rows))
+        if kind == 'n':
+            if column.data_type == 'integer':
+                return rng.integers(0, 1000, len(rows)).astype(float)
+            return np.round(rng.uniform(0, 1e6, len(rows)), 2)
+        if kind == 'b':
+            return rng.random(len(rows)) < 0.5
+        if column.domain is not None and (self.table, column.code) not in LEI_COLUMNS:
+            members = np.array([f"eba_{column.domain.code}:x{k}" for k in range(1, ENUMERATION_MEMBERS + 1)], object)
+            return members[rng.integers(0, ENUMERATION_MEMBERS, len(rows))]
+        return self.keys(column.code, rows)
+
+    def keys(self, code, rows):
+        # A prefix of letters (tB_05.01: AFAB), so that no key reads as a number
+        prefix = ''.join(chr(ord('A') + int(digit)) for digit in self.table[3:5] + self.table[6:8])
+        return lei_codes(prefix, np.asarray(rows) * 1000 + int(code[1:]) // 10)
+
+    def chunk(self, rows, rng, generators, table_rows):
+        """{code: values} of the given Excel rows; key columns of foreign keys point at existing rows"""
+        values = {column.code: self.values(column, rows, rng) for column in self.columns}
+        for fk in self.references:
+            parent = generators.get(fk.ref_table)
+            if parent is None or not all(c in values for c in fk.columns):
+                continue
+            picked = DATA_START_ROW + rng.integers(0, table_rows, len(rows))
+            for code, ref_code in zip(fk.columns, fk.ref_columns):
+                values[code] = parent.keys(ref_code, picked)
+        return values
+
+
+def probe_frame(generator, values, blank=None):
+    """The frame WorkbookReader reads from generated values, optionally with one column emptied"""
+    codes = list(values)
+    columns = []
+    for column in generator.columns:
+        data = values[column.code]
+        if generator.kind(column) == 'd':
+            data = [EXCEL_EPOCH + datetime.timedelta(days=int(days)) for days in data]
+        data = list(data)
+        if column.code == blank:
+            data = [None] * len(data)
+        columns.append(data)
+    rows = zip(*columns)
+    return frame_from_rows(rows, dict(enumerate(codes)), DATA_START_ROW)
+
+
+def fault_columns(generator, validator, rng):
+    """Columns whose empty cell makes any valid row fail a rule
+
+    Found by emptying each column of a probe of valid rows in turn. Key
+    columns that other tables reference are left out: emptying them would
+    also fail the rows referencing them.
+    """
+    rows = np.arange(DATA_START_ROW, DATA_START_ROW + PROBE_ROWS)
+    values = {column.code: generator.values(column, rows, rng) for column in generator.columns}
+    referenced = {c for fk in FOREIGN_KEYS if fk.ref_table == generator.table for c in fk.ref_columns}
+    faults = []
+    for column in generator.columns:
+        if column.code in referenced:
+            continue
+        results = validator._frame_results(generator.table, probe_frame(generator, values, column.code))
+        failing = [results['violations'].rows(*entry[:3]) for entry in results['violations'].entries()]
+        if failing and len(np.unique(np.concatenate(failing))) == PROBE_ROWS:
+            faults.append(column.code)
+    return faults
+
+
+def _shared_string_cells(refs, values, strings):
+    codes, uniques = pd.factorize(values)
+    lookup = np.array([strings.setdefault(u, len(strings)) for u in uniques], dtype=np.int64)
+    indexes = lookup[codes] if len(lookup) else np.zeros(len(values), dtype=np.int64)
+    return '<c r="' + refs + '" t="s"><v>' + pd.Series(indexes).astype(str) + '</v></c>'
+
+
+def row_xml(generator, rows, values, blanks, strings):
+    """<row> elements of a chunk; strings (shared string table, {text: index}) grows as needed
+
+    Generated text is alphanumeric with ':' and '_', so no XML escaping is needed.
+    """
+    numbers = pd.Series(rows).astype(str)
+    xml = '<row r="' + numbers + '">'
+    for column in generator.columns:
+        refs = column_letter(column.position) + numbers
+        data, kind = values[column.code], generator.kind(column)
+        if kind == 's':
+            cells = _shared_string_cells(refs, data, strings)
+        elif kind == 'd':
+            cells = '<c r="' + refs + f'" s="{DATE_STYLE}"><v>' + pd.Series(data).astype(str) + '</v></c>'
+        elif kind == 'b':
+            cells = '<c r="' + refs + '" t="b"><v>' + pd.Series(data.astype(int)).astype(str) + '</v></c>'
+        else:
+            cells = '<c r="' + refs + '"><v>' + pd.Series(data).astype(str) + '</v></c>'
+        blank = blanks.get(column.code)
+        if blank is not None:
+            cells = cells.where(~blank, '')
+        xml = xml + cells
+    return ''.join((xml + '</row>').tolist())
+
+
+class WorkbookWriter:
+    """Minimal .xlsx package writer: one worksheet part per sheet, streamed, then the shared strings"""
+
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        self.sheets = []
+        self.strings = {}
+
+    def sheet(self, name):
+        """Open the next worksheet part for writing; returns a text writer for its rows"""
+        self.sheets.append(name)
+        part = self.archive.open(f'xl/worksheets/sheet{len(self.sheets)}.xml', 'w', force_zip64=True)
+        return _SheetStream(part)
+
+    def close(self):
+        write = self.archive.writestr
+        sheets = range(1, len(self.sheets) + 1)
+        write('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/xl/workbook.xml" ContentType="{CONTENT_TYPE}.sheet.main+xml"/>'
+            f'<Override PartName="/xl/styles.xml" ContentType="{CONTENT_TYPE}.styles+xml"/>'
+            f'<Override PartName="/xl/sharedStrings.xml" ContentType="{CONTENT_TYPE}.sharedStrings+xml"/>'
+            + ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="{CONTENT_TYPE}.worksheet+xml"/>'
+                      for i in sheets)
+            + '</Types>'))
+        write('_rels/.rels', (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships xmlns="{NS_PR}">'
+            f'<Relationship Id="rId1" Type="{NS_R}/officeDocument" Target="xl/workbook.xml"/></Relationships>'))
+        write('xl/workbook.xml', (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><workbook xmlns="{NS}" xmlns:r="{NS_R}"><sheets>'
+            + ''.join(f'<sheet name="{name}" sheetId="{i}" r:id="rId{i}"/>' for i, name in enumerate(self.sheets, 1))
+            + '</sheets></workbook>'))
+        n = len(self.sheets)
+        write('xl/_rels/workbook.xml.rels', (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships xmlns="{NS_PR}">'
+            + ''.join(f'<Relationship Id="rId{i}" Type="{NS_R}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                      for i in sheets)
+            + f'<Relationship Id="rId{n + 1}" Type="{NS_R}/styles" Target="styles.xml"/>'
+            f'<Relationship Id="rId{n + 2}" Type="{NS_R}/sharedStrings" Target="sharedStrings.xml"/></Relationships>'))
+        write('xl/styles.xml', (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><styleSheet xmlns="{NS}">'
+            '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="1"><fill><patternFill patternType="none"/></fill></fills><borders count="1"><border/></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles></styleSheet>'))
+        with self.archive.open('xl/sharedStrings.xml', 'w', force_zip64=True) as part:
+            part.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                       f'<sst xmlns="{NS}" uniqueCount="{len(self.strings)}">'.encode('utf-8'))
+            strings = list(self.strings)
+            for start in range(0, len(strings), CHUNK_ROWS):
+                part.write(''.join(f'<si><t>{s}</t></si>' for s in strings[start:start + CHUNK_ROWS]).encode('utf-8'))
+            part.write(b'</sst>')
+        self.archive.close()
+
+
+class _SheetStream:
+    def __init__(self, part):
+        self.part = part
+        self.part.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><worksheet xmlns="{NS}"><sheetData>'
+                        .encode('utf-8'))
+
+    def write(self, xml):
+        self.part.write(xml.encode('utf-8'))
+
+    def close(self):
+        self.part.write(b'</sheetData></worksheet>')
+        self.part.close()
+
+
+def generate_workbook(path, rows, violation_rate=0.0, tables=DEFAULT_TABLES, seed=0, layout=None, validator=None):
+    """Write a workbook of `rows` data rows per table and return what was generated
+
+    violation_rate: fraction of each table's rows given one fault, either an
+    empty cell that a rule requires or, in a referencing table, a key missing
+    from the referenced table. Returns {table: {'rows', 'faulty_rows', 'fault_columns'}}.
+    """
+    if not 0 <= violation_rate <= 1:
+        raise ValueError(f"violation_rate must be in [0, 1], got {violation_rate}")
+    layout = layout or LayoutIndex.load()
+    missing = [table for table in tables if table not in layout]
+    if missing:
+        raise ValueError(f"not a template of the table layout: {', '.join(missing)}")
+    if violation_rate and validator is None:
+        from ecb_validator import ECBValidator
+        validator = ECBValidator(verbose=False)
+    generators = {table: TableGenerator(layout.get(table)) for table in tables}
+    summary = {}
+    writer = WorkbookWriter(path)
+    try:
+        for number, (table, generator) in enumerate(generators.items()):
+            rng = np.random.default_rng([seed, number])
+            faults = fault_columns(generator, validator, rng) if violation_rate else []
+            dangling = [fk for fk in generator.references if fk.ref_table in generators] if violation_rate else []
+            sheet = writer.sheet(table)
+            header = ''.join(f'<c r="{column_letter(c.position)}{HEADER_ROW}" t="s"><v>'
+                             f'{writer.strings.setdefault(c.code, len(writer.strings))}</v></c>'
+                             for c in generator.columns)
+            sheet.write(f'<row r="{HEADER_ROW}">{header}</row>')
+            faulty_rows = 0
+            for start in range(DATA_START_ROW, DATA_START_ROW + rows, CHUNK_ROWS):
+                excel_rows = np.arange(start, min(start + CHUNK_ROWS, DATA_START_ROW + rows))
+                values = generator.chunk(excel_rows, rng, generators, rows)
+                blanks = {}
+                kinds = len(faults) + len(dangling)
+                if kinds:
+                    faulty = np.flatnonzero(rng.random(len(excel_rows)) < violation_rate)
+                    choice = rng.integers(0, kinds, len(faulty))
+                    faulty_rows += len(faulty)
+                    for k, code in enumerate(faults):
+                        blanks.setdefault(code, np.zeros(len(excel_rows), dtype=bool))[faulty[choice == k]] = True
+                    for k, fk in enumerate(dangling, start=len(faults)):
+                        # Keys of a table that is not generated
+                        picked = faulty[choice == k]
+                        values[fk.columns[0]][picked] = lei_codes('ZZZZ', excel_rows[picked])
+                sheet.write(row_xml(generator, excel_rows, values, blanks, writer.strings))
+            sheet.close()
+            summary[table] = {'rows': rows, 'faulty_rows': faulty_rows, 'fault_columns': faults}
+    finally:
+        writer.close()
+    return summary
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+ECB Validation Service
+Long-running local HTTP service around ECBValidator. Compiled rules and the
+worker pool stay warm between requests, so callers such as the Power
+Automate flow pay for a cold start only once.
+
+    POST /validate   body: the .xlsx file   -> same JSON as validate_file
+         ?offset=&limit=                    -> each sheet's errors a page at a time
+    GET  /health                            -> status, rule count, queue depth
+    GET  /metrics                           -> Prometheus counters and histograms
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from ecb_profile import PrometheusMetrics
+from ecb_validator import (DEFAULT_MAX_ERRORS_PER_RULE, DEFAULT_PAGE_SIZE, ECBValidator, add_layout_arguments,
+                           add_reader_argument, add_screening_arguments, layout_options, page_errors)
+
+DEFAULT_PORT = 8765
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+MAX_HEADER_LINES = 100
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ValidationService:
+    """Queues uploads and validates at most `concurrency` of them at a time on a warm pool"""
+
+    def __init__(self, validator, workers=None, concurrency=None, max_queue=100):
+        self.validator = validator
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency or self.workers
+        self.max_queue = max_queue
+        self.pool = None
+        self.slots = None
+        self.waiting = 0
+        self.active = 0
+        self.completed = 0
+        self.metrics = PrometheusMetrics()
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        loop = asyncio.get_running_loop()
+        self.validator.warm()
+        self.pool = self.validator.worker_pool(self.workers)
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in self.validator.warm_pool(self.pool, self.workers)))
+        self.slots = asyncio.Semaphore(self.concurrency)
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"ECB validation service on http://{host}:{port} "
+              f"({len(self.validator.rules)} rules, {self.workers} workers, concurrency {self.concurrency})")
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                await loop.run_in_executor(None, self.pool.shutdown)
+
+    async def handle(self, reader, writer):
+        try:
+            method, path, headers = await self._read_head(reader)
+            url = urlsplit(path)
+            if method == 'GET' and url.path == '/health':
+                status, body = HTTPStatus.OK, self.health()
+            elif method == 'GET' and url.path == '/metrics':
+                status, body = HTTPStatus.OK, self.metrics.exposition()
+            elif method == 'POST' and url.path == '/validate':
+                page = self._page(url.query)
+                status, body = HTTPStatus.OK, await self.validate(await self._read_body(reader, headers))
+                if 'error' in body:
+                    status = HTTPStatus.UNPROCESSABLE_ENTITY
+                elif page is not None:
+                    body = page_errors(body, *page)
+            else:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {method} {path}")
+        except HTTPError as e:
+            status, body = e.status, {'error': str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"Validation failed: {e}"}
+        await self._respond(writer, status, body)
+
+    def health(self):
+        return {'status': 'ok', 'rules': len(self.validator.rules), 'workers': self.workers,
+                'active': self.active, 'queued': self.waiting, 'completed': self.completed}
+
+    async def validate(self, data):
+        """Validate uploaded workbook bytes on the worker pool"""
+        if self.waiting >= self.max_queue:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Validation queue is full, retry later")
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        start = time.perf_counter()
+        fd, path = tempfile.mkstemp(suffix='.xlsx')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            results = await asyncio.wrap_future(self.validator.submit_file(self.pool, path))
+            self.metrics.observe_run(time.perf_counter() - start, results.get('profile'))
+            return results
+        finally:
+            os.remove(path)
+            self.active -= 1
+            self.completed += 1
+            self.slots.release()
+
+    @staticmethod
+    def _page(query):
+        """(offset, limit) of the error page asked for in the query string, or None"""
+        params = parse_qs(query)
+        if 'offset' not in params and 'limit' not in params:
+            return None
+        try:
+            offset = int(params.get('offset', ['0'])[-1])
+            limit = int(params.get('limit', [str(DEFAULT_PAGE_SIZE)])[-1])
+        except ValueError:
+            offset = limit = -1
+        if offset < 0 or limit < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "offset and limit must be non-negative integers")
+        return offset, limit
+
+    async def _read_head(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                return parts[0].upper(), parts[1], headers
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+
+    async def _read_body(self, reader, headers):
+        if 'content-length' not in headers:
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid Content-Length: {headers['content-length']!r}")
+        if length > MAX_UPLOAD_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Upload larger than {MAX_UPLOAD_BYTES} bytes")
+        if length == 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Empty upload")
+        return await reader.readexactly(length)
+
+    async def _respond(self, writer, status, body):
+        """Send `body` as JSON, or as plain text if it is a string"""
+        if isinstance(body, str):
+            payload, content_type = body.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            payload, content_type = json.dumps(body).encode('utf-8'), 'application/json'
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n")
+        try:
+            writer.write(head.encode('latin-1') + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ECB validation HTTP service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, help="validation worker processes (default: CPU count)")
+    parser.add_argument('--concurrency', type=int, help="uploads validated at once (default: workers)")
+    parser.add_argument('--max-queue', type=int, default=100, help="uploads allowed to wait for a slot")
+    parser.add_argument('--rules', help="rule JSON file or compiled .rulepack artifact")
+    parser.add_argument('--cache-dir', help="reuse results for unchanged sheets from this directory")
+    parser.add_argument('--frame-cache', metavar='DIR', help="keep parsed sheets in this directory for re-uploads")
+    parser.add_argument('--chunk-size', type=int, help="stream sheets in chunks of this many rows")
+    parser.add_argument('--max-errors-per-rule', type=int, default=DEFAULT_MAX_ERRORS_PER_RULE,
+                        help="error messages listed per rule and sheet; counts stay exact (0: list all)")
+    parser.add_argument('--profile', action='store_true',
+                        help="time every stage and rule; adds per-rule and per-stage metrics to /metrics")
+    add_layout_arguments(parser)
+    add_screening_arguments(parser)
+    add_reader_argument(parser)
+    args = parser.parse_args(argv)
+
+    validator = ECBValidator(chunk_size=args.chunk_size, verbose=False, cache_dir=args.cache_dir,
+                             rule_pack=args.rules, max_errors_per_rule=args.max_errors_per_rule or None,
+                             fail_fast=args.fail_fast, sample=args.sample, profile=args.profile,
+                             reader=args.reader, frame_cache_dir=args.frame_cache, **layout_options(args))
+    service = ValidationService(validator, workers=args.workers, concurrency=args.concurrency,
+                                max_queue=args.max_queue)
+    try:
+        asyncio.run(service.start(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,1349 +1,910 @@
 #!/usr/bin/env python3
 """
 ECB Excel File Validator - Standalone Script
-Validates ECB Excel files against 71 comprehensive rules
-Generated automatically from comprehensive rule extraction
+Validates ECB Excel files against the ECB validation rules
+(by default the 71 comprehensive rules in complete_ecb_validation_rules.json)
 """
 
-import pandas as pd
+import argparse
+import glob
+import hashlib
 import json
 import sys
+import time
 from pathlib import Path
 
-# Load validation rules
-RULES = [
-    {
-        "id": "ECB_RULE_042",
-        "expression": "with {tB_05.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0020}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0120",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_043",
-        "expression": "with {tB_05.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0050}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0120",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_044",
-        "expression": "with {tB_05.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0060}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0120",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_045",
-        "expression": "with {tB_05.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0070}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0120",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_046",
-        "expression": "with {tB_05.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0080}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0120",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_047",
-        "expression": "with {tB_05.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0110}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0120",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_050",
-        "expression": "with {tB_01.02, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) then ( ( not ( isnull ({c0020}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_051",
-        "expression": "with {tB_01.02, default: null, interval: false}: if ( not ( isnull ({c0020}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) then ( ( not ( isnull ({c0030}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_052",
-        "expression": "with {tB_01.02, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0020}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) then ( ( not ( isnull ({c0040}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_053",
-        "expression": "with {tB_01.02, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) then ( ( not ( isnull ({c0050}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_054",
-        "expression": "with {tB_01.02, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) then ( ( not ( isnull ({c0060}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_055",
-        "expression": "with {tB_01.02, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) then ( ( not ( isnull ({c0070}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_056",
-        "expression": "with {tB_01.02, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) then ( ( not ( isnull ({c0080}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_057",
-        "expression": "with {tB_01.02, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) then ( ( not ( isnull ({c0090}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0040",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_061",
-        "expression": "with {tB_02.02, default: null, interval: false}: if ( not ( isnull ({c0070}) ) ) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) or not (( isnull ({c0140}) )) or not (( isnull ({c0170}) )) or not (( isnull ({c0180}) )) then ( ( not ( isnull ({c0040}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0140",
-            "c0100",
-            "c0120",
-            "c0040",
-            "c0170",
-            "c0180",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_062",
-        "expression": "with {tB_02.02, default: null, interval: false}: if ( not ( isnull ({c0040}) ) ) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) or not (( isnull ({c0140}) )) or not (( isnull ({c0170}) )) or not (( isnull ({c0180}) )) then ( ( not ( isnull ({c0070}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0140",
-            "c0100",
-            "c0120",
-            "c0040",
-            "c0170",
-            "c0180",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_063",
-        "expression": "with {tB_02.02, default: null, interval: false}: if ( not ( isnull ({c0070}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) or not (( isnull ({c0140}) )) or not (( isnull ({c0170}) )) or not (( isnull ({c0180}) )) then ( ( not ( isnull ({c0080}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0140",
-            "c0100",
-            "c0120",
-            "c0040",
-            "c0170",
-            "c0180",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_076",
-        "expression": "with {tB_07.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0050}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0120",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_077",
-        "expression": "with {tB_07.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0060}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0070}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0120",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_078",
-        "expression": "with {tB_07.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0080}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0120",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_079",
-        "expression": "with {tB_07.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0090}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0120",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_080",
-        "expression": "with {tB_07.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0110}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0120",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_081",
-        "expression": "with {tB_07.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0110}) )) or not (( isnull ({c0120}) )) then ( ( not ( isnull ({c0100}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0120",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_069",
-        "expression": "with {tB_06.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) then ( ( not ( isnull ({c0020}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0080",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_070",
-        "expression": "with {tB_06.01, default: null, interval: false}: if ( not ( isnull ({c0020}) ) ) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) then ( ( not ( isnull ({c0030}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0080",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_071",
-        "expression": "with {tB_06.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0020}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) then ( ( not ( isnull ({c0050}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0080",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_072",
-        "expression": "with {tB_06.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) then ( ( not ( isnull ({c0070}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0080",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_073",
-        "expression": "with {tB_06.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0090}) )) or not (( isnull ({c0100}) )) then ( ( not ( isnull ({c0080}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0080",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_074",
-        "expression": "with {tB_06.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0100}) )) then ( ( not ( isnull ({c0090}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0080",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_032",
-        "expression": "with{tB_01.02, default:0, interval:false}: if({c0040} != [eba_CT:x318] and {c0040} != [eba_CT:x317]) then (not (isnull ({c0110}))) endif",
-        "type": "comparison",
-        "tables": [],
-        "columns": [
-            "c0110",
-            "c0040"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_038",
-        "expression": "with {tB_05.01, default: 0, interval: false}: if({c0030} != \"null\") then ({c0040} != \"null\") endif",
-        "type": "comparison",
-        "tables": [],
-        "columns": [
-            "c0040",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_039",
-        "expression": "with {tB_05.01, default: 0, interval: false}: if({c0100} != \"null\") then ({c0090} != \"null\") endif",
-        "type": "comparison",
-        "tables": [],
-        "columns": [
-            "c0100",
-            "c0090"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_075",
-        "expression": "with {tB_06.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) or not (( isnull ({c0070}) )) or not (( isnull ({c0080}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0020}) )) then ( ( not ( isnull ({c0100}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0100",
-            "c0020",
-            "c0080",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_025",
-        "expression": "with {tB_06.01,  default:null, interval:false}: not ( isnull ({(c0020, c0030, c0050, c0070, c0080, c0090, c0100)}) )",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0100",
-            "c0020",
-            "c0080",
-            "c0090",
-            "c0070",
-            "c0030"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_064",
-        "expression": "with {tB_01.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) then ( ( not ( isnull ({c0020}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0020",
-            "c0040",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_065",
-        "expression": "with {tB_01.01, default: null, interval: false}: if ( not ( isnull ({c0020}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) then ( ( not ( isnull ({c0030}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0020",
-            "c0040",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_066",
-        "expression": "with {tB_01.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0020}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0060}) )) then ( ( not ( isnull ({c0040}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0020",
-            "c0040",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_067",
-        "expression": "with {tB_01.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0020}) )) or not (( isnull ({c0060}) )) then ( ( not ( isnull ({c0050}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0020",
-            "c0040",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_068",
-        "expression": "with {tB_01.01, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) or not (( isnull ({c0040}) )) or not (( isnull ({c0050}) )) or not (( isnull ({c0020}) )) then ( ( not ( isnull ({c0060}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0020",
-            "c0040",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_033",
-        "expression": "with {tB_02.01, default: 0, interval: false}:if({c0020} = [eba_CO:x3]) then (not (isnull ({c0030}))) endif",
-        "type": "conditional",
-        "tables": [],
-        "columns": [
-            "c0020",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_037",
-        "expression": "with{tB_05.01, default:0, interval: false}: if({c0020} = [eba_qCO:qx2000]) then ( (match({c0030}, \"^[A-Z0-9]{18}[0-9]{2}$\"))) endif",
-        "type": "conditional",
-        "tables": [],
-        "columns": [
-            "c0020",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_128",
-        "expression": "SUM(c0100:c0110)=c0120",
-        "type": "summation",
-        "tables": [],
-        "columns": [
-            "c0100",
-            "c0110",
-            "c0120"
-        ],
-        "functions": [
-            "SUM"
-        ],
-        "source": "table_rule",
-        "table": "t02_01"
-    },
-    {
-        "id": "ECB_RULE_019",
-        "expression": "with {tB_05.01,  default:null, interval:false}: not ( isnull ({(c0020, c0050, c0060, c0070, c0080, c0110)}) )",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060",
-            "c0020",
-            "c0080",
-            "c0110",
-            "c0070"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_024",
-        "expression": "with {tB_07.01,  default:null, interval:false}: not ( isnull ({(c0050, c0070, c0080, c0090, c0100, c0110)}) )",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0100",
-            "c0080",
-            "c0110",
-            "c0090",
-            "c0070"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_058",
-        "expression": "with {tB_02.01, default: null, interval: false}: if ( not ( isnull ({c0020}) ) ) or not (( isnull ({c0030}) )) or not (( isnull ({c0040}) )) then ( ( not ( isnull ({c0050}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0020",
-            "c0050",
-            "c0040",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_059",
-        "expression": "with {tB_02.01, default: null, interval: false}: if ( not ( isnull ({c0020}) ) ) or not (( isnull ({c0030}) )) or not (( isnull ({c0050}) )) then ( ( not ( isnull ({c0040}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0040",
-            "c0020",
-            "c0050",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_060",
-        "expression": "with {tB_02.01, default: null, interval: false}: if ( not ( isnull ({c0050}) ) ) or not (( isnull ({c0030}) )) or not (( isnull ({c0040}) )) then ( ( not ( isnull ({c0020}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0040",
-            "c0020",
-            "c0050",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_090",
-        "expression": "if {c0020} = [eba_CO:x3] then {c0030} != empty",
-        "type": "comparison",
-        "tables": [],
-        "columns": [
-            "c0020",
-            "c0030"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_028",
-        "expression": "with {tB_02.01, default: null, interval: false}: if ( {c0020} = [eba_CO:x3] ) then ( not ( isnull ({c0030}) ) ) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0020",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_031",
-        "expression": "with {tB_01.02, default: 0, interval: false}: if (not (isnull ({c0110}))) then (not (isnull ({c0100}))) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0100",
-            "c0110"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_035",
-        "expression": "with{tB_05.01, default:0, interval: false}: if ({c0070} = [eba_CT:x212]) then ({c0020} in {[eba_qCO:qx2000], [eba_qCO:qx2002]}) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0020",
-            "c0070"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_036",
-        "expression": "with{tB_05.01, default:0, interval: false}: if ({c0070} = [eba_CT:x212]) then ({c0040} in {[eba_qCO:qx2000], [eba_qCO:qx2002]}) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0070",
-            "c0040"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_048",
-        "expression": "with {tB_01.03, default: null, interval: false}: if ( not ( isnull ({c0030}) ) ) then ( ( not ( isnull ({c0040}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0040",
-            "c0030"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_049",
-        "expression": "with {tB_01.03, default: null, interval: false}: if ( not ( isnull ({c0040}) ) ) then ( ( not ( isnull ({c0030}) ) )) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0030",
-            "c0040"
-        ],
-        "functions": [
-            "if"
-        ],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_029",
-        "expression": "with {tB_01.02, default: null, interval: false}: {c0110} >= 0",
-        "type": "comparison",
-        "tables": [],
-        "columns": [
-            "c0110"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_030",
-        "expression": "with {tB_02.01, default: null, interval: false}: {c0050} >= 0",
-        "type": "comparison",
-        "tables": [],
-        "columns": [
-            "c0050"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_127",
-        "expression": "c0080<=c0090",
-        "type": "comparison",
-        "tables": [],
-        "columns": [
-            "c0080",
-            "c0090"
-        ],
-        "functions": [],
-        "source": "table_rule",
-        "table": "t01_02"
-    },
-    {
-        "id": "ECB_RULE_027",
-        "expression": "with {tB_02.01,  default:null, interval:false}: not ( isnull ({(c0020, c0040, c0050)}) )",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0020",
-            "c0050",
-            "c0040"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_034",
-        "expression": "with {tB_02.02, default: 0, interval: false}: {c0080} > {c0070}",
-        "type": "comparison",
-        "tables": [],
-        "columns": [
-            "c0080",
-            "c0070"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_040",
-        "expression": "with {tB_07.01, default:0, interval: false}: if {c0050} = [eba_ZZ:x959] or {c0050} = [eba_ZZ:x960] then (not (isnull ({c0060}))) endif",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0050",
-            "c0060"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_124",
-        "expression": "c0010+c0020=c0030",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0020",
-            "c0030",
-            "c0010"
-        ],
-        "functions": [],
-        "source": "table_rule",
-        "table": "t01_01"
-    },
-    {
-        "id": "ECB_RULE_126",
-        "expression": "c0050+c0060=c0070",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0070",
-            "c0050",
-            "c0060"
-        ],
-        "functions": [],
-        "source": "table_rule",
-        "table": "t01_02"
-    },
-    {
-        "id": "ECB_RULE_021",
-        "expression": "with {tB_01.02,  default:null, interval:false}: not ( isnull ({c0020-0090}) )",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0020"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_023",
-        "expression": "with {tB_02.02,  default:null, interval:false}: not ( isnull ({c0040-0080}) )",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0040"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_026",
-        "expression": "with {tB_04.01, default:null, interval:false}: not ( isnull ({c0030}) )",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0030"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_041",
-        "expression": "match({tB_01.02, c0060}, \"^[A-Z0-9]{18}[0-9]{2}$\")",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0060"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_082",
-        "expression": "match({tB_01.01, c0020}[get ERI], \"^[A-Z0-9]{18}[0-9]{2}$\")",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0020"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_083",
-        "expression": "match({tB_01.02, c0020}[get ESI], \"^[A-Z0-9]{18}[0-9]{2}$\")",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0020"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_084",
-        "expression": "match({tB_01.03, c0030}[get LHH], \"^[A-Z0-9]{18}[0-9]{2}$\")",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0030"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_085",
-        "expression": "match({tB_02.02, c0040}[get LES], \"^[A-Z0-9]{18}[0-9]{2}$\")",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0040"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    },
-    {
-        "id": "ECB_RULE_086",
-        "expression": "match({tB_03.01, c0030}[get LEA], \"^[A-Z0-9]{18}[0-9]{2}$\")",
-        "type": "arithmetic",
-        "tables": [],
-        "columns": [
-            "c0030"
-        ],
-        "functions": [],
-        "source": "validation_sheet",
-        "sheet": "DPM Business Validation Rules"
-    }
-]
+from ecb_frame_cache import DEFAULT_MAX_BYTES as DEFAULT_FRAME_CACHE_MAX_BYTES, FrameCache
+from ecb_profile import NULL_PROFILE, Profile
+from ecb_readers import READERS, resolve_reader
+from ecb_result_cache import DEFAULT_MAX_BYTES, ResultCache
+
+# The rule engine, rule packs and workbook loader pull in pandas, numpy and
+# openpyxl; they are imported where first needed so that --help and argument
+# errors start without them. Validating a workbook, even from the result
+# cache, imports them.
+
+DOMAIN_RULE = {'id': 'ECB_DOMAIN', 'type': 'domain'}
+LAYOUT_RULE = {'id': 'ECB_LAYOUT', 'type': 'structure'}
+DEFAULT_MAX_ERRORS_PER_RULE = 1000
+DEFAULT_PAGE_SIZE = 100
+FAIL_FAST_MODES = ('rule', 'sheet', 'file')
+
+_worker_validator = None
+
+
+def _init_sheet_worker(options):
+    global _worker_validator
+    _worker_validator = ECBValidator(verbose=False, **options)
+
+
+def _validate_sheet_in_worker(file_path, sheet_name):
+    from ecb_workbook import WorkbookReader
+    keys = {}
+    profile = _worker_validator._start_profile()
+    with profile.stage('open'):
+        workbook = WorkbookReader(file_path, layout=_worker_validator.layout, reader=_worker_validator.reader,
+                                  frame_cache=_worker_validator.frame_cache)
+    with workbook:
+        results = _worker_validator._validate_loaded_sheet(workbook, sheet_name, keys)
+    return results, keys, profile.to_dict() if profile.enabled else None
+
+
+def _validate_file_in_worker(file_path):
+    return _worker_validator.validate_file(file_path)
+
+
+def _warm_worker():
+    _worker_validator.warm()
+    return True
+
+
+def expand_targets(target):
+    """Workbook paths for a file, a directory or a glob pattern"""
+    path = Path(target)
+    if path.is_dir():
+        candidates = path.glob('*.xlsx')
+    elif glob.has_magic(target):
+        candidates = (Path(p) for p in glob.glob(target, recursive=True))
+    else:
+        candidates = [path]
+    # Skip Excel lock files (~$name.xlsx) left next to open workbooks
+    return sorted(str(p) for p in candidates if not p.name.startswith('~$'))
+
+
+def page_errors(results, offset=0, limit=DEFAULT_PAGE_SIZE):
+    """Give each sheet of validate_file results errors offset..offset+limit of its full error list
+
+    The full list is what max_errors_per_rule=None would list: the sheet's
+    errors that are not rule violations, then every failing cell, rebuilt
+    from the compact `violations`. Its length is the sheet's error_count.
+    """
+    from ecb_violations import Violations
+    for report in results.get('sheet_results', {}).values():
+        violations = Violations.from_dict(report.get('violations') or ())
+        sheet_errors = report['errors'][:report['error_count'] - violations.total]
+        errors = sheet_errors[offset:offset + limit]
+        errors += violations.page(max(offset - len(sheet_errors), 0), limit - len(errors))
+        report.update(errors=errors, errors_page={'offset': offset, 'limit': limit})
+    return results
+
 
 class ECBValidator:
-    def __init__(self):
-        self.rules = RULES
-        print(f"ECB Validator initialized with {len(self.rules)} rules")
+    def __init__(self, chunk_size=None, jobs=None, rules=None, verbose=True,
+                 cache_dir=None, cache_max_bytes=DEFAULT_MAX_BYTES, rule_pack=None, code_lists=None, layout=None,
+                 max_errors_per_rule=DEFAULT_MAX_ERRORS_PER_RULE, fail_fast=None, sample=None, profile=False,
+                 reader='auto', frame_cache_dir=None, frame_cache_max_bytes=DEFAULT_FRAME_CACHE_MAX_BYTES):
+        """chunk_size: stream sheets in chunks of this many rows instead of loading them whole
+        jobs: validate the sheets of a workbook in this many worker processes
+        cache_dir: reuse sheet results for unchanged sheets across runs
+        rule_pack: rule JSON file or compiled artifact (default: complete_ecb_validation_rules.json)
+        code_lists: CodeLists to check every enumerated cell against its column's domain
+        layout: LayoutIndex to reject sheets whose header does not fit their template
+        max_errors_per_rule: error dicts listed per rule and sheet (None: all); counts
+            and the compact `violations` always cover every failing cell
+        fail_fast: stop at the first violation of each rule ('rule'), of each
+            sheet ('sheet') or of the workbook ('file'); counts are then lower bounds
+        sample: evaluate the rules on this fraction of each sheet's data rows, drawn
+            as a stratified sample, and estimate the violation rates from it
+        profile: time every stage and rule of a validate_file run and add the
+            timings to its result under 'profile' (see ecb_profile)
+        reader: workbook reader backend, one of ecb_readers.READERS; 'auto' uses
+            calamine if it is installed and the streaming XML reader otherwise,
+            and always the XML reader with chunk_size, as calamine reads a sheet whole
+        frame_cache_dir: keep each parsed sheet's frame in this directory, keyed by
+            the workbook's file hash, and read it from there when the file is
+            validated again, e.g. under a new rule pack (see ecb_frame_cache)
+        """
+        if fail_fast is not None and fail_fast not in FAIL_FAST_MODES:
+            raise ValueError(f"fail_fast must be one of {', '.join(FAIL_FAST_MODES)}, got {fail_fast!r}")
+        if sample is not None and not 0 < sample <= 1:
+            raise ValueError(f"sample must be a fraction in (0, 1], got {sample}")
+        if reader not in READERS:
+            raise ValueError(f"reader must be one of {', '.join(READERS)}, got {reader!r}")
+        self.rule_pack = rule_pack
+        self.chunk_size = chunk_size
+        self.jobs = jobs
+        self.verbose = verbose
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.code_lists = code_lists
+        self.layout = layout
+        self.max_errors_per_rule = max_errors_per_rule
+        self.fail_fast = fail_fast
+        self.sample = sample
+        self.profile = profile
+        self.reader = resolve_reader(reader, streaming=bool(chunk_size))
+        self.frame_cache_dir = frame_cache_dir
+        self.frame_cache_max_bytes = frame_cache_max_bytes
+        self._profile = NULL_PROFILE  # Profile of the run in progress
+        self.cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir else None
+        self.frame_cache = FrameCache(frame_cache_dir, frame_cache_max_bytes) if frame_cache_dir else None
+        self._rules = rules
+        self._index = None
+        self._ruleset_hash = None
+        if rules is not None and verbose:
+            print(f"ECB Validator initialized with {len(rules)} rules")
+
+    @property
+    def rules(self):
+        """The rule list, loaded from the rule pack on first use"""
+        if self._rules is None:
+            from ecb_rule_pack import DEFAULT_RULE_PACK, RulePack
+            self._rules = RulePack.load(self.rule_pack or DEFAULT_RULE_PACK).rules
+            if self.verbose:
+                print(f"ECB Validator initialized with {len(self._rules)} rules")
+        return self._rules
+
+    @property
+    def index(self):
+        """Table-code index over the rules; compiles each table's rules on first use"""
+        if self._index is None:
+            from ecb_rule_engine import RuleIndex
+            self._index = RuleIndex(self.rules)
+        return self._index
+
+    @property
+    def ruleset_hash(self):
+        """Hash of everything that decides a sheet's result: the rules, code lists and layout"""
+        if self._ruleset_hash is None:
+            from ecb_rule_engine import ruleset_hash
+            parts = [ruleset_hash(self.rules)]
+            parts += [option.fingerprint() for option in (self.code_lists, self.layout) if option is not None]
+            self._ruleset_hash = parts[0] if len(parts) == 1 else hashlib.sha1(''.join(parts).encode()).hexdigest()
+        return self._ruleset_hash
 
     def validate_file(self, file_path):
         """Validate an ECB Excel file"""
+        from ecb_workbook import WorkbookReader
+        profile = self._start_profile()
         try:
             results = {'overall_pass': True, 'total_errors': 0, 'sheet_results': {}}
 
-            xl_file = pd.ExcelFile(file_path)
+            with profile.stage('open'):
+                workbook = WorkbookReader(file_path, layout=self.layout, reader=self.reader,
+                                          frame_cache=self.frame_cache)
+            with workbook:
+                sheet_names = workbook.table_sheets()
+                keys = {}  # key columns of the sheets parsed below, for the cross-table checks
+                if self.jobs and self.jobs > 1 and len(sheet_names) > 1:
+                    sheet_results_by_name = self._validate_sheets_in_parallel(file_path, sheet_names, keys)
+                else:
+                    sheet_results_by_name = {}
+                    for name in sheet_names:
+                        sheet_results_by_name[name] = self._validate_loaded_sheet(workbook, name, keys)
+                        if self.fail_fast == 'file' and self._failed(sheet_results_by_name[name]):
+                            break
+                if not (self.fail_fast == 'file' and any(map(self._failed, sheet_results_by_name.values()))):
+                    with profile.stage('references'):
+                        self._check_references(workbook, sheet_results_by_name, keys)
 
-            for sheet_name in xl_file.sheet_names:
-                if sheet_name.startswith('tB_'):
-                    sheet_results = self.validate_sheet(file_path, sheet_name)
-                    results['sheet_results'][sheet_name] = sheet_results
-                    results['total_errors'] += len(sheet_results.get('errors', []))
+            # Merge in workbook order so results do not depend on completion order
+            for sheet_name in sheet_names:
+                if sheet_name not in sheet_results_by_name:
+                    results.setdefault('unchecked_sheets', []).append(sheet_name)
+                    continue
+                with profile.stage('report', sheet_name) as stage:
+                    sheet_results = self._report(sheet_results_by_name[sheet_name])
+                    stage.rows = sheet_results['data_rows']
+                results['sheet_results'][sheet_name] = sheet_results
+                results['total_errors'] += sheet_results['error_count']
 
             results['overall_pass'] = results['total_errors'] == 0
+            results['ruleset_hash'] = self.ruleset_hash
+            if self.fail_fast:
+                results['fail_fast'] = self.fail_fast
+            if self.sample:
+                results['sample'] = self.sample
+            if profile.enabled:
+                results['profile'] = profile.to_dict()
             return results
 
         except Exception as e:
             return {'error': f"Validation failed: {e}"}
 
-    def validate_sheet(self, file_path, sheet_name):
-        """Validate a single sheet"""
+    def _validate_sheets_in_parallel(self, file_path, sheet_names, keys):
+        """Fan sheets out to worker processes; each worker opens the workbook itself
+
+        With fail_fast='file' the sheets not yet started when a sheet fails
+        are cancelled and left out of the results.
+        """
+        results = {}
+        failed = False
+        with self.worker_pool(min(self.jobs, len(sheet_names))) as pool:
+            futures = {name: pool.submit(_validate_sheet_in_worker, file_path, name) for name in sheet_names}
+            for name, future in futures.items():
+                if failed:
+                    future.cancel()
+                    continue
+                results[name], sheet_keys, profile = future.result()
+                keys.update(sheet_keys)
+                if profile is not None:
+                    self._profile.update(profile)
+                failed = self.fail_fast == 'file' and self._failed(results[name])
+        return results
+
+    def _start_profile(self):
+        """A fresh Profile for the run starting now, or NULL_PROFILE if profiling is off"""
+        self._profile = Profile() if self.profile else NULL_PROFILE
+        return self._profile
+
+    @staticmethod
+    def _failed(sheet_results):
+        return bool(sheet_results.get('errors') or sheet_results.get('violations'))
+
+    @property
+    def _complete(self):
+        """Whether results cover every row and every failing cell, and may be cached"""
+        return not (self.fail_fast or self.sample)
+
+    def _check_references(self, workbook, sheet_results_by_name, keys):
+        """Add cross-table key violations to the sheet results of the referencing tables
+
+        Key columns come from the sheets parsed in this run; those of sheets
+        answered from the cache come from the cache too, and are only read
+        again if neither the combined check nor their key columns are cached.
+        """
+        from ecb_referential import KEY_COLUMNS, check_references, references_fingerprint
+        from ecb_violations import Violations
+        tables = [table for table in KEY_COLUMNS if table in sheet_results_by_name]
+        cached = None
+        if self.cache is not None and not self.sample:
+            references_hash = references_fingerprint({t: workbook.sheet_fingerprint(t) for t in tables})
+            cached = self.cache.get(references_hash, self.ruleset_hash)
+        if cached is None:
+            for table in tables:
+                if table not in keys:
+                    keys[table] = self._key_frame(workbook, table)
+                elif keys[table] is not None and self.cache is not None:
+                    self._cache_keys(workbook, table, keys[table])
+            violations, skipped = check_references({t: keys[t] for t in tables if keys[t] is not None})
+            by_table = {}
+            for fk, rows in violations:
+                by_table.setdefault(fk.table, Violations()).add(fk.rule_id, 'referential', fk.columns[0], rows)
+            cached = {'violations': {table: found.to_dict() for table, found in by_table.items()},
+                      'skipped_rules': [[fk.table, {'rule_id': fk.rule_id, 'reason': reason}] for fk, reason in skipped]}
+            if self.cache is not None and self._complete:
+                self.cache.put(references_hash, self.ruleset_hash, cached)
+        stopped = False
+        for table, entries in cached['violations'].items():
+            sheet_results = sheet_results_by_name[table]
+            found = Violations.from_dict(entries)
+            if self.fail_fast:
+                # Each key reports its first failing row. With 'sheet' a sheet that already failed gets none and
+                # any other sheet only its first failing key; with 'file' only the first such sheet gets one
+                if self.fail_fast != 'rule' and (stopped or self._failed(sheet_results)):
+                    continue
+                first = Violations()
+                for entry in found.entries()[:None if self.fail_fast == 'rule' else 1]:
+                    first.add(*entry, found.rows(*entry)[:1])
+                found, stopped = first, self.fail_fast == 'file'
+            sheet_results.setdefault('violations', Violations()).update(found)
+        for table, entry in cached['skipped_rules']:
+            sheet_results_by_name[table].setdefault('skipped_rules', []).append(entry)
+
+    def _key_frame(self, workbook, sheet_name):
+        """The cross-table key columns of a sheet, or None if it cannot be read
+
+        With a result cache they are kept under the sheet's fingerprint, so
+        the sheet is only parsed for them once per content.
+        """
+        from ecb_referential import KEYS_HASH, keys_from_dict, select_keys
+        if self.cache is not None:
+            cached = self.cache.get(workbook.sheet_fingerprint(sheet_name), KEYS_HASH)
+            if cached is not None:
+                return keys_from_dict(cached)
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+            _, frame = workbook.read_sheet(sheet_name)
+        except Exception:
+            return None
+        keys = select_keys(sheet_name, frame)
+        if self.cache is not None:
+            self._cache_keys(workbook, sheet_name, keys)
+        return keys
+
+    def _cache_keys(self, workbook, sheet_name, keys):
+        from ecb_referential import KEYS_HASH, keys_to_dict
+        self.cache.put(workbook.sheet_fingerprint(sheet_name), KEYS_HASH, keys_to_dict(keys))
+
+    def worker_pool(self, max_workers):
+        """Process pool whose workers each hold a validator with this one's rules and options"""
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sheet_worker,
+                                   initargs=(self._worker_options(),))
 
-            # Extract data starting from row 8 (index 7)
-            data_df = df.iloc[7:].reset_index(drop=True)
+    def warm_pool(self, pool, workers):
+        """Start every worker of `pool` and have it compile its rules; returns the futures"""
+        return [pool.submit(_warm_worker) for _ in range(workers)]
 
-            # Map columns starting from column D (index 3)
-            column_mapping = {}
-            if len(df) > 5:  # Check if row 6 exists
-                header_row = df.iloc[5]  # Row 6 (0-indexed as 5)
-                for i, col_code in enumerate(header_row):
-                    if pd.notna(col_code) and str(col_code).startswith('c'):
-                        column_mapping[i] = str(col_code)
+    def submit_file(self, pool, file_path):
+        """Validate a workbook on a pool from worker_pool(); returns a Future of validate_file's result"""
+        return pool.submit(_validate_file_in_worker, file_path)
 
-            # Apply rules (simplified validation)
-            errors = []
+    def warm(self):
+        """Load the rules and compile every table's rules now instead of on first use"""
+        for table in self.index.tables():
+            self.index.invalid_for(table)
+            self.index.rules_for(table, ())
+        return self
 
-            return {'errors': errors, 'data_rows': len(data_df)}
+    def _worker_options(self):
+        return {'rules': self.rules, 'chunk_size': self.chunk_size, 'code_lists': self.code_lists, 'layout': self.layout,
+                'cache_dir': self.cache_dir, 'cache_max_bytes': self.cache_max_bytes,
+                'max_errors_per_rule': self.max_errors_per_rule, 'fail_fast': self.fail_fast, 'sample': self.sample,
+                'profile': self.profile, 'reader': self.reader, 'frame_cache_dir': self.frame_cache_dir,
+                'frame_cache_max_bytes': self.frame_cache_max_bytes}
+
+    def validate_files(self, file_paths, jobs=None):
+        """Yield (file_path, results) for many workbooks, in input order
+
+        With jobs > 1 the workbooks are spread over one shared pool of worker
+        processes; each worker compiles the rules once and then validates its
+        workbooks serially.
+        """
+        if not jobs or jobs <= 1 or len(file_paths) <= 1:
+            for file_path in file_paths:
+                yield file_path, self.validate_file(file_path)
+            return
+        with self.worker_pool(min(jobs, len(file_paths))) as pool:
+            yield from zip(file_paths, pool.map(_validate_file_in_worker, file_paths))
+
+    def revalidate_file(self, previous_file_path, previous_results, file_path):
+        """Validate a new version of a workbook by updating the previous version's results
+
+        previous_results is validate_file's result for previous_file_path,
+        with the same rules and options; results of other rules, told by
+        their ruleset_hash, fall back to a full validation. Sheets whose content did not change
+        keep their results. Changed sheets are diffed cell by cell, and only
+        the rules reading a changed column are evaluated again, on the rows
+        where one of their columns changed. The cross-table checks run again
+        only if a key column changed. The result matches validate_file on the
+        new version, plus an `incremental` summary.
+        """
+        if (not self._complete or 'error' in previous_results
+                or previous_results.get('ruleset_hash') != self.ruleset_hash):
+            return self.validate_file(file_path)
+        from ecb_referential import KEY_COLUMNS
+        from ecb_workbook import WorkbookReader
+        profile = self._start_profile()
+        try:
+            results = {'overall_pass': True, 'total_errors': 0, 'sheet_results': {}}
+            summary = {'unchanged': [], 'revalidated': {}, 'validated': []}
+
+            with profile.stage('open'):
+                previous = WorkbookReader(previous_file_path, layout=self.layout, reader=self.reader,
+                                          frame_cache=self.frame_cache)
+                try:
+                    workbook = WorkbookReader(file_path, layout=self.layout, reader=self.reader,
+                                              frame_cache=self.frame_cache)
+                except Exception:
+                    previous.close()
+                    raise
+            with previous, workbook:
+                sheet_names = workbook.table_sheets()
+                previous_names = set(previous.table_sheets())
+                keys = {}
+                sheet_results_by_name, diffs = {}, {}
+                for name in sheet_names:
+                    old = previous_results['sheet_results'].get(name)
+                    if old is None or name not in previous_names or not self._reusable(old):
+                        summary['validated'].append(name)
+                        sheet_results_by_name[name] = self._validate_loaded_sheet(workbook, name, keys)
+                    elif previous.sheet_fingerprint(name) == workbook.sheet_fingerprint(name):
+                        summary['unchanged'].append(name)
+                        sheet_results_by_name[name] = self._previous_sheet_results(old)
+                    else:
+                        sheet_results_by_name[name], diffs[name] = self._revalidate_sheet(
+                            previous, workbook, name, old, keys)
+                        if diffs[name] is None:
+                            summary['validated'].append(name)
+                        elif diffs[name].unchanged:
+                            summary['unchanged'].append(name)
+                            sheet_results_by_name[name].pop('rules_rerun')
+                        else:
+                            summary['revalidated'][name] = {'changed_cells': diffs[name].changed_cells,
+                                                            'removed_rows': len(diffs[name].removed_rows),
+                                                            'rules_rerun': sheet_results_by_name[name]
+                                                            .pop('rules_rerun')}
+
+                key_tables = [t for t in KEY_COLUMNS if t in sheet_names or t in previous_names]
+                if any(t not in sheet_names or t not in previous_names or t in summary['validated']
+                       or (t in diffs and diffs[t].touches(KEY_COLUMNS[t])) for t in key_tables):
+                    for sheet_results in sheet_results_by_name.values():
+                        self._drop_references(sheet_results)
+                    with profile.stage('references'):
+                        self._check_references(workbook, sheet_results_by_name, keys)
+
+            for sheet_name in sheet_names:
+                with profile.stage('report', sheet_name) as stage:
+                    sheet_results = self._report(sheet_results_by_name[sheet_name])
+                    stage.rows = sheet_results['data_rows']
+                results['sheet_results'][sheet_name] = sheet_results
+                results['total_errors'] += sheet_results['error_count']
+
+            results['overall_pass'] = results['total_errors'] == 0
+            results['ruleset_hash'] = self.ruleset_hash
+            results['incremental'] = summary
+            if profile.enabled:
+                results['profile'] = profile.to_dict()
+            return results
 
+        except Exception as e:
+            return {'error': f"Validation failed: {e}"}
+
+    @staticmethod
+    def _reusable(report):
+        """Whether a reported sheet result lists every failing cell in its `violations`"""
+        return 'violations' in report and report['error_count'] == sum(e['count'] for e in report['violations'])
+
+    @staticmethod
+    def _previous_sheet_results(report):
+        from ecb_violations import Violations
+        return {'violations': Violations.from_dict(report['violations']), 'data_rows': report['data_rows'],
+                'skipped_rules': list(report.get('skipped_rules', []))}
+
+    @staticmethod
+    def _drop_references(sheet_results):
+        """Remove cross-table results, before the checks run again"""
+        from ecb_referential import FOREIGN_KEYS
+        from ecb_violations import Violations
+        if 'violations' in sheet_results:
+            old, sheet_results['violations'] = sheet_results['violations'], Violations()
+            for entry in old.entries():
+                if entry[1] != 'referential':
+                    sheet_results['violations'].add(*entry, old.rows(*entry))
+        reference_ids = {fk.rule_id for fk in FOREIGN_KEYS}
+        if 'skipped_rules' in sheet_results:
+            sheet_results['skipped_rules'] = [entry for entry in sheet_results['skipped_rules']
+                                              if entry['rule_id'] not in reference_ids]
+
+    def _revalidate_sheet(self, previous, workbook, sheet_name, report, keys):
+        """(sheet results, SheetDiff or None) for a sheet whose XML changed since `previous`
+
+        The cells are diffed from the raw XML of both versions; only the new
+        version is parsed, and only if a data cell changed.
+        """
+        from ecb_incremental import diff_frames, diff_sheets
+        from ecb_referential import KEY_COLUMNS, select_keys
+        if self.layout is not None and self.layout.structure_problems(sheet_name, workbook.header(sheet_name)):
+            return self._validate_loaded_sheet(workbook, sheet_name, keys), None
+        frames = []
+
+        def load_frame():
+            if not frames:
+                with self._profile.stage('parse', sheet_name) as stage:
+                    frames.append(workbook.read_sheet(sheet_name)[1])
+                    stage.rows = len(frames[0])
+                if sheet_name in KEY_COLUMNS:
+                    keys[sheet_name] = select_keys(sheet_name, frames[0])
+            return frames[0]
+
+        with self._profile.stage('diff', sheet_name):
+            diff = diff_sheets(previous, workbook, sheet_name)
+        if diff is None and previous.header(sheet_name) == workbook.header(sheet_name):
+            # Cells without references: diff the parsed frames instead
+            diff = diff_frames(previous.read_sheet(sheet_name)[1], load_frame())
+        if diff is None:
+            return self._frame_results(sheet_name, load_frame()), None
+        columns = list(workbook.header(sheet_name).values())
+        return self._updated_results(sheet_name, columns, load_frame, diff, self._previous_sheet_results(report)), diff
+
+    def _updated_results(self, sheet_name, columns, load_frame, diff, old_results):
+        """Sheet results for the new version from the previous version's results and the cell diff
+
+        The sheet is only parsed, through load_frame(), if a rule reads one
+        of the changed columns. Violations are rebuilt in evaluation order,
+        so the report lists them as a full validation would.
+        """
+        import numpy as np
+        from ecb_incremental import may_change_type
+        from ecb_violations import Violations
+        old = old_results['violations']
+        violations = Violations()
+        removed = diff.removed_rows
+        rules_rerun = 0
+
+        def merge(rule_id, rule_type, column, rows, failing_rows):
+            kept = old.rows(rule_id, rule_type, column)
+            kept = kept[~np.isin(kept, rows) & ~np.isin(kept, removed)]
+            violations.add(rule_id, rule_type, column, np.union1d(kept, failing_rows))
+
+        skipped = {entry['rule_id'] for entry in old_results['skipped_rules']}
+        retyped = None
+        checks = [(rule, compiled.columns_read(columns), compiled.evaluate_all)
+                  for rule, compiled in self.index.rules_for(sheet_name, columns)]
+        if self.code_lists is not None:
+            domain_columns = [c for c in self.code_lists.domains.get(sheet_name, {}) if c in columns]
+            checks.append((DOMAIN_RULE, set(domain_columns),
+                           lambda frame: self.code_lists.invalid_cells(sheet_name, frame)))
+        for rule, read, evaluate in checks:
+            if rule['id'] in skipped:
+                continue
+            rows = diff.rows_for(read)
+            if not len(rows):
+                for entry in old.entries(rule['id'], rule['type']):
+                    merge(*entry, rows, ())
+                continue
+            frame = load_frame()
+            if retyped is None:
+                # Rules reading such a column are evaluated on every row, not only the changed ones
+                retyped = {column for column in diff.changed_columns if may_change_type(frame[column])}
+            if read & retyped:
+                rows = frame.index.to_numpy(dtype=np.int64)
+            rules_rerun += 1
+            start = time.perf_counter()
+            subset = frame.loc[rows]
+            failing_by_column = {column: subset.index.to_numpy()[failing] for column, failing in evaluate(subset)}
+            self._profile.rule(sheet_name, rule['id'], time.perf_counter() - start, len(subset),
+                               sum(len(failing) for failing in failing_by_column.values()))
+            if rule is DOMAIN_RULE:
+                # Only failing domain columns are yielded; keep every column in domain order
+                failing_by_column = {c: failing_by_column.get(c, ()) for c in domain_columns}
+            for column, failing_rows in failing_by_column.items():
+                merge(rule['id'], rule['type'], column, rows, failing_rows)
+        for entry in old.entries(rule_type='referential'):
+            merge(*entry, (), ())
+        data_rows = old_results['data_rows'] + len(diff.added_rows) - len(diff.removed_rows)
+        return {'violations': violations, 'data_rows': data_rows, 'skipped_rules': old_results['skipped_rules'],
+                'rules_rerun': rules_rerun}
+
+    def validate_sheet(self, file_path, sheet_name):
+        """Validate a single sheet"""
+        from ecb_workbook import WorkbookReader
+        try:
+            with WorkbookReader(file_path, layout=self.layout, reader=self.reader,
+                                frame_cache=self.frame_cache) as workbook:
+                return self._report(self._validate_loaded_sheet(workbook, sheet_name))
         except Exception as e:
             return {'errors': [f"Sheet validation error: {e}"], 'data_rows': 0}
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python ecb_validator.py <excel_file>")
-        sys.exit(1)
+    def _validate_loaded_sheet(self, workbook, sheet_name, keys=None):
+        """Validate one sheet of an open workbook; the result holds a Violations store, see _report
+
+        If `keys` is a dict and the sheet holds cross-table key columns, those
+        columns are stored in it under the sheet name whenever the sheet is
+        parsed, or None if the sheet is rejected for its structure.
+        """
+        try:
+            with self._profile.stage('map_columns', sheet_name):
+                column_mapping = workbook.header(sheet_name)
+            if self.layout is not None:
+                # Checked from the header row alone, before the sheet is hashed or parsed
+                from ecb_violations import error_dict
+                from ecb_workbook import HEADER_ROW
+                problems = self.layout.structure_problems(sheet_name, column_mapping)
+                if problems:
+                    if keys is not None:
+                        keys[sheet_name] = None
+                    return {'errors': [{**error_dict(LAYOUT_RULE['id'], LAYOUT_RULE['type'], HEADER_ROW, column), 'message': problem}
+                                       for column, problem in problems],
+                            'data_rows': 0, 'skipped_rules': []}
+            # A cached result is complete, which also answers a fail-fast run
+            if self.cache is not None and not self.sample:
+                sheet_hash = workbook.sheet_fingerprint(sheet_name)
+                cached = self.cache.get(sheet_hash, self.ruleset_hash)
+                if cached is not None:
+                    from ecb_violations import Violations
+                    return {**cached, 'violations': Violations.from_dict(cached['violations'])}
+            from ecb_referential import KEY_COLUMNS, select_keys
+            if keys is not None and sheet_name not in KEY_COLUMNS:
+                keys = None
+            if self.chunk_size:
+                sheet_results = self._validate_streamed_sheet(workbook, sheet_name, keys)
+            else:
+                # Column codes on row 6, data from row 8, empty rows dropped
+                with self._profile.stage('parse', sheet_name) as stage:
+                    _, frame = workbook.read_sheet(sheet_name)
+                    stage.rows = len(frame)
+                with self._profile.stage('evaluate', sheet_name) as stage:
+                    sheet_results = self._frame_results(sheet_name, frame)
+                    stage.rows = len(frame)
+                if keys is not None:
+                    keys[sheet_name] = select_keys(sheet_name, frame)
+            if self.cache is not None and self._complete:
+                self.cache.put(sheet_hash, self.ruleset_hash,
+                               {**sheet_results, 'violations': sheet_results['violations'].to_dict()})
+            return sheet_results
+        except Exception as e:
+            return {'errors': [f"Sheet validation error: {e}"], 'data_rows': 0}
+
+    def _validate_streamed_sheet(self, workbook, sheet_name, keys=None):
+        """Validate a sheet chunk by chunk; the violations are listed as validating it whole would list them"""
+        from ecb_referential import select_keys
+        from ecb_violations import Violations
+        violations = Violations()
+        skipped_rules = self._invalid_rules(sheet_name)
+        sample = self._sampler()
+        order = {}
+        data_rows = 0
+        key_chunks = []
+        for frame in self._timed_chunks(workbook.iter_sheet_chunks(sheet_name, self.chunk_size), sheet_name):
+            data_rows += len(frame)
+            if keys is not None:
+                key_chunks.append(select_keys(sheet_name, frame))
+            with self._profile.stage('evaluate', sheet_name) as stage:
+                self._find_violations(sheet_name, frame if sample is None else sample.take(frame),
+                                      skipped_rules, violations, order)
+                stage.rows = len(frame)
+            if self._sheet_done(violations):
+                # The rest of the sheet is not read; its keys are read again if needed
+                key_chunks = []
+                break
+        else:
+            self._finish_sample(sheet_name, sample, skipped_rules, violations, order)
+        # A rule first failing in a later chunk goes back to its place in the evaluation order
+        violations.sort(order.__getitem__)
+        if key_chunks:
+            import pandas as pd
+            keys[sheet_name] = pd.concat(key_chunks)
+        return self._sheet_results(violations, data_rows, skipped_rules, sample)
+
+    def _timed_chunks(self, chunks, sheet_name):
+        """The chunks of a sheet, the time spent reading each added to its 'parse' stage"""
+        chunks = iter(chunks)
+        while True:
+            with self._profile.stage('parse', sheet_name) as stage:
+                frame = next(chunks, None)
+                stage.rows = 0 if frame is None else len(frame)
+            if frame is None:
+                return
+            yield frame
+
+    def iter_sheet_errors(self, workbook, sheet_name, chunk_size=None):
+        """Yield a sheet's errors chunk by chunk, never holding the whole sheet in memory
+
+        All current rules are row-local, so evaluating them per chunk gives the
+        same result as evaluating the whole sheet.
+        """
+        from ecb_violations import Violations
+        from ecb_workbook import DEFAULT_CHUNK_SIZE
+        skipped_rules = self._invalid_rules(sheet_name)
+        for frame in workbook.iter_sheet_chunks(sheet_name, chunk_size or self.chunk_size or DEFAULT_CHUNK_SIZE):
+            violations = Violations()
+            self._find_violations(sheet_name, frame, skipped_rules, violations)
+            yield from violations.errors()
+
+    def validate_frame(self, sheet_name, frame):
+        """Apply the sheet's rules to a frame of cNNNN columns indexed by Excel row"""
+        return self._report(self._frame_results(sheet_name, frame))
+
+    def _frame_results(self, sheet_name, frame):
+        from ecb_violations import Violations
+        violations = Violations()
+        skipped_rules = self._invalid_rules(sheet_name)
+        sample = self._sampler()
+        order = {}
+        self._find_violations(sheet_name, frame if sample is None else sample.take(frame), skipped_rules, violations,
+                              order)
+        self._finish_sample(sheet_name, sample, skipped_rules, violations, order)
+        violations.sort(order.__getitem__)
+        return self._sheet_results(violations, len(frame), skipped_rules, sample)
+
+    def _sampler(self):
+        if not self.sample:
+            return None
+        from ecb_sampling import StratifiedSample
+        return StratifiedSample(self.sample)
+
+    def _finish_sample(self, sheet_name, sample, skipped_rules, violations, order=None):
+        """Evaluate the row the sample draws from a sheet's last, partial block"""
+        last = sample.finish() if sample is not None else None
+        if last is not None:
+            self._find_violations(sheet_name, last, skipped_rules, violations, order)
+
+    @staticmethod
+    def _sheet_results(violations, data_rows, skipped_rules, sample=None):
+        sheet_results = {'violations': violations, 'data_rows': data_rows, 'skipped_rules': skipped_rules}
+        if sample is not None:
+            sheet_results['sampled_rows'] = sample.rows
+        return sheet_results
 
-    validator = ECBValidator()
-    results = validator.validate_file(sys.argv[1])
+    def _sheet_done(self, violations):
+        return self.fail_fast in ('sheet', 'file') and len(violations) > 0
 
-    print("Validation Results:")
-    print(json.dumps(results, indent=2))
+    def _report(self, sheet_results):
+        """Public form of a sheet result: error dicts capped per rule, with the full counts
+
+        error_count counts every failing cell; `violations` lists the failing
+        rows of each rule and column compactly (see ecb_violations). A sampled
+        sheet also gets the violation rates estimated from its sample.
+        """
+        from ecb_violations import Violations
+        violations = sheet_results.get('violations') or Violations()
+        errors = list(sheet_results.get('errors', []))
+        error_count = len(errors) + violations.total
+        errors.extend(violations.errors(self.max_errors_per_rule))
+        report = {key: value for key, value in sheet_results.items() if key not in ('violations', 'sampled_rows')}
+        report.update(errors=errors, error_count=error_count, violations=violations.to_dict())
+        if 'sampled_rows' in sheet_results:
+            from ecb_sampling import sample_estimates
+            report['sample'] = sample_estimates(violations, sheet_results['sampled_rows'], report['data_rows'])
+        return report
+
+    def _invalid_rules(self, sheet_name):
+        return [{'rule_id': rule['id'], 'reason': reason} for rule, reason in self.index.invalid_for(sheet_name)]
+
+    def _find_violations(self, sheet_name, frame, skipped_rules, violations, order=None):
+        """Add the failing rows of every applicable rule, then the cells outside their column's domain
+
+        Rules missing a column go to skipped_rules. In fail-fast mode a rule
+        reports only its first failing row over all of its columns, which is
+        the same however the sheet is chunked; rules that failed in an earlier chunk
+        are not evaluated again, and with 'sheet' or 'file' the first failing
+        rule ends the sheet. `order`, if given, maps each (rule id, rule type,
+        column) added to its place in the evaluation order of the whole sheet,
+        which is the same for every chunk.
+        """
+        skipped = {entry['rule_id'] for entry in skipped_rules}
+        excel_rows = frame.index.to_numpy()
+        checks = [(rule, compiled.evaluate_all) for rule, compiled in self.index.rules_for(sheet_name, frame.columns)]
+        domain_order = {}
+        if self.code_lists is not None:
+            checks.append((DOMAIN_RULE, lambda frame: self.code_lists.invalid_cells(sheet_name, frame)))
+            # Only failing domain columns are yielded; place them in domain order
+            domain_order = {column: i for i, column in enumerate(self.code_lists.domains.get(sheet_name, {}))}
+        for position, (rule, evaluate) in enumerate(checks):
+            if self._sheet_done(violations):
+                return
+            if rule['id'] in skipped or (self.fail_fast and rule['id'] in violations):
+                continue
+            start = time.perf_counter()
+            found = 0
+            try:
+                results = evaluate(frame)
+            except KeyError as e:
+                skipped_rules.append({'rule_id': rule['id'], 'reason': f"missing column {e.args[0]}"})
+                skipped.add(rule['id'])
+                continue
+            first = None  # in fail-fast mode, (column, row) of the rule's first failing row over all its columns
+            for member, (column, failing) in enumerate(results):
+                if order is not None:
+                    order[(rule['id'], rule['type'], column)] = (
+                        position, domain_order[column] if rule is DOMAIN_RULE else member)
+                rows = excel_rows[failing]
+                if not self.fail_fast:
+                    violations.add(rule['id'], rule['type'], column, rows)
+                    found += len(rows)
+                elif len(rows) and (first is None or rows[0] < first[1][0]):
+                    first = (column, rows[:1])
+            if first is not None:
+                violations.add(rule['id'], rule['type'], *first)
+                found = 1
+            self._profile.rule(sheet_name, rule['id'], time.perf_counter() - start, len(frame), found)
+
+
+def add_layout_arguments(parser):
+    parser.add_argument('--check-layout', action='store_true',
+                        help="reject sheets whose header row does not fit their template")
+    parser.add_argument('--check-domains', action='store_true',
+                        help="check enumerated cells against their column's domain")
+    parser.add_argument('--layout', help="annotated table layout workbook (default: the DORA 4.0 layout)")
+    parser.add_argument('--members', help="JSON file of members per domain hierarchy, e.g. {\"CT:CT7\": [...]}")
+
+
+def _fraction(text):
+    value = float(text)
+    if not 0 < value <= 1:
+        raise argparse.ArgumentTypeError(f"{text} is not a fraction in (0, 1]")
+    return value
+
+
+def add_screening_arguments(parser):
+    parser.add_argument('--fail-fast', nargs='?', const='file', choices=FAIL_FAST_MODES,
+                        help="stop at the first violation per rule, sheet or file (default: file)")
+    parser.add_argument('--sample', type=_fraction, metavar='FRACTION',
+                        help="evaluate a stratified sample of the data rows and estimate violation rates")
+
+
+def add_reader_argument(parser):
+    parser.add_argument('--reader', choices=READERS, default='auto',
+                        help="workbook reader backend (default: calamine if installed and "
+                             "sheets are not streamed with --chunk-size, else xml)")
+
+
+def layout_options(args):
+    """ECBValidator keyword arguments for --check-layout and --check-domains"""
+    if not (args.check_layout or args.check_domains):
+        return {}
+    from ecb_code_lists import CodeLists
+    from ecb_layout import DEFAULT_LAYOUT, LayoutIndex
+    layout = LayoutIndex.load(args.layout or DEFAULT_LAYOUT)
+    return {'layout': layout if args.check_layout else None,
+            'code_lists': CodeLists.load(layout, args.members) if args.check_domains else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate ECB Excel files against the ECB validation rules")
+    parser.add_argument('target', help="workbook, directory of workbooks, or glob pattern")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="worker processes (per workbook in batch mode, per sheet for a single workbook)")
+    parser.add_argument('--chunk-size', type=int, help="stream sheets in chunks of this many rows")
+    parser.add_argument('--output', help="write batch JSON lines to this file instead of stdout")
+    parser.add_argument('--cache-dir', help="reuse results for unchanged sheets from this directory")
+    parser.add_argument('--frame-cache', metavar='DIR',
+                        help="keep parsed sheets in this directory and reuse them when a workbook is validated again")
+    parser.add_argument('--rules', help="rule JSON file or compiled .rulepack artifact")
+    parser.add_argument('--max-errors-per-rule', type=int, default=DEFAULT_MAX_ERRORS_PER_RULE,
+                        help="error messages listed per rule and sheet; counts stay exact (0: list all)")
+    parser.add_argument('--offset', type=int,
+                        help="list each sheet's errors from this position of its full list, not capped per rule")
+    parser.add_argument('--limit', type=int,
+                        help=f"with --offset, errors listed per sheet (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument('--previous', metavar='WORKBOOK',
+                        help="previous version of the workbook; only the changed cells are validated again")
+    parser.add_argument('--previous-results', metavar='JSON', help="validation results of --previous")
+    parser.add_argument('--profile', action='store_true',
+                        help="add the time, rows and violations of every stage and rule to the results")
+    add_layout_arguments(parser)
+    add_screening_arguments(parser)
+    add_reader_argument(parser)
+    args = parser.parse_args(argv)
+    if bool(args.previous) != bool(args.previous_results):
+        parser.error("--previous and --previous-results go together")
+    if (args.offset is not None and args.offset < 0) or (args.limit is not None and args.limit < 0):
+        parser.error("--offset and --limit cannot be negative")
+    paged = args.offset is not None or args.limit is not None
+
+    def report(results):
+        if not paged:
+            return results
+        return page_errors(results, args.offset or 0, DEFAULT_PAGE_SIZE if args.limit is None else args.limit)
+
+    file_paths = expand_targets(args.target)
+    batch = len(file_paths) != 1 or Path(args.target).is_dir() or glob.has_magic(args.target)
+    if not file_paths:
+        print(f"No workbooks found for {args.target}", file=sys.stderr)
+        return 1
+
+    validator = ECBValidator(chunk_size=args.chunk_size, jobs=None if batch else args.jobs, verbose=not batch,
+                             cache_dir=args.cache_dir, rule_pack=args.rules,
+                             max_errors_per_rule=args.max_errors_per_rule or None,
+                             fail_fast=args.fail_fast, sample=args.sample, profile=args.profile,
+                             reader=args.reader, frame_cache_dir=args.frame_cache, **layout_options(args))
+    if args.previous and batch:
+        parser.error("--previous needs a single workbook")
+    if args.previous:
+        from ecb_incremental import load_results
+        results = report(validator.revalidate_file(args.previous, load_results(args.previous_results),
+                                                   file_paths[0]))
+        print("Validation Results:")
+        print(json.dumps(results, indent=2))
+        return 0
+    if not batch:
+        results = report(validator.validate_file(file_paths[0]))
+        print("Validation Results:")
+        print(json.dumps(results, indent=2))
+        return 0
+
+    # One JSON line per workbook
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for file_path, results in validator.validate_files(file_paths, jobs=args.jobs):
+            output.write(json.dumps({'file': file_path, **report(results)}) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+ECB Violations Store
+Failing rows kept per rule and column as NumPy arrays of Excel row numbers,
+with counts, instead of one error dict per failing cell. Error dicts are
+only built when a report asks for them, capped per rule or a page at a
+time. The JSON form run-length encodes the rows whenever that is smaller.
+"""
+
+import numpy as np
+
+
+def error_dict(rule_id, rule_type, row, column=None):
+    """One failing cell in the report's error shape"""
+    location = f"row {row}, column {column}" if column else f"row {row}"
+    return {
+        'rule_id': rule_id,
+        'rule_type': rule_type,
+        'row_index': row,
+        'column': column,
+        'message': f"{rule_id} violated at {location}",
+    }
+
+
+def run_length_encode(rows):
+    """[[start, length], ...] for the runs of consecutive numbers in a sorted array"""
+    if not len(rows):
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    lengths = np.diff(np.concatenate((starts, [len(rows)])))
+    return np.column_stack((rows[starts], lengths)).tolist()
+
+
+def run_length_decode(runs):
+    if not runs:
+        return np.zeros(0, dtype=np.int64)
+    starts, lengths = np.asarray(runs, dtype=np.int64).T
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + offsets
+
+
+class Violations:
+    """Failing Excel rows per (rule id, rule type, column), in the order rules were evaluated"""
+
+    def __init__(self):
+        self._rows = {}
+
+    def add(self, rule_id, rule_type, column, rows):
+        """Record failing rows; rows added for the same rule and column are appended in order"""
+        if len(rows):
+            self._rows.setdefault((rule_id, rule_type, column), []).append(np.asarray(rows, dtype=np.int64))
+
+    def update(self, other):
+        for key, parts in other._rows.items():
+            self._rows.setdefault(key, []).extend(parts)
+
+    def sort(self, key):
+        """Reorder the entries by key((rule_id, rule_type, column))"""
+        self._rows = dict(sorted(self._rows.items(), key=lambda item: key(item[0])))
+
+    def rows(self, rule_id, rule_type, column):
+        parts = self._rows.get((rule_id, rule_type, column))
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        if len(parts) > 1:
+            parts[:] = [np.concatenate(parts)]
+        return parts[0]
+
+    @property
+    def total(self):
+        return sum(len(part) for parts in self._rows.values() for part in parts)
+
+    def __len__(self):
+        return self.total
+
+    def __contains__(self, rule_id):
+        return any(key[0] == rule_id for key in self._rows)
+
+    def entries(self, rule_id=None, rule_type=None):
+        """[(rule_id, rule_type, column)] recorded, optionally for one rule id or rule type"""
+        return [key for key in self._rows
+                if (rule_id is None or key[0] == rule_id) and (rule_type is None or key[1] == rule_type)]
+
+    def counts(self):
+        """[{rule_id, rule_type, column, count}] without building any error dicts"""
+        return [{'rule_id': rule_id, 'rule_type': rule_type, 'column': column,
+                 'count': sum(len(part) for part in parts)}
+                for (rule_id, rule_type, column), parts in self._rows.items()]
+
+    def errors(self, max_per_rule=None):
+        """Yield error dicts, at most `max_per_rule` per rule id (all if None)"""
+        emitted = {}
+        for rule_id, rule_type, column in list(self._rows):
+            budget = None if max_per_rule is None else max_per_rule - emitted.get(rule_id, 0)
+            if budget is not None and budget <= 0:
+                continue
+            rows = self.rows(rule_id, rule_type, column)[:budget]
+            emitted[rule_id] = emitted.get(rule_id, 0) + len(rows)
+            for row in rows.tolist():
+                yield error_dict(rule_id, rule_type, row, column)
+
+    def page(self, offset=0, limit=100):
+        """Error dicts offset..offset+limit of the full, uncapped error list"""
+        page = []
+        for rule_id, rule_type, column in list(self._rows):
+            rows = self.rows(rule_id, rule_type, column)
+            if offset >= len(rows):
+                offset -= len(rows)
+                continue
+            taken = rows[offset:offset + limit - len(page)]
+            page.extend(error_dict(rule_id, rule_type, row, column) for row in taken.tolist())
+            offset = 0
+            if len(page) >= limit:
+                break
+        return page
+
+    def to_dict(self):
+        """JSON form: one entry per rule and column with its count and rows or runs"""
+        entries = []
+        for rule_id, rule_type, column in list(self._rows):
+            rows = self.rows(rule_id, rule_type, column)
+            entry = {'rule_id': rule_id, 'rule_type': rule_type, 'column': column, 'count': len(rows)}
+            runs = run_length_encode(rows)
+            if 2 * len(runs) < len(rows):
+                entry['runs'] = runs
+            else:
+                entry['rows'] = rows.tolist()
+            entries.append(entry)
+        return entries
+
+    @classmethod
+    def from_dict(cls, entries):
+        violations = cls()
+        for entry in entries:
+            rows = run_length_decode(entry['runs']) if 'runs' in entry else entry['rows']
+            violations.add(entry['rule_id'], entry['rule_type'], entry['column'], rows)
+        return violations
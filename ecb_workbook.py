@@ -0,0 +1,254 @@
+"""
+ECB Workbook Loader
+Opens an ECB/DORA workbook once with one of the ecb_readers backends and
+streams the tB_ sheets out of that single handle
+"""
+
+import hashlib
+import re
+from itertools import islice
+from operator import itemgetter
+
+import pandas as pd
+
+from ecb_readers import open_reader
+
+HEADER_ROW = 6  # Column codes (c0010, c0020, ...) on row 6
+DATA_START_ROW = 8  # Data from row 8
+DEFAULT_CHUNK_SIZE = 50000
+
+SHARED_STRING_REF = re.compile(rb'<(?:\w+:)?c\b[^>]*\bt="s"[^>]*>\s*<(?:\w+:)?v>(\d+)<')
+ENUMERATION_CODE = r'eba_\w+:\w+'  # domain members such as eba_CT:x212
+ISO_DATE = r'\d{4}-\d{2}-\d{2}'
+MAX_EXACT_FLOAT = 2 ** 53  # larger integers (numeric identifiers) stay exact as objects
+
+
+def column_mapping_from_header(header_row):
+    """Map 0-based column positions to the cNNNN codes in the header row"""
+    column_mapping = {}
+    seen = set()
+    for i, col_code in enumerate(header_row):
+        if col_code is not None and str(col_code).startswith('c') and str(col_code) not in seen:
+            column_mapping[i] = str(col_code)
+            seen.add(str(col_code))
+    return column_mapping
+
+
+def typed_column(values, data_type=None):
+    """Give a raw object column the dtype its cells share
+
+    Numbers become float64 and dates datetime64, including dates typed as
+    yyyy-mm-dd text; a text column with a date-shaped value that is not a
+    real date (2024-02-30) stays an object column so the rules see the text.
+    Enumeration codes, text in columns the layout declares
+    as enumerations, and any text column where values repeat at least twice
+    on average become categoricals so the enumeration rules compare integer
+    codes. Mixed columns stay objects.
+    """
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+    if kind in ('integer', 'floating', 'mixed-integer-float', 'decimal'):
+        numbers = values.astype(float)
+        if kind != 'integer' or not (numbers.abs() >= MAX_EXACT_FLOAT).any():
+            return numbers
+    elif kind in ('datetime', 'datetime64', 'date'):
+        return pd.to_datetime(values)
+    elif kind == 'string':
+        codes, uniques = pd.factorize(values)
+        text = pd.Series(uniques, dtype=object)
+        if len(text) and text.str.fullmatch(ISO_DATE).all():
+            dates = pd.to_datetime(values, format='%Y-%m-%d', errors='coerce')
+            return dates if dates.isna().sum() == values.isna().sum() else values
+        if (data_type == 'enumeration' or 2 * len(text) <= len(values)
+                or text.str.fullmatch(ENUMERATION_CODE).all()):
+            return pd.Series(pd.Categorical.from_codes(codes, uniques), index=values.index, name=values.name)
+    return values
+
+
+def frame_from_rows(rows, column_mapping, first_row, data_types=None):
+    """Build a frame of the mapped columns from raw row tuples
+
+    The index holds the Excel row numbers, fully empty rows are dropped and
+    each column gets the dtype chosen by typed_column, given the layout's
+    data types if known.
+    """
+    positions = list(column_mapping)
+    width = max(positions) + 1 if positions else 0
+    pick = itemgetter(*positions) if len(positions) > 1 else (lambda row: (row[positions[0]],))
+    records, index = [], []
+    for row_number, row in enumerate(rows, start=first_row):
+        if len(row) < width:
+            row = tuple(row) + (None,) * (width - len(row))
+        values = pick(row) if positions else ()
+        if any(v is not None and v != '' for v in values):
+            records.append(values)
+            index.append(row_number)
+    frame = pd.DataFrame.from_records(records, columns=list(column_mapping.values()),
+                                      index=pd.Index(index, name='row'), coerce_float=False)
+    data_types = data_types or {}
+    return pd.DataFrame({code: typed_column(frame[code], data_types.get(code)) for code in frame.columns},
+                        index=frame.index)
+
+
+def conform_column(values, dtype):
+    """A chunk's column given the dtype the sheet's first chunk chose for it, where that keeps every cell
+
+    Object is the widest dtype and takes any chunk. Otherwise only an empty
+    column, or text for a categorical, is cast; a chunk whose cells do not
+    fit, such as text in a date column, stays as typed_column left it.
+    """
+    if values.dtype == dtype:
+        return values
+    if dtype == object:
+        return values.astype(object)
+    if values.isna().all() or (isinstance(dtype, pd.CategoricalDtype) and values.dtype == object
+                               and pd.api.types.infer_dtype(values, skipna=True) == 'string'):
+        return values.astype(dtype if not isinstance(dtype, pd.CategoricalDtype) else 'category')
+    return values
+
+
+class WorkbookReader:
+    """Single read-only handle on a workbook
+
+    layout: optional LayoutIndex; its data types guide the column dtypes.
+    reader: backend from ecb_readers.READERS ('auto', 'xml', 'openpyxl', 'calamine').
+    frame_cache: optional ecb_frame_cache.FrameCache; read_sheet stores each parsed
+        sheet in it and later handles on the same file read the sheet from there.
+    """
+
+    def __init__(self, file_path, layout=None, reader='auto', frame_cache=None):
+        self.file_path = file_path
+        self.layout = layout
+        self.reader = open_reader(file_path, reader)
+        self.frame_cache = frame_cache
+        self._file_hash = None
+        self._headers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.reader.close()
+
+    @property
+    def sheet_names(self):
+        return self.reader.sheet_names
+
+    def table_sheets(self):
+        """Names of the tB_ reporting table sheets"""
+        return [name for name in self.sheet_names if name.startswith('tB_')]
+
+    def sheet_fingerprint(self, sheet_name):
+        """Hash of a sheet's name and content, computed from its raw XML without parsing cells
+
+        The name selects the template, and so the rules that apply: identical
+        sheets of different templates must not share a fingerprint. Shared-string
+        cells only store an index into the workbook-wide string table, so the
+        strings the sheet references are hashed alongside the XML.
+        """
+        xml = self.sheet_xml(sheet_name)
+        digest = hashlib.sha256(sheet_name.encode('utf-8') + b'\0')
+        digest.update(xml)
+        strings = self.shared_strings
+        for index in sorted({int(i) for i in SHARED_STRING_REF.findall(xml)}):
+            digest.update(b'%d\0' % index + str(strings[index]).encode('utf-8') + b'\0')
+        return digest.hexdigest()
+
+    def sheet_xml(self, sheet_name):
+        """Raw XML of a sheet's part in the package"""
+        return self.reader.sheet_xml(sheet_name)
+
+    @property
+    def shared_strings(self):
+        """The workbook's shared-string table"""
+        return self.reader.shared_strings
+
+    @property
+    def date_styles(self):
+        """Indices of the cell styles whose number format shows a date"""
+        return self.reader.date_styles
+
+    def iter_rows(self, sheet_name, min_row=1, max_row=None, min_col=None, max_col=None):
+        """Stream the raw value tuples of a sheet, optionally limited to a cell range"""
+        return self.reader.iter_rows(sheet_name, min_row=min_row, max_row=max_row, min_col=min_col,
+                                     max_col=max_col)
+
+    @property
+    def file_hash(self):
+        """SHA-256 of the workbook file"""
+        if self._file_hash is None:
+            from ecb_frame_cache import file_digest
+            self._file_hash = file_digest(self.file_path)
+        return self._file_hash
+
+    def header(self, sheet_name):
+        """Column mapping of the sheet's header row; stops reading at that row"""
+        if sheet_name not in self._headers:
+            mapping = self.frame_cache.header(self._frame_key(sheet_name)) if self.frame_cache is not None else None
+            if mapping is None:
+                row = next(self.iter_rows(sheet_name, min_row=HEADER_ROW, max_row=HEADER_ROW), ())
+                mapping = column_mapping_from_header(row)
+            self._headers[sheet_name] = mapping
+        return self._headers[sheet_name]
+
+    def read_sheet(self, sheet_name):
+        """Return (column_mapping, frame) for a sheet, from the frame cache if it holds the sheet"""
+        if self.frame_cache is not None:
+            cached = self.frame_cache.get(self._frame_key(sheet_name))
+            if cached is not None:
+                return cached
+        span_mapping, rows = self._open_data_rows(sheet_name)
+        column_mapping = self.header(sheet_name)
+        frame = frame_from_rows(rows, span_mapping, DATA_START_ROW, self._data_types(sheet_name))
+        if self.frame_cache is not None and column_mapping:
+            self.frame_cache.put(self._frame_key(sheet_name), column_mapping, frame)
+        return column_mapping, frame
+
+    def iter_sheet_chunks(self, sheet_name, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yield frames of at most `chunk_size` data rows, in sheet order
+
+        Each column keeps the dtype of the first chunk with a value in it
+        wherever its later chunks fit that dtype (see conform_column). A
+        sheet without data rows yields one empty frame, as read_sheet returns.
+        """
+        span_mapping, rows = self._open_data_rows(sheet_name)
+        data_types = self._data_types(sheet_name)
+        dtypes = {}
+        first_row = DATA_START_ROW
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                if first_row == DATA_START_ROW:
+                    yield frame_from_rows((), span_mapping, first_row, data_types)
+                return
+            frame = frame_from_rows(batch, span_mapping, first_row, data_types)
+            for code in frame.columns:
+                if code in dtypes:
+                    frame[code] = conform_column(frame[code], dtypes[code])
+                elif frame[code].notna().any():
+                    dtypes[code] = frame[code].dtype
+            yield frame
+            first_row += len(batch)
+
+    def _open_data_rows(self, sheet_name):
+        """Return (column mapping relative to the first mapped column, data row iterator)
+
+        Only the data rows are read, and only the cells from the first to
+        the last mapped column.
+        """
+        column_mapping = self.header(sheet_name)
+        if not column_mapping:
+            return {}, iter(())
+        first, last = min(column_mapping), max(column_mapping)
+        rows = self.iter_rows(sheet_name, min_row=DATA_START_ROW, min_col=first + 1, max_col=last + 1)
+        return {position - first: code for position, code in column_mapping.items()}, rows
+
+    def _frame_key(self, sheet_name):
+        from ecb_frame_cache import frame_key
+        return frame_key(self.file_hash, sheet_name, self._data_types(sheet_name))
+
+    def _data_types(self, sheet_name):
+        table = self.layout.get(sheet_name) if self.layout is not None else None
+        return {column.code: column.data_type for column in table.columns} if table else None
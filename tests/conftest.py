@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+HEADER_ROW = 6
+DATA_START_ROW = 8
+FIRST_COLUMN = 4  # column D
+
+
+def write_workbook(path, sheets):
+    """Write {sheet name: (codes, rows)} laid out like the templates: codes on row 6 from column D, data from row 8"""
+    from openpyxl import Workbook
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, (codes, rows) in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for offset, code in enumerate(codes):
+            sheet.cell(row=HEADER_ROW, column=FIRST_COLUMN + offset, value=code)
+        for row, values in enumerate(rows, start=DATA_START_ROW):
+            for offset, value in enumerate(values):
+                if value is not None:
+                    sheet.cell(row=row, column=FIRST_COLUMN + offset, value=value)
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def sample_workbook():
+    """Workbook with six violations across tB_01.01 and tB_01.02"""
+    return str(ROOT / 'test_ecb_validation.xlsx')
+
+
+@pytest.fixture(scope='session')
+def synthetic_workbook(tmp_path_factory):
+    """Synthetic register of 200 rows per table with shared strings, date-styled numbers and some faulty rows"""
+    from ecb_synthetic import generate_workbook
+    path = tmp_path_factory.mktemp('synthetic') / 'synthetic.xlsx'
+    generate_workbook(path, 200, violation_rate=0.05, seed=1)
+    return str(path)
@@ -0,0 +1,27 @@
+from ecb_archive import SHEET_ERROR, check_key, failing_checks
+from ecb_violations import error_dict
+
+RULES = [{'id': 'ECB_RULE_001', 'type': 'presence', 'expression': 'with {tB_01.01}:  not(isnull({c0010}))'}]
+
+
+def report(violations=(), errors=()):
+    return {'violations': list(violations), 'errors': list(errors), 'error_count': len(errors), 'data_rows': 1}
+
+
+def test_failing_checks_include_sheet_level_errors():
+    violation = {'rule_id': 'ECB_RULE_001', 'rule_type': 'presence', 'column': None, 'count': 2, 'rows': [8, 9]}
+    layout_error = {**error_dict('ECB_LAYOUT', 'structure', 6, 'c0020'), 'message': "c0020 is not in the template"}
+    results = {'sheet_results': {
+        'tB_01.01': report([violation], [error_dict('ECB_RULE_001', 'presence', 8), error_dict('ECB_RULE_001', 'presence', 9)]),
+        'tB_01.02': report(errors=[layout_error, layout_error]),
+        'tB_02.01': report(errors=["Sheet validation error: boom"]),
+    }}
+    failing = failing_checks(results, RULES)
+    assert failing == {
+        check_key(RULES[0]['expression']): {'rule_id': 'ECB_RULE_001', 'rule_type': 'presence',
+                                            'expression': RULES[0]['expression'], 'errors': 2},
+        'tB_01.02:ECB_LAYOUT': {'rule_id': 'ECB_LAYOUT', 'rule_type': 'structure', 'expression': None,
+                                'sheet': 'tB_01.02', 'errors': 2},
+        f'tB_02.01:{SHEET_ERROR}': {'rule_id': SHEET_ERROR, 'rule_type': 'error', 'expression': None,
+                                    'sheet': 'tB_02.01', 'errors': 1},
+    }
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from ecb_frame_cache import FrameCache, frame_key
+from ecb_validator import ECBValidator
+from ecb_workbook import WorkbookReader
+
+
+def test_frame_key_covers_file_sheet_and_data_types():
+    key = frame_key('a' * 64, 'tB_01.01', {'c0010': 'date'})
+    assert frame_key('a' * 64, 'tB_01.01', {'c0010': 'date'}) == key
+    assert frame_key('b' * 64, 'tB_01.01', {'c0010': 'date'}) != key
+    assert frame_key('a' * 64, 'tB_06.01', {'c0010': 'date'}) != key
+    assert frame_key('a' * 64, 'tB_01.01', {'c0010': 'string'}) != key
+    assert frame_key('a' * 64, 'tB_01.01') != key
+
+
+def test_cached_frames_equal_parsed_frames(synthetic_workbook, tmp_path):
+    cache = FrameCache(tmp_path)
+    with WorkbookReader(synthetic_workbook) as workbook:
+        parsed = {name: workbook.read_sheet(name) for name in workbook.table_sheets()}
+    for _ in range(2):  # the first handle stores the frames, the second reads them back
+        with WorkbookReader(synthetic_workbook, frame_cache=cache) as workbook:
+            for name, (column_mapping, frame) in parsed.items():
+                cached_mapping, cached = workbook.read_sheet(name)
+                assert cached_mapping == column_mapping
+                pd.testing.assert_frame_equal(cached, frame)
+    assert len(list(tmp_path.iterdir())) == len(parsed)
+
+
+def test_frame_cache_is_evicted_to_its_size(synthetic_workbook, tmp_path):
+    cache = FrameCache(tmp_path, max_bytes=1)
+    with WorkbookReader(synthetic_workbook, frame_cache=cache) as workbook:
+        for name in workbook.table_sheets():
+            workbook.read_sheet(name)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize('rule_pack', [None, 'extracted_ecb_validation_rules.json'])
+def test_results_from_cached_frames(rule_pack, synthetic_workbook, tmp_path):
+    expected = ECBValidator(verbose=False, rule_pack=rule_pack).validate_file(synthetic_workbook)
+    validator = ECBValidator(verbose=False, rule_pack=rule_pack, frame_cache_dir=str(tmp_path))
+    assert validator.validate_file(synthetic_workbook) == expected
+    assert validator.validate_file(synthetic_workbook) == expected
@@ -0,0 +1,62 @@
+import pytest
+
+from ecb_validator import ECBValidator
+
+
+@pytest.fixture(scope='module')
+def new_version(synthetic_workbook, tmp_path_factory):
+    """The synthetic register with cells changed, cleared and filled, a key changed, and rows added and removed"""
+    from openpyxl import load_workbook
+    workbook = load_workbook(synthetic_workbook)
+    tb_01_02 = workbook['tB_01.02']
+    tb_01_02['E10'] = None
+    tb_01_02['F12'] = tb_01_02['F13'].value
+    for row in range(20, 40):
+        if any(cell.value is None for cell in tb_01_02[row][3:8]):
+            for cell in tb_01_02[row][3:8]:
+                cell.value = cell.value if cell.value is not None else tb_01_02.cell(row + 1, cell.column).value
+            break
+    workbook['tB_05.01']['E9'] = 'ABCD9999999999999922'  # a provider key the contracts reference
+    tb_07_01 = workbook['tB_07.01']
+    last = tb_07_01.max_row
+    for cell in tb_07_01[8]:
+        tb_07_01.cell(last + 1, cell.column, cell.value)
+    for cell in tb_07_01[last]:
+        cell.value = None
+    path = tmp_path_factory.mktemp('incremental') / 'synthetic_v2.xlsx'
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize('chunk_size', [None, 64])
+def test_incremental_results_equal_full_validation(chunk_size, synthetic_workbook, new_version):
+    validator = ECBValidator(verbose=False, chunk_size=chunk_size, max_errors_per_rule=None)
+    previous = validator.validate_file(synthetic_workbook)
+    results = validator.revalidate_file(synthetic_workbook, previous, new_version)
+    summary = results.pop('incremental')
+    assert summary['revalidated']
+    assert results == validator.validate_file(new_version)
+    assert results != previous
+
+
+def test_unchanged_workbook_keeps_its_results(synthetic_workbook):
+    validator = ECBValidator(verbose=False)
+    previous = validator.validate_file(synthetic_workbook)
+    results = validator.revalidate_file(synthetic_workbook, previous, synthetic_workbook)
+    summary = results.pop('incremental')
+    assert sorted(summary['unchanged']) == sorted(previous['sheet_results'])
+    assert results == previous
+
+
+@pytest.mark.parametrize('stale', ['other rules', 'no hash'])
+def test_results_of_other_rules_are_not_reused(stale, synthetic_workbook, new_version):
+    validator = ECBValidator(verbose=False, max_errors_per_rule=None)
+    if stale == 'other rules':
+        previous = ECBValidator(verbose=False, max_errors_per_rule=None,
+                                rules=validator.rules[:10]).validate_file(synthetic_workbook)
+    else:
+        previous = validator.validate_file(synthetic_workbook)
+        del previous['ruleset_hash']
+    results = validator.revalidate_file(synthetic_workbook, previous, new_version)
+    assert 'incremental' not in results
+    assert results == validator.validate_file(new_version)
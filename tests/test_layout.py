@@ -0,0 +1,54 @@
+import pytest
+
+from ecb_layout import Domain, LayoutIndex, column_letter, table_layout
+
+
+@pytest.fixture
+def layout():
+    """tB_05.01 with codes 0010-0030 from column D, as the layout workbook lays it out"""
+    rows = [()] * 5 + [
+        (None, None, None, '0010', '0020', '0030'),
+        (None, None, None, '480191_x000D_\ntext', '[Type of code]', 'yyyy-mm-dd'),
+        (None, None, None, None, 'Type of code [CT:CT7]', None),
+    ]
+    return LayoutIndex({'tB_05.01': table_layout('tB_05.01', rows)})
+
+
+def test_table_layout_reads_codes_types_and_domains(layout):
+    table = layout.get('tB_05.01')
+    assert (table.header_row, table.first_column) == (6, 3)
+    assert [(c.code, c.position, c.data_type, c.domain) for c in table.columns] == [
+        ('c0010', 3, 'text', None), ('c0020', 4, 'enumeration', Domain('CT', 'CT7')), ('c0030', 5, 'date', None)]
+
+
+@pytest.mark.parametrize('column_mapping', [
+    {3: 'c0010', 4: 'c0020', 5: 'c0030'},
+    {3: 'c0010', 5: 'c0030'},  # templates may leave columns out
+])
+def test_sound_header_has_no_problems(column_mapping, layout):
+    assert layout.structure_problems('tB_05.01', column_mapping) == []
+
+
+def test_unknown_table(layout):
+    assert layout.structure_problems('tB_99.01', {3: 'c0010'}) == [
+        (None, "tB_99.01 is not a template of the table layout")]
+
+
+def test_empty_header(layout):
+    assert layout.structure_problems('tB_05.01', {}) == [(None, "no column codes on row 6")]
+
+
+def test_foreign_code(layout):
+    assert layout.structure_problems('tB_05.01', {3: 'c0010', 4: 'c0090', 5: 'c0100'}) == [
+        ('c0090', "column c0090 is not part of tB_05.01"), ('c0100', "column c0100 is not part of tB_05.01")]
+
+
+@pytest.mark.parametrize('first, letter', [(2, 'C'), (4, 'E')])
+def test_codes_starting_in_the_wrong_column(first, letter, layout):
+    assert layout.structure_problems('tB_05.01', {first: 'c0010', first + 1: 'c0020'}) == [
+        ('c0010', f"column codes start in column {letter}, expected D")]
+
+
+@pytest.mark.parametrize('position, letter', [(0, 'A'), (3, 'D'), (25, 'Z'), (26, 'AA'), (701, 'ZZ'), (702, 'AAA')])
+def test_column_letter(position, letter):
+    assert column_letter(position) == letter
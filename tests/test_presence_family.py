@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ecb_rule_engine import FamilyMember, RuleIndex, RuleSyntaxError, compile_expression, presence_family_shape
+from ecb_rule_pack import DEFAULT_RULE_PACK, RulePack
+
+
+def presence_rules():
+    """The default rule pack's "if any of {A..N} is non-null then K is non-null" rules"""
+    rules = []
+    for rule in RulePack.load(DEFAULT_RULE_PACK).rules:
+        try:
+            compiled = compile_expression(rule['expression'])
+        except RuleSyntaxError:
+            continue
+        if presence_family_shape(compiled) is not None:
+            rules.append(rule)
+    return rules
+
+
+@pytest.mark.parametrize('table', ['tB_01.01', 'tB_01.02', 'tB_05.01', 'tB_07.01'])
+def test_fused_presence_rules_match_unfused(table):
+    rules = [rule for rule in presence_rules() if f'{{{table}' in rule['expression'].replace(' ', '')]
+    assert len(rules) > 1
+    columns = sorted({c for rule in rules for c in compile_expression(rule['expression']).columns})
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({c: np.where(rng.random(500) < 0.7, 1.0, np.nan) for c in columns})
+    fused = RuleIndex(rules).rules_for(table, frame.columns)
+    assert all(isinstance(compiled, FamilyMember) for _, compiled in fused)
+    for rule, compiled in fused:
+        [(_, expected)] = compile_expression(rule['expression']).evaluate_all(frame)
+        [(_, mask)] = compiled.evaluate_all(frame)
+        assert mask.tolist() == expected.tolist(), rule['id']
+
+
+def test_fused_presence_rule_missing_a_column_raises_key_error():
+    rules = [rule for rule in presence_rules() if 'tB_05.01' in rule['expression']]
+    columns = sorted({c for rule in rules for c in compile_expression(rule['expression']).columns})
+    frame = pd.DataFrame({c: [1.0] for c in columns[1:]})
+    with pytest.raises(KeyError):
+        for _, compiled in RuleIndex(rules).rules_for('tB_05.01', frame.columns):
+            compiled.evaluate_all(frame)
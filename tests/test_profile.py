@@ -0,0 +1,59 @@
+import pytest
+
+from ecb_profile import Profile, PrometheusMetrics
+
+
+def test_update_adds_a_worker_profile_to_the_same_sheets_and_rules():
+    profile = Profile()
+    profile.add_stage('parse', 'tB_01.02', 1.0, rows=100)
+    profile.rule('tB_01.02', 'ECB_RULE_001', 0.5, 100, 3)
+    worker = Profile()
+    worker.add_stage('parse', 'tB_01.02', 2.0, rows=50)
+    worker.add_stage('evaluate', 'tB_02.01', 0.25, rows=10)
+    worker.rule('tB_01.02', 'ECB_RULE_001', 0.25, 50, 1)
+    worker.rule('tB_02.01', 'ECB_RULE_002', 0.125, 10, 0)
+    profile.update(worker.to_dict())
+    assert profile.stages == {('tB_01.02', 'parse'): [3.0, 150, 2], ('tB_02.01', 'evaluate'): [0.25, 10, 1]}
+    assert profile.rules == {('tB_01.02', 'ECB_RULE_001'): [0.75, 150, 4, 2],
+                             ('tB_02.01', 'ECB_RULE_002'): [0.125, 10, 0, 1]}
+
+
+def test_stage_records_time_and_rows():
+    profile = Profile()
+    with profile.stage('evaluate', 'tB_01.02') as stage:
+        stage.rows = 7
+    [entry] = profile.to_dict()['stages']
+    assert (entry['stage'], entry['sheet'], entry['rows'], entry['calls']) == ('evaluate', 'tB_01.02', 7, 1)
+    assert entry['seconds'] >= 0
+
+
+@pytest.fixture
+def metrics():
+    metrics = PrometheusMetrics(buckets=(0.1, 1))
+    metrics.observe_run(0.05)
+    metrics.observe_run(0.5, {'stages': [{'stage': 'parse', 'sheet': 'tB_01.02', 'seconds': 0.25, 'rows': 1234567}],
+                              'rules': [{'rule_id': 'ECB_RULE_001', 'sheet': 'tB_01.02', 'seconds': 0.125,
+                                         'rows': 1234567, 'violations': 3}]})
+    metrics.observe_run(2.0)
+    return metrics.exposition().splitlines()
+
+
+def test_exposition_of_counters(metrics):
+    assert metrics[:2] == ['# HELP ecb_validations_total Workbooks validated', '# TYPE ecb_validations_total counter']
+    assert 'ecb_validations_total 3' in metrics
+    assert 'ecb_rule_rows_total{rule_id="ECB_RULE_001"} 1234567' in metrics
+    assert 'ecb_rule_seconds_total{rule_id="ECB_RULE_001"} 0.125' in metrics
+    assert 'ecb_stage_rows_total{stage="parse"} 1234567' in metrics
+
+
+def test_exposition_of_histograms(metrics):
+    start = metrics.index('# TYPE ecb_validation_seconds histogram')
+    assert metrics[start + 1:start + 6] == [
+        'ecb_validation_seconds_bucket{le="0.1"} 1',
+        'ecb_validation_seconds_bucket{le="1"} 2',
+        'ecb_validation_seconds_bucket{le="+Inf"} 3',
+        'ecb_validation_seconds_sum 2.55',
+        'ecb_validation_seconds_count 3',
+    ]
+    assert 'ecb_stage_seconds_bucket{stage="parse",le="+Inf"} 1' in metrics
+    assert 'ecb_stage_seconds_sum{stage="parse"} 0.25' in metrics
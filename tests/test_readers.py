@@ -0,0 +1,59 @@
+import datetime
+from contextlib import closing
+
+import pytest
+
+from conftest import write_workbook
+from ecb_readers import calamine_available, open_reader, resolve_reader
+from ecb_validator import ECBValidator
+
+
+MIXED = (['c0010', 'c0020', 'c0030', 'c0040', 'c0050'],
+         [(1, 2.5, 'text', datetime.datetime(2024, 1, 31), True),
+          (None, None, None, None, None),
+          (3, None, 'eba_CT:x1', None, False),
+          (None, -0.25, '', datetime.datetime(2023, 12, 1), None)])
+
+
+@pytest.fixture(params=['xml', 'openpyxl', 'calamine'])
+def reader(request):
+    if request.param == 'calamine':
+        pytest.importorskip('python_calamine')
+    return request.param
+
+
+@pytest.fixture(scope='module')
+def mixed_workbook(tmp_path_factory):
+    return write_workbook(tmp_path_factory.mktemp('mixed') / 'mixed.xlsx', {'tB_01.01': MIXED})
+
+
+def sheet_rows(file_path, reader, **bounds):
+    with closing(open_reader(file_path, reader)) as backend:
+        return {name: [tuple(row) for row in backend.iter_rows(name, **bounds)] for name in backend.sheet_names}
+
+
+@pytest.mark.parametrize('workbook', ['sample_workbook', 'mixed_workbook', 'synthetic_workbook'])
+def test_readers_give_openpyxl_values(reader, workbook, request):
+    file_path = request.getfixturevalue(workbook)
+    assert sheet_rows(file_path, reader) == sheet_rows(file_path, 'openpyxl')
+
+
+def test_readers_give_openpyxl_values_in_a_range(reader, synthetic_workbook):
+    bounds = {'min_row': 8, 'max_row': 40, 'min_col': 5, 'max_col': 9}
+    assert sheet_rows(synthetic_workbook, reader, **bounds) == sheet_rows(synthetic_workbook, 'openpyxl', **bounds)
+
+
+@pytest.mark.parametrize('chunk_size', [None, 64])
+def test_readers_give_the_same_results(reader, chunk_size, synthetic_workbook):
+    expected = ECBValidator(verbose=False, reader='openpyxl').validate_file(synthetic_workbook)
+    results = ECBValidator(verbose=False, reader=reader, chunk_size=chunk_size).validate_file(synthetic_workbook)
+    assert results['total_errors'] == expected['total_errors'] > 0
+    for name, sheet_results in expected['sheet_results'].items():
+        assert results['sheet_results'][name]['error_count'] == sheet_results['error_count']
+
+
+def test_auto_streams_with_the_xml_reader():
+    assert resolve_reader('auto', streaming=True) == 'xml'
+    assert resolve_reader('auto') == ('calamine' if calamine_available() else 'xml')
+    assert resolve_reader('openpyxl', streaming=True) == 'openpyxl'
+    assert ECBValidator(verbose=False, chunk_size=100).reader == 'xml'
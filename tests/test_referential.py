@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ecb_referential import (FOREIGN_KEYS, _key_text, check_references, keys_from_dict, keys_to_dict,
+                             normalized_keys)
+
+CONTRACTS = FOREIGN_KEYS[0]  # tB_02.02 c0010 -> tB_02.01 c0010
+PROVIDERS = FOREIGN_KEYS[3]  # tB_02.02 (c0030, c0040) -> tB_05.01 (c0010, c0020)
+
+
+def frame(rows, **columns):
+    return pd.DataFrame(columns, index=pd.Index(rows, dtype=np.int64))
+
+
+def test_whole_number_floats_read_as_their_integer_text():
+    assert _key_text(pd.Series([123.0, 4.0])).tolist() == ['123', '4']
+    assert _key_text(pd.Series([1.5, 4.0])).tolist() == ['1.5', '4.0']
+    assert _key_text(pd.Series([' C-1 ', 7], dtype=object)).tolist() == ['C-1', '7']
+
+
+def test_normalized_keys_drop_rows_with_an_empty_part():
+    keys = normalized_keys(frame([8, 9, 10, 11], c0030=['LEI1', None, '  ', 'LEI2'],
+                                 c0040=['eba_qCO:qx2000', 'eba_qCO:qx2000', 'eba_qCO:qx2000', np.nan]),
+                           ('c0030', 'c0040'))
+    assert keys.index.tolist() == [8]
+    assert keys.values.tolist() == [['LEI1', 'eba_qCO:qx2000']]
+
+
+def test_float_keys_match_text_keys():
+    frames = {'tB_02.01': frame([8, 9], c0010=pd.Series([1001.0, 1002.0], index=[8, 9])),
+              'tB_02.02': frame([8, 9, 10], c0010=pd.Series(['1001', ' 1002', '1003'], index=[8, 9, 10],
+                                                            dtype=object))}
+    violations, skipped = check_references(frames, [CONTRACTS])
+    assert [(fk, rows.tolist()) for fk, rows in violations] == [(CONTRACTS, [10])]
+    assert skipped == []
+
+
+def test_two_column_keys_must_match_together():
+    frames = {'tB_05.01': frame([8, 9], c0010=['LEI1', 'LEI2'], c0020=['eba_qCO:qx2000', 'eba_qCO:qx2001']),
+              'tB_02.02': frame([8, 9, 10], c0030=['LEI1', 'LEI1', 'LEI2'],
+                                c0040=['eba_qCO:qx2000', 'eba_qCO:qx2001', 'eba_qCO:qx2001'])}
+    violations, _ = check_references(frames, [PROVIDERS])
+    assert [(fk, rows.tolist()) for fk, rows in violations] == [(PROVIDERS, [9])]
+
+
+def test_every_key_fails_against_an_empty_referenced_table():
+    frames = {'tB_02.01': frame([], c0010=pd.Series([], dtype=object)),
+              'tB_02.02': frame([8, 9], c0010=['C1', 'C2'])}
+    violations, _ = check_references(frames, [CONTRACTS])
+    assert [(fk, rows.tolist()) for fk, rows in violations] == [(CONTRACTS, [8, 9])]
+
+
+@pytest.mark.parametrize('frames, reason', [
+    ({'tB_02.02': frame([8], c0010=['C1'])}, "missing table tB_02.01"),
+    ({'tB_02.01': frame([8], c0020=['C1']), 'tB_02.02': frame([8], c0010=['C1'])}, "missing column in tB_02.01"),
+    ({'tB_02.01': frame([8], c0010=['C1']), 'tB_02.02': frame([8], c0020=['C1'])}, "missing column c0010"),
+])
+def test_skip_reasons(frames, reason):
+    assert check_references(frames, [CONTRACTS]) == ([], [(CONTRACTS, reason)])
+
+
+def test_tables_without_rows_are_not_checked():
+    assert check_references({'tB_02.02': frame([], c0010=pd.Series([], dtype=object))}, [CONTRACTS]) == ([], [])
+
+
+def test_cached_keys_give_the_same_key_text():
+    keys = frame([8, 9, 10], c0010=[1001.0, np.nan, 1003.0],
+                 c0020=pd.Series(['LEI1', None, 'LEI3'], index=[8, 9, 10], dtype='category'))
+    restored = keys_from_dict(keys_to_dict(keys))
+    assert restored.index.tolist() == [8, 9, 10]
+    for columns in (('c0010',), ('c0020',), ('c0010', 'c0020')):
+        pd.testing.assert_frame_equal(normalized_keys(restored, columns), normalized_keys(keys, columns))
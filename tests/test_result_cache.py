@@ -0,0 +1,60 @@
+from conftest import write_workbook
+from ecb_result_cache import ResultCache
+from ecb_validator import ECBValidator
+from ecb_workbook import WorkbookReader
+
+TB_01_02 = (['c0050', 'c0060', 'c0070', 'record_id'],
+            [(1000, 500, 1500, 1), (1200, 600, 1800, 2), (1500, 750, 2250, 3)])
+
+
+def test_identical_sheets_of_different_templates_do_not_share_results(tmp_path):
+    file_path = write_workbook(tmp_path / 'twins.xlsx', {'tB_01.02': TB_01_02, 'tB_06.01': TB_01_02})
+    expected = ECBValidator(verbose=False).validate_file(file_path)
+
+    validator = ECBValidator(verbose=False, cache_dir=str(tmp_path / 'cache'))
+    first = validator.validate_file(file_path)
+    second = validator.validate_file(file_path)
+
+    for results in (first, second):
+        assert results['total_errors'] == expected['total_errors']
+        for name in ('tB_01.02', 'tB_06.01'):
+            assert results['sheet_results'][name]['violations'] == expected['sheet_results'][name]['violations']
+
+
+def test_result_cache_key_covers_sheet_and_rules(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put('sheet', 'rules', {'data_rows': 1})
+    assert cache.get('sheet', 'rules') == {'data_rows': 1}
+    assert cache.get('sheet', 'other rules') is None
+    assert cache.get('other sheet', 'rules') is None
+
+
+def test_sheet_fingerprint_covers_name_and_content(tmp_path):
+    file_path = write_workbook(tmp_path / 'sheets.xlsx', {
+        'tB_01.02': TB_01_02, 'tB_06.01': TB_01_02, 'tB_07.01': (TB_01_02[0], TB_01_02[1][:2])})
+    with WorkbookReader(file_path) as workbook:
+        fingerprints = {name: workbook.sheet_fingerprint(name) for name in workbook.sheet_names}
+    with WorkbookReader(file_path) as workbook:
+        assert {name: workbook.sheet_fingerprint(name) for name in workbook.sheet_names} == fingerprints
+    assert len(set(fingerprints.values())) == 3
+
+
+def test_changed_sheet_is_the_only_one_parsed_again(synthetic_workbook, tmp_path, monkeypatch):
+    from openpyxl import load_workbook
+    # Both versions saved by openpyxl, so that only the cleared cell differs
+    workbook = load_workbook(synthetic_workbook)
+    original, changed = tmp_path / 'original.xlsx', tmp_path / 'changed.xlsx'
+    workbook.save(original)
+    workbook['tB_02.02']['D9'] = None
+    workbook.save(changed)
+    expected = ECBValidator(verbose=False).validate_file(str(changed))
+
+    validator = ECBValidator(verbose=False, cache_dir=str(tmp_path / 'cache'))
+    validator.validate_file(str(original))
+    parsed = []
+    read_sheet = WorkbookReader.read_sheet
+    monkeypatch.setattr(WorkbookReader, 'read_sheet',
+                        lambda self, name, *args, **kwargs: parsed.append(name) or read_sheet(self, name, *args, **kwargs))
+    results = validator.validate_file(str(changed))
+    assert parsed == ['tB_02.02']
+    assert results == expected
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ecb_rule_engine import LEI_PATTERN, Truth, compile_expression, lei_checksum_valid
+
+T, F, N = True, False, None
+
+
+def truth(*values):
+    return Truth([v is True for v in values], [v is None for v in values])
+
+
+def values(t):
+    return [None if null else bool(value) for value, null in zip(t.value, t.null)]
+
+
+def failing(expression, frame):
+    [(_, mask)] = compile_expression(expression).evaluate_all(frame)
+    return mask.tolist()
+
+
+def test_three_valued_and_or_not():
+    left = truth(T, T, T, F, F, F, N, N, N)
+    right = truth(T, F, N, T, F, N, T, F, N)
+    assert values(left.both(right)) == [T, F, N, F, F, F, N, F, N]
+    assert values(left.either(right)) == [T, T, T, T, F, N, T, N, N]
+    assert values(left.invert()) == [F, F, F, T, T, T, N, N, N]
+
+
+def test_comparison_with_null_does_not_fail():
+    frame = pd.DataFrame({'c0010': [1.0, 10.0, np.nan]})
+    assert failing("with {tB_01.01, default: null, interval: false}: {c0010} > 5", frame) == [True, False, False]
+
+
+def test_unknown_condition_does_not_fail():
+    frame = pd.DataFrame({'c0010': [1.0, 10.0, np.nan, 10.0], 'c0020': [np.nan, np.nan, np.nan, 2.0]})
+    expression = "with {tB_01.01, default: null, interval: false}: if ({c0010} > 5) then (not(isnull({c0020}))) endif"
+    assert failing(expression, frame) == [False, True, False, False]
+
+
+@pytest.mark.parametrize('expression', ['c0010+c0020=c0030', 'SUM(c0010:c0020)=c0030'])
+def test_equality_of_large_amounts_is_exact_to_the_cent(expression):
+    frame = pd.DataFrame({'c0010': [1_000_000.0, 1_000_000.0, 500.0, 0.1],
+                          'c0020': [0.0, 0.0, 0.0, 0.2],
+                          'c0030': [1_000_009.0, 1_000_000.004, 501.0, 0.3]})
+    assert failing(expression, frame) == [True, False, True, False]
+
+
+def test_lei_checksum():
+    codes = ['5493001KJTIIGC8Y1R12', '529900T8BM49AURSDO55', 'ABCD9999999999999922']
+    assert lei_checksum_valid(np.array(codes, dtype=object)).tolist() == [True, True, True]
+    wrong = [code[:-1] + str((int(code[-1]) + 1) % 10) for code in codes]
+    assert lei_checksum_valid(np.array(wrong, dtype=object)).tolist() == [False, False, False]
+    assert lei_checksum_valid(np.array([], dtype=object)).tolist() == []
+
+
+def test_lei_pattern_checks_the_check_digits():
+    frame = pd.DataFrame({'c0030': ['5493001KJTIIGC8Y1R12', '5493001KJTIIGC8Y1R13', 'not an lei', None]})
+    expression = f'with {{tB_05.01, default: null, interval: false}}: match({{c0030}}, "{LEI_PATTERN}")'
+    assert failing(expression, frame) == [False, True, True, False]
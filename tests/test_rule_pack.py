@@ -0,0 +1,79 @@
+import json
+import pickle
+
+import pytest
+
+import ecb_rule_engine
+from ecb_rule_pack import ARTIFACT_HEADER, ARTIFACT_MAGIC, ARTIFACT_VERSION, RulePack, RulePackError, normalize_rule
+
+RULES = {'metadata': {'version': '1.2'}, 'rules': [
+    {'id': 'ECB_RULE_001', 'expression': ' c0010>=0 ', 'type': 'arithmetic', 'tables': ['tB_01.02'],
+     'columns': ['c0010']},
+    {'rule_id': 2, 'original_expression': 'c0020<=c0030', 'rule_type': 'comparison',
+     'table_references': ['tB_02.02'], 'column_references': ['c0020', 'c0030']},
+    {'id': 'ECB_RULE_003', 'expression': ''},
+]}
+
+
+def test_normalize_rule_maps_both_schemas():
+    assert normalize_rule(RULES['rules'][0], 0) == {
+        'id': 'ECB_RULE_001', 'expression': 'c0010>=0', 'type': 'arithmetic', 'tables': ['tB_01.02'],
+        'columns': ['c0010']}
+    assert normalize_rule(RULES['rules'][1], 1) == {
+        'id': 'ECB_RULE_002', 'expression': 'c0020<=c0030', 'type': 'comparison', 'tables': ['tB_02.02'],
+        'columns': ['c0020', 'c0030']}
+
+
+def test_normalize_rule_numbers_rules_without_id_by_position():
+    assert normalize_rule({'expression': 'c0010>0'}, 41) == {
+        'id': 'ECB_RULE_041', 'expression': 'c0010>0', 'type': 'unknown', 'tables': [], 'columns': []}
+
+
+@pytest.mark.parametrize('entry', [{'id': 'ECB_RULE_003', 'expression': ''}, {'id': 'ECB_RULE_004'},
+                                   {'expression': ['c0010>0']}])
+def test_normalize_rule_drops_rules_without_expression(entry):
+    assert normalize_rule(entry, 0) is None
+
+
+@pytest.fixture
+def rule_file(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps(RULES), encoding='utf-8')
+    return path
+
+
+def test_artifact_round_trip(rule_file, tmp_path):
+    pack = RulePack.from_json(rule_file)
+    assert [rule['id'] for rule in pack.rules] == ['ECB_RULE_001', 'ECB_RULE_002']
+    artifact = tmp_path / 'rules.rulepack'
+    pack.save_artifact(artifact)
+    loaded = RulePack.load(artifact)
+    assert loaded.rules == pack.rules
+    assert (loaded.source, loaded.version, loaded.ruleset_hash) == ('rules.json', '1.2', pack.ruleset_hash)
+
+
+@pytest.mark.parametrize('artifact_version, engine_version', [
+    (ARTIFACT_VERSION + 1, ecb_rule_engine.ENGINE_VERSION),
+    (ARTIFACT_VERSION, ecb_rule_engine.ENGINE_VERSION - 1),
+])
+def test_artifact_of_another_version_is_rejected(artifact_version, engine_version, rule_file, tmp_path):
+    artifact = tmp_path / 'rules.rulepack'
+    RulePack.from_json(rule_file).save_artifact(artifact)
+    data = artifact.read_bytes()
+    artifact.write_bytes(ARTIFACT_HEADER.pack(ARTIFACT_MAGIC, artifact_version, engine_version)
+                         + data[ARTIFACT_HEADER.size:])
+    with pytest.raises(RulePackError, match='rebuild'):
+        RulePack.load(artifact)
+
+
+def test_artifact_with_altered_rules_is_rejected_before_seeding_the_cache(rule_file, tmp_path):
+    pack = RulePack.from_json(rule_file)
+    payload = {'source': pack.source, 'version': pack.version, 'ruleset_hash': pack.ruleset_hash,
+               'rules': pack.rules[:1], 'compiled': {'altered rule key': None}}
+    artifact = tmp_path / 'rules.rulepack'
+    with open(artifact, 'wb') as f:
+        f.write(ARTIFACT_HEADER.pack(ARTIFACT_MAGIC, ARTIFACT_VERSION, ecb_rule_engine.ENGINE_VERSION))
+        pickle.dump(payload, f)
+    with pytest.raises(RulePackError, match='hash mismatch'):
+        RulePack.load(artifact)
+    assert 'altered rule key' not in ecb_rule_engine._COMPILED
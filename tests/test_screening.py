@@ -0,0 +1,71 @@
+import pytest
+
+from ecb_sampling import wilson_interval
+from ecb_validator import ECBValidator
+
+
+def first_rows(results):
+    """{(sheet, rule id): lowest failing row} over every column of each rule"""
+    rows = {}
+    for name, report in results['sheet_results'].items():
+        for error in report['errors']:
+            key = (name, error['rule_id'])
+            rows[key] = min(rows.get(key, error['row_index']), error['row_index'])
+    return rows
+
+
+@pytest.fixture(scope='module')
+def full_results(synthetic_workbook):
+    return ECBValidator(verbose=False, max_errors_per_rule=None).validate_file(synthetic_workbook)
+
+
+@pytest.mark.parametrize('chunk_size', [None, 7, 64])
+def test_fail_fast_rule_reports_each_rules_first_failing_row(chunk_size, synthetic_workbook, full_results):
+    results = ECBValidator(verbose=False, max_errors_per_rule=None, chunk_size=chunk_size,
+                           fail_fast='rule').validate_file(synthetic_workbook)
+    errors = [(name, error['rule_id']) for name, report in results['sheet_results'].items()
+              for error in report['errors']]
+    assert len(errors) == len(set(errors)) == results['total_errors']
+    assert first_rows(results) == first_rows(full_results)
+    assert results['overall_pass'] == full_results['overall_pass']
+    assert results['fail_fast'] == 'rule'
+
+
+@pytest.mark.parametrize('chunk_size', [None, 7])
+def test_fail_fast_sheet_stops_each_sheet_at_one_violation(chunk_size, synthetic_workbook, full_results):
+    results = ECBValidator(verbose=False, chunk_size=chunk_size, fail_fast='sheet').validate_file(synthetic_workbook)
+    assert results['sheet_results'].keys() == full_results['sheet_results'].keys()
+    for name, report in results['sheet_results'].items():
+        assert report['error_count'] == min(1, full_results['sheet_results'][name]['error_count'])
+    assert 'unchecked_sheets' not in results
+
+
+def test_fail_fast_file_stops_at_the_first_failing_sheet(synthetic_workbook, full_results):
+    results = ECBValidator(verbose=False, fail_fast='file').validate_file(synthetic_workbook)
+    names = list(full_results['sheet_results'])
+    failed = next(i for i, name in enumerate(names) if full_results['sheet_results'][name]['error_count'])
+    assert list(results['sheet_results']) == names[:failed + 1]
+    assert results['unchecked_sheets'] == names[failed + 1:]
+    assert 0 < results['total_errors'] <= full_results['total_errors']
+    assert not results['overall_pass']
+
+
+@pytest.mark.parametrize('chunk_size', [7, 64])
+def test_sampled_results_do_not_depend_on_chunk_size(chunk_size, synthetic_workbook):
+    expected = ECBValidator(verbose=False, max_errors_per_rule=None, sample=0.1).validate_file(synthetic_workbook)
+    results = ECBValidator(verbose=False, max_errors_per_rule=None, sample=0.1,
+                           chunk_size=chunk_size).validate_file(synthetic_workbook)
+    assert results == expected
+    for report in expected['sheet_results'].values():
+        assert report['sample']['sampled_rows'] == 20
+
+
+@pytest.mark.parametrize('failing, rows, expected', [
+    (0, 0, (0.0, 1.0)),
+    (0, 10, (0.0, 0.2775)),
+    (10, 10, (0.7225, 1.0)),
+    (50, 100, (0.4038, 0.5962)),
+    (1, 1000, (0.0002, 0.0057)),
+])
+def test_wilson_interval(failing, rows, expected):
+    assert wilson_interval(failing, rows) == pytest.approx(expected, abs=1e-4)
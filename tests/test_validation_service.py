@@ -0,0 +1,75 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from ecb_validation_service import MAX_UPLOAD_BYTES, ValidationService
+from ecb_validator import ECBValidator
+
+
+@pytest.fixture(scope='module')
+def validator():
+    return ECBValidator(verbose=False).warm()
+
+
+def exchange(service, raw):
+    """Send raw request bytes to the service; returns (status code, decoded body)"""
+    async def run():
+        service.slots = asyncio.Semaphore(service.concurrency)
+        server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        head, _, body = response.partition(b'\r\n\r\n')
+        status = int(head.split()[1])
+        return status, json.loads(body) if head.find(b'application/json') >= 0 else body.decode('utf-8')
+    return asyncio.run(run())
+
+
+def post(data, content_length=None):
+    length = len(data) if content_length is None else content_length
+    return b'POST /validate HTTP/1.1\r\nContent-Length: %s\r\n\r\n' % str(length).encode() + data
+
+
+@pytest.mark.parametrize('raw, status', [
+    (b'GET /health HTTP/1.1\r\n\r\n', 200),
+    (b'GET /metrics HTTP/1.1\r\n\r\n', 200),
+    (b'GET /nowhere HTTP/1.1\r\n\r\n', 404),
+    (b'garbage\r\n\r\n', 400),
+    (b'POST /validate HTTP/1.1\r\n\r\n', 411),
+    (post(b'', content_length='abc'), 400),
+    (post(b'', content_length=-1), 400),
+    (post(b''), 400),
+    (post(b'', content_length=MAX_UPLOAD_BYTES + 1), 413),
+    (post(b'PK').replace(b'/validate', b'/validate?offset=-1'), 400),
+    (post(b'PK').replace(b'/validate', b'/validate?limit=ten'), 400),
+])
+def test_status(validator, raw, status):
+    assert exchange(ValidationService(validator, workers=1), raw)[0] == status
+
+
+def test_full_queue_is_unavailable(validator):
+    service = ValidationService(validator, workers=1, max_queue=0)
+    assert exchange(service, post(b'PK'))[0] == 503
+
+
+def test_validate(validator, sample_workbook):
+    service = ValidationService(validator, workers=1)
+    with validator.worker_pool(1) as service.pool:
+        # Started up front, as ValidationService.start does
+        for future in validator.warm_pool(service.pool, 1):
+            future.result()
+        status, body = exchange(service, post(Path(sample_workbook).read_bytes()))
+        assert status == 200
+        assert body['total_errors'] == validator.validate_file(sample_workbook)['total_errors']
+        assert exchange(service, post(b'not a workbook'))[0] == 422
+        status, body = exchange(service, post(Path(sample_workbook).read_bytes()).replace(
+            b'/validate', b'/validate?offset=1&limit=1'))
+        assert status == 200
+        for report in body['sheet_results'].values():
+            assert report['errors_page'] == {'offset': 1, 'limit': 1}
+            assert len(report['errors']) == min(1, max(report['error_count'] - 1, 0))
@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+
+from conftest import write_workbook
+from ecb_validator import ECBValidator, page_errors
+
+
+@pytest.fixture(scope='module')
+def code_lists():
+    from ecb_code_lists import CodeLists
+    from ecb_layout import LayoutIndex
+    return CodeLists.load(LayoutIndex.load())
+
+
+@pytest.mark.parametrize('chunk_size', [7, 64])
+@pytest.mark.parametrize('domains', [False, True])
+def test_chunked_results_equal_whole_sheet_results(chunk_size, domains, synthetic_workbook, request):
+    options = {'verbose': False, 'max_errors_per_rule': None}
+    if domains:
+        options['code_lists'] = request.getfixturevalue('code_lists')
+    expected = ECBValidator(**options).validate_file(synthetic_workbook)
+    results = ECBValidator(chunk_size=chunk_size, **options).validate_file(synthetic_workbook)
+    assert expected['total_errors'] > 0
+    assert results == expected
+
+
+@pytest.mark.parametrize('text_row', [3, 15])
+def test_chunked_results_equal_whole_sheet_results_on_dates_mixed_with_text(text_row, tmp_path):
+    # ECB_RULE_127 checks c0080<=c0090 on every table; one 'n/a' leaves c0090 an object column in one chunk
+    rows = [[datetime.datetime(2024, 2, 1), datetime.datetime(2024, 1, 1)] for _ in range(20)]
+    rows[text_row][1] = 'n/a'
+    path = write_workbook(tmp_path / 'dates.xlsx', {'tB_99.01': (['c0080', 'c0090'], rows)})
+    expected = ECBValidator(verbose=False, max_errors_per_rule=None).validate_file(path)
+    results = ECBValidator(verbose=False, max_errors_per_rule=None, chunk_size=10).validate_file(path)
+    assert expected['total_errors'] == 19
+    assert results == expected
+
+
+def test_error_pages_add_up_to_the_full_error_list(synthetic_workbook):
+    full = ECBValidator(verbose=False, max_errors_per_rule=None).validate_file(synthetic_workbook)
+    capped = ECBValidator(verbose=False, max_errors_per_rule=1)
+    pages = [page_errors(capped.validate_file(synthetic_workbook), offset, 7) for offset in range(0, 140, 7)]
+    for name, report in full['sheet_results'].items():
+        assert report['error_count'] > 7
+        listed = [error for page in pages for error in page['sheet_results'][name]['errors']]
+        assert listed == report['errors']
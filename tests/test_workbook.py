@@ -0,0 +1,59 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from ecb_workbook import MAX_EXACT_FLOAT, conform_column, typed_column
+
+
+def column(*values):
+    return pd.Series(values, dtype=object, name='c0010')
+
+
+@pytest.mark.parametrize('values, dtype', [
+    ((1, 2, None), 'float64'),
+    ((1, 2.5, None), 'float64'),
+    ((MAX_EXACT_FLOAT, 1), 'object'),
+    ((1, 'a'), 'object'),
+    (('a', 'b', 'c'), 'object'),
+])
+def test_dtype(values, dtype):
+    assert typed_column(column(*values)).dtype == dtype
+
+
+def test_datetime_cells_become_datetime64():
+    result = typed_column(column(datetime.datetime(2024, 1, 31), None))
+    assert result.dtype.kind == 'M'
+    assert result.isna().tolist() == [False, True]
+
+
+def test_iso_date_text_becomes_datetime64():
+    result = typed_column(column('2024-01-31', None, '2024-02-29'))
+    assert result.dtype.kind == 'M'
+    assert result.isna().tolist() == [False, True, False]
+
+
+def test_invalid_iso_date_text_stays_text():
+    result = typed_column(column('2024-01-31', '2024-02-30', None))
+    assert result.dtype == object
+    assert result.tolist() == ['2024-01-31', '2024-02-30', None]
+
+
+@pytest.mark.parametrize('values, data_type', [
+    (('eba_CT:x1', 'eba_CT:x2'), None),
+    (('a', 'b', 'a', 'a'), None),
+    (('a', 'b', 'c'), 'enumeration'),
+])
+def test_categorical(values, data_type):
+    result = typed_column(column(*values), data_type)
+    assert isinstance(result.dtype, pd.CategoricalDtype)
+    assert result.astype(object).tolist() == list(values)
+
+
+def test_later_chunks_take_the_first_chunks_dtype_where_their_cells_fit():
+    dates = typed_column(column(datetime.datetime(2024, 1, 31)))
+    assert conform_column(typed_column(column(None, None)), dates.dtype).dtype == dates.dtype
+    assert conform_column(typed_column(column('n/a', 'x')), dates.dtype).tolist() == ['n/a', 'x']
+    assert conform_column(dates, column('n/a').dtype).tolist() == [pd.Timestamp(2024, 1, 31)]
+    codes = typed_column(column('a', 'b'), 'enumeration')
+    assert isinstance(conform_column(column('c', None), codes.dtype).dtype, pd.CategoricalDtype)